@@ -0,0 +1,32 @@
+"""
+Gunicorn settings, read by gunicorn from the working directory: the number of workers and the BLAS threads of each
+worker are picked from the available cores, one worker per core with 1 BLAS thread by default (see
+analytical_validation.api.runtime), and each worker validates a synthetic curve when it starts, before taking requests
+(see analytical_validation.api.warm_up). VALIDAWAREE_WORKERS and VALIDAWAREE_BLAS_THREADS override the choice, e.g.
+with the values printed by python -m analytical_validation.api.runtime.
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from analytical_validation.api.runtime import limit_threads, worker_configuration  # noqa: E402
+from analytical_validation.api.warm_up import warm_up  # noqa: E402
+
+configuration = worker_configuration()
+
+workers = configuration.workers
+pythonpath = 'src'
+
+
+def when_ready(server):
+    server.log.info("%s workers with %s BLAS threads each on %s cores", server.cfg.workers, configuration.threads,
+                    configuration.cores)
+
+
+def post_fork(server, worker):
+    os.environ['VALIDAWAREE_BLAS_THREADS'] = str(configuration.threads)
+    # Read by the job queue of the worker, which shares the cores with the other workers
+    os.environ['VALIDAWAREE_WORKERS'] = str(server.cfg.workers)
+    limit_threads(configuration.threads)
+    server.log.info("Worker %s warmed up in %.3fs", worker.pid, warm_up())
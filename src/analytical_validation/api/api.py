@@ -1,71 +1,218 @@
-import json
-
-from flask_restful import Resource, reqparse
+from flask import Response, request, stream_with_context
+from flask_restful import Resource
 
+from analytical_validation.api.errors import ERROR_MESSAGES, error_response
+from analytical_validation.api.jobs import JobQueue
+from analytical_validation.api.request_body import job_validator, linearity_batch_validator, load_data, read_body
+from analytical_validation.api.result_cache import ResultCache, canonical_key
+from analytical_validation.api.serialization import PACKED_ARRAYS, dumps, field_statistics, linearity_result, \
+    pack_result, parse_fields, select_fields
+from analytical_validation.api.warm_up import is_ready, start_warm_up
 from analytical_validation.data_handler.data_handler import DataHandler
-from analytical_validation.exceptions import NegativeValue, DataNotSymmetric, DataNotListOfLists, \
-    DataNotList, ValueNotValid
+from analytical_validation.exceptions import RequestBodyNotValid
+from analytical_validation.instrumentation import StageTimer, timer_registry
 from analytical_validation.validators.linearity_validator import LinearityValidator
 
-parser = reqparse.RequestParser()
-parser.add_argument('analytical_data')
-parser.add_argument('concentration_data')
+MALFORMED_CURVE_MESSAGE = "There is something wrong with your values! Check and try again."
+NDJSON_MIMETYPE = 'application/x-ndjson'
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4'
+# Values of the timings parameter asking for the timings section
+TIMINGS_VALUES = ('1', 'true')
+# Curves validated together by each vectorized pass of a streamed batch
+STREAM_CHUNK_SIZE = 64
+
+result_cache = ResultCache.from_environment()
+job_queue = JobQueue.from_environment()
+
+
+def response_result(result):
+    """The results of a curve, with packed arrays when the request asks for them with arrays=base64."""
+    return pack_result(result) if request.args.get('arrays') == PACKED_ARRAYS else result
+
+
+def linearity_batch_item(batch_result, index):
+    """
+    Results of one curve of a batch, with the same sections of the Linearity response.
+    :param batch_result: The validated curves.
+    :type batch_result: LinearityBatchResult
+    :param index: Index of the curve in the batch.
+    :type index: int
+    :rtype: dict
+    """
+    curve = batch_result.curve(index)
+    return {
+        'regression_coefficients': {'intercept': curve['intercept'],
+                                    'insignificant_intercept': curve['insignificant_intercept'],
+                                    'slope': curve['slope'],
+                                    'significant_slope': curve['significant_slope'],
+                                    'r_squared': curve['r_squared'],
+                                    'valid_regression': curve['valid_regression_model']},
+        'regression_anova': {'sum_of_squares_model': curve['sum_of_squares_model'],
+                             'sum_of_squares_residues': curve['sum_of_squares_resid'],
+                             'sum_of_squares_total': curve['sum_of_squares_total'],
+                             'degrees_of_freedom_model': curve['degrees_of_freedom_model'],
+                             'degrees_of_freedom_residues': curve['degrees_of_freedom_residues'],
+                             'degrees_of_freedom_total': curve['degrees_of_freedom_total'],
+                             'mean_squared_error_model': curve['mean_squared_error_model'],
+                             'mean_squared_error_residues': curve['mean_squared_error_residues'],
+                             'anova_f_value': curve['anova_f_value'],
+                             'anova_f_pvalue': curve['anova_f_pvalue']},
+        'cleaned_data': {'outliers': batch_result.outliers[index],
+                         'cleaned_analytical_data': batch_result.cleaned_analytical_data[index],
+                         'cleaned_concentration_data': batch_result.cleaned_concentration_data[index]},
+        'shapiro_pvalue': curve['shapiro_pvalue'],
+        'breusch_pagan_pvalue': curve['breusch_pagan_pvalue'],
+        'linearity_is_valid': curve['linearity_is_valid'],
+        'regression_residues': batch_result.regression_residues(index),
+        'is_normal_distribution': curve['is_normal_distribution'],
+        'is_homoscedastic': curve['is_homoscedastic'],
+        'durbin_watson_value': curve['durbin_watson_value'],
+        'status': 201}
+
+
+def validate_linearity_batch(curves, alpha=0.05):
+    """
+    Validate the curves of a batch with one vectorized pass, keeping the errors of each curve apart.
+    :param curves: Curves with the analytical_data and concentration_data of each one.
+    :type curves: list[dict]
+    :param alpha: Significance (default value = 0.05)
+    :type alpha: float
+    :return: The results or the error of each curve, in the order of the curves.
+    :rtype: list[dict]
+    """
+    results = [None] * len(curves)
+    checked_curves = []
+    checked_index = []
+    for index, curve in enumerate(curves):
+        try:
+            checked_curves.append(DataHandler(load_data(curve['analytical_data']),
+                                              load_data(curve['concentration_data'])).handle_data())
+            checked_index.append(index)
+        except tuple(ERROR_MESSAGES) as exception:
+            results[index] = error_response(exception)
+        except (KeyError, TypeError, ValueError):
+            results[index] = {"TypeError": {"body": MALFORMED_CURVE_MESSAGE, "status": 400}}
+    if checked_curves:
+        batch_result = LinearityValidator.validate_many(checked_curves, alpha)
+        for position, index in enumerate(checked_index):
+            results[index] = linearity_batch_item(batch_result, position)
+    return results
+
+
+def stream_linearity_batch(curves, alpha=0.05, chunk_size=STREAM_CHUNK_SIZE, packed=False):
+    """
+    Validate a batch chunk by chunk, yielding one NDJSON line per curve as soon as its chunk is validated, so the
+    first results are sent before the whole batch is done and only one chunk of results is held in memory.
+    :param curves: Curves with the analytical_data and concentration_data of each one.
+    :type curves: list[dict]
+    :param alpha: Significance (default value = 0.05)
+    :type alpha: float
+    :param chunk_size: Number of curves validated by each vectorized pass.
+    :type chunk_size: int
+    :param packed: Send the residues and the cleaned data as packed arrays.
+    :type packed: bool
+    :return: The result or the error of each curve as a line of JSON, in the order of the curves.
+    :rtype: Iterator[bytes]
+    """
+    for start in range(0, len(curves), chunk_size):
+        for result in validate_linearity_batch(curves[start:start + chunk_size], alpha):
+            yield dumps(pack_result(result) if packed else result) + b'\n'
+
+
+def linearity_job(body, progress):
+    """
+    Job validating a curve, given the body of a Linearity request.
+    :param body: The body, with the analytical_data, the concentration_data and an optional alpha.
+    :type body: dict
+    :param progress: Called with the fraction of the job done.
+    :type progress: callable
+    :return: The results of the curve.
+    :rtype: dict
+    """
+    alpha = body.get('alpha', 0.05)
+    checked_analytical_data, checked_concentration_data = DataHandler(
+        load_data(body['analytical_data']), load_data(body['concentration_data'])).handle_data()
+    linearity_validator = LinearityValidator(checked_analytical_data, checked_concentration_data, alpha)
+    linearity_validator.validate_linearity()
+    return linearity_result(linearity_validator)
+
+
+def linearity_batch_job(body, progress, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Job validating many curves, given the body of a LinearityBatch request, reporting the progress after each chunk.
+    :param body: The body, with the curves and an optional alpha.
+    :type body: dict
+    :param progress: Called with the fraction of the curves validated.
+    :type progress: callable
+    :param chunk_size: Number of curves validated by each vectorized pass.
+    :type chunk_size: int
+    :return: The results or the error of each curve.
+    :rtype: dict
+    """
+    curves = body['curves']
+    results = []
+    for start in range(0, len(curves), chunk_size):
+        results.extend(validate_linearity_batch(curves[start:start + chunk_size], body.get('alpha', 0.05)))
+        progress(len(results) / len(curves))
+    return {'results': results, 'status': 200}
+
+
+JOB_FUNCTIONS = {'linearity': linearity_job, 'linearity_batch': linearity_batch_job}
 
 
 class Linearity(Resource):
 
     def post(self):
-        args = parser.parse_args()
-        print(args)
-        input_analytical_data = json.loads(args['analytical_data'])
-        input_concentration_data = json.loads(args['concentration_data'])
+        """
+        Validate the linearity of a curve. The body holds the analytical_data and concentration_data as lists or JSON
+        encoded strings, and an optional "alpha", as JSON, MessagePack or form values.
+
+        The fields parameter selects the sections of the results, e.g.
+        ?fields=linearity_is_valid,regression_coefficients, and only the statistics those sections need are computed.
+
+        With ?timings=true the results hold a "timings" section, the wall time, CPU time and outcome of each stage of
+        the request and of the validation. The curve is then always validated, without the cache or the ETag.
+        """
+        stage_timer = StageTimer()
+        timed = request.args.get('timings', '').lower() in TIMINGS_VALUES
         try:
-            checked_analytical_data, checked_concentration_data = DataHandler(input_analytical_data,
-                                                                              input_concentration_data).handle_data()
-            linearity_validator = LinearityValidator(checked_analytical_data, checked_concentration_data)
-            linearity_validator.validate_linearity()
-
-            return {
-                       'regression_coefficients': {'intercept': linearity_validator.intercept,
-                                                   'insignificant_intercept': linearity_validator.insignificant_intercept,
-                                                   'slope': linearity_validator.slope,
-                                                   'significant_slope': linearity_validator.significant_slope,
-                                                   'r_squared': linearity_validator.r_squared,
-                                                   'valid_regression': linearity_validator.valid_regression_model},
-                       'regression_anova': {'sum_of_squares_model': linearity_validator.sum_of_squares_model,
-                                            'sum_of_squares_residues': linearity_validator.sum_of_squares_resid,
-                                            'sum_of_squares_total': linearity_validator.sum_of_squares_total,
-                                            'degrees_of_freedom_model': linearity_validator.degrees_of_freedom_model,
-                                            'degrees_of_freedom_residues': linearity_validator.degrees_of_freedom_residues,
-                                            'degrees_of_freedom_total': linearity_validator.degrees_of_freedom_total,
-                                            'mean_squared_error_model': linearity_validator.mean_squared_error_model,
-                                            'mean_squared_error_residues': linearity_validator.mean_squared_error_residues,
-                                            'anova_f_value': linearity_validator.anova_f_value,
-                                            'anova_f_pvalue': linearity_validator.anova_f_pvalue, },
-                       'cleaned_data': {'outliers': linearity_validator.outliers,
-                                        'cleaned_analytical_data': linearity_validator.cleaned_analytical_data,
-                                        'cleaned_concentration_data': linearity_validator.cleaned_concentration_data},
-                       'shapiro_pvalue': linearity_validator.shapiro_pvalue,
-                       'breusch_pagan_pvalue': linearity_validator.breusch_pagan_pvalue,
-                       'linearity_is_valid': linearity_validator.linearity_is_valid,
-                       'regression_residues': linearity_validator.regression_residues,
-                       'is_normal_distribution': linearity_validator.is_normal_distribution,
-                       'is_homoscedastic': linearity_validator.is_homoscedastic,
-                       'durbin_watson_value': linearity_validator.durbin_watson_value,
-                       'status': 201}, 201
-        except ValueNotValid:
-            return {"ValueNotValid": {"body": "Non number values are not valid. Check and try again.",
-                                      "status": 400}}, 400
-        except DataNotList:
-            return {"DataNotListOfLists": {"body": "The given data is not a list of lists.", "status": 400}}, 400
-        except DataNotListOfLists:
-            return {"DataNotList": {"body": "One of the input data is not a list.", "status": 400}}, 400
-        except DataNotSymmetric:
-            return {"ValueNotValid": {"body": "Non number values are not valid. Check and try again.",
-                                      "status": 400}}, 400
-        except NegativeValue:
-            return {"NegativeValue": {"body": "Negative values are not valid. Check and try again.",
-                                      "status": 400}}, 400
+            with stage_timer.stage('read_body'):
+                body = read_body(request)
+                fields = parse_fields(request.args.get('fields'))
+                alpha = body.get('alpha', 0.05)
+                input_analytical_data = load_data(body['analytical_data'])
+                input_concentration_data = load_data(body['concentration_data'])
+            with stage_timer.stage('handle_data'):
+                checked_analytical_data, checked_concentration_data = DataHandler(
+                    input_analytical_data, input_concentration_data).handle_data()
+            key = canonical_key(checked_analytical_data, checked_concentration_data, alpha)
+            # Results of some of the sections are cached apart from the complete results
+            result_key = key if fields is None else '{}-{}'.format(key, '.'.join(fields))
+            # Each representation of the results has its own entity tag
+            entity_tag = result_key if request.args.get('arrays') != PACKED_ARRAYS else \
+                '{}-{}'.format(result_key, PACKED_ARRAYS)
+            headers = {} if timed else {'ETag': '"{}"'.format(entity_tag)}
+            if not timed:
+                if entity_tag in request.if_none_match:
+                    return Response(status=304, headers=headers)
+                cached_result = result_cache.get(result_key)
+                if cached_result is None and fields is not None:
+                    cached_result = result_cache.get(key)
+                if cached_result is not None:
+                    return response_result(select_fields(cached_result, fields)), 201, headers
+            linearity_validator = LinearityValidator(checked_analytical_data, checked_concentration_data, alpha)
+            linearity_validator.validate_linearity(field_statistics(fields), stage_timer=stage_timer)
+
+            with stage_timer.stage('result'):
+                result = linearity_result(linearity_validator, fields)
+            result_cache.set(result_key, result)
+            if not timed:
+                return response_result(result), 201, headers
+            timed_result = dict(response_result(result))
+            timed_result['timings'] = stage_timer.as_list()
+            return timed_result, 201, headers
+        except tuple(ERROR_MESSAGES) as exception:
+            return error_response(exception), 400
         except AttributeError:
             return {"AttributeError": {
                 "body": "There is too few values! Check your inputs and try again.",
@@ -73,3 +220,79 @@ class Linearity(Resource):
         except TypeError:
             return {"TypeError": {"body": "There is something wrong with your values! Check and try again.",
                                   "status": 400}}, 400
+
+
+class LinearityBatch(Resource):
+
+    def post(self):
+        """
+        Validate many curves in one request, all of them at once through LinearityValidator.validate_many.
+
+        The body holds a list of curves, {"curves": [{"analytical_data": ..., "concentration_data": ...}, ...]},
+        with the data as lists or JSON encoded strings, and an optional "alpha", as JSON or MessagePack. Each item of
+        the results holds the curve results or the error of that curve, so a bad curve doesn't fail the batch. With
+        an "Accept: application/x-ndjson" header the results are streamed, one line of JSON per curve.
+        """
+        try:
+            body = read_body(request, linearity_batch_validator)
+        except RequestBodyNotValid as exception:
+            return error_response(exception), 400
+        curves = body['curves']
+        alpha = body.get('alpha', 0.05)
+        if request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE:
+            packed = request.args.get('arrays') == PACKED_ARRAYS
+            return Response(stream_with_context(stream_linearity_batch(curves, alpha, packed=packed)),
+                            mimetype=NDJSON_MIMETYPE)
+        return {'results': [response_result(result) for result in validate_linearity_batch(curves, alpha)],
+                'status': 200}, 200
+
+
+class Jobs(Resource):
+
+    def post(self):
+        """
+        Queue a validation job, answering at once with its id. The body is the body of the /linearity or the
+        /linearity/batch request run by the job, with a "kind", "linearity" or "linearity_batch".
+        """
+        try:
+            body = read_body(request, job_validator)
+        except RequestBodyNotValid as exception:
+            return error_response(exception), 400
+        job_id = job_queue.submit(JOB_FUNCTIONS[body['kind']], body)
+        return {'id': job_id, 'state': 'queued', 'status': 202}, 202, {'Location': '/jobs/{}'.format(job_id)}
+
+
+class Job(Resource):
+
+    def get(self, job_id):
+        """State, progress from 0 to 1, and result or error of a job."""
+        job = job_queue.get(job_id)
+        if job is None:
+            return {"JobNotFound": {"body": "There is no job with this id.", "status": 404}}, 404
+        job['status'] = 200
+        return job, 200
+
+
+class Readiness(Resource):
+
+    def get(self):
+        """
+        Whether this worker is warmed up and can take traffic. A worker not warmed up by its start hook starts its
+        warm-up on the first check.
+        """
+        if not is_ready():
+            start_warm_up()
+            return {"WorkerNotReady": {"body": "The worker is warming up. Try again later.", "status": 503}}, 503
+        return {'ready': True, 'status': 200}, 200
+
+
+class Metrics(Resource):
+
+    def get(self):
+        """
+        Histograms of the stage timings of the validations served by this worker, in the Prometheus text format, or
+        as JSON with an "Accept: application/json" header.
+        """
+        if request.accept_mimetypes.best_match(['text/plain', 'application/json']) == 'application/json':
+            return {'stages': timer_registry.snapshot(), 'status': 200}, 200
+        return Response(timer_registry.export(), mimetype=PROMETHEUS_MIMETYPE)
@@ -3,7 +3,8 @@ from flask_restful import Api
 from flask_cors import CORS
 from flask_swagger_ui import get_swaggerui_blueprint
 
-from analytical_validation.api.api import Linearity
+from analytical_validation.api.api import Job, Jobs, Linearity, LinearityBatch, Metrics, Readiness
+from analytical_validation.api.serialization import output_json
 
 
 def create_app():
@@ -25,8 +26,14 @@ app.register_blueprint(SWAGGERUI_BLUEPRINT, url_prefix=SWAGGER_URL)
 
 CORS(app)
 api = Api(app)
+api.representation('application/json')(output_json)
 
 api.add_resource(Linearity, '/linearity')
+api.add_resource(LinearityBatch, '/linearity/batch')
+api.add_resource(Jobs, '/jobs')
+api.add_resource(Job, '/jobs/<string:job_id>')
+api.add_resource(Readiness, '/ready')
+api.add_resource(Metrics, '/metrics')
 
 if __name__ == '__main__':
     app.run()
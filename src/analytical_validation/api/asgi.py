@@ -0,0 +1,184 @@
+"""
+ASGI serving mode: requests are accepted on an event loop and handled by the Flask app in a bounded process pool,
+so a slow curve only holds one of the pool processes and every core serves requests. Run it with any ASGI server:
+
+    uvicorn --app-dir src analytical_validation.api.asgi:app
+
+The responses are built in the pool processes and sent whole, so the NDJSON results of POST /linearity/batch arrive
+in one body instead of line by line; serve the WSGI app, e.g. with gunicorn, to stream them.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from werkzeug.test import EnvironBuilder, run_wsgi_app
+
+from analytical_validation.api.runtime import configured_threads, limit_threads
+from analytical_validation.api.serialization import dumps
+
+DEFAULT_TIMEOUT = 30.0
+QUEUE_FULL = {"QueueFull": {"body": "The server is busy. Try again later.", "status": 503}}
+TIMEOUT = {"Timeout": {"body": "The validation took too long. Try a smaller request or a job.", "status": 504}}
+WORKERS_STOPPED = {"WorkersStopped": {"body": "The server workers stopped. Try again.", "status": 503}}
+# The loop running the coroutine; Python 3.6 only has get_event_loop, which returns it from a coroutine too
+_running_loop = getattr(asyncio, 'get_running_loop', asyncio.get_event_loop)
+
+
+def preload():
+    """
+    Cap the BLAS threads, import the Flask app and warm it up once, when a pool process starts.
+    """
+    limit_threads(configured_threads())
+    import analytical_validation.api.app  # noqa: F401
+    from analytical_validation.api.warm_up import warm_up
+    warm_up()
+
+
+def handle_request(method, path, query_string, headers, body):
+    """
+    Handle a request with the Flask app, in a pool process. The response is buffered, a streamed response included,
+    as it is sent back to the event loop whole.
+    :return status: The status code.
+    :rtype status: int
+    :return headers: The response headers.
+    :rtype headers: list[tuple[str, str]]
+    :return body: The response body.
+    :rtype body: bytes
+    """
+    from analytical_validation.api.app import app
+    environ = EnvironBuilder(method=method, path=path, query_string=query_string, headers=headers,
+                             data=body).get_environ()
+    app_iter, status, response_headers = run_wsgi_app(app, environ, buffered=True)
+    try:
+        response_body = b''.join(app_iter)
+    finally:
+        if hasattr(app_iter, 'close'):
+            app_iter.close()
+    return int(status.split(' ', 1)[0]), list(response_headers), response_body
+
+
+class AsyncValidationApp(object):
+    """
+    ASGI application dispatching every request to a ProcessPoolExecutor whose processes preload and warm up the
+    Flask app.
+
+    At most max_pending requests are running or waiting for a pool process, the others are answered at once with
+    503. A request running longer than timeout seconds is answered with 504; its pool process finishes the work and
+    the result is dropped, the request counting against max_pending until then. When a pool process dies, e.g.
+    killed for lack of memory, its requests are answered with 503 and the next request starts a new pool.
+    """
+
+    def __init__(self, max_workers=None, max_pending=None, timeout=DEFAULT_TIMEOUT):
+        """
+        :param max_workers: Number of pool processes (default value = None, the number of processors).
+        :type max_workers: int
+        :param max_pending: Number of requests running or queued (default value = None, 4 per pool process).
+        :type max_pending: int
+        :param timeout: Seconds a request may take, None for no limit.
+        :type timeout: float
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = 4 * self.max_workers if max_pending is None else max_pending
+        self.timeout = timeout
+        self.pending = 0
+        self.executor = None
+        # The pending requests are released by the threads of the pool
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls, environ=None):
+        """
+        Application configured by the VALIDAWAREE_ASGI_WORKERS, VALIDAWAREE_ASGI_QUEUE_DEPTH and
+        VALIDAWAREE_ASGI_TIMEOUT variables, a timeout of 0 meaning no limit.
+        :rtype: AsyncValidationApp
+        """
+        environ = os.environ if environ is None else environ
+        max_workers = environ.get('VALIDAWAREE_ASGI_WORKERS')
+        max_pending = environ.get('VALIDAWAREE_ASGI_QUEUE_DEPTH')
+        timeout = float(environ.get('VALIDAWAREE_ASGI_TIMEOUT', DEFAULT_TIMEOUT))
+        return cls(None if max_workers is None else int(max_workers),
+                   None if max_pending is None else int(max_pending),
+                   timeout or None)
+
+    def start(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(self.max_workers, initializer=preload)
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+            self.executor = None
+
+    def reset(self, executor):
+        """Drop a broken pool, so the next request starts a new one."""
+        if self.executor is executor:
+            # The processes of a broken pool are already stopped
+            self.executor = None
+            executor.shutdown(wait=False)
+
+    def _release(self, future):
+        with self._lock:
+            self.pending -= 1
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+        elif scope['type'] == 'http':
+            await self.http(scope, receive, send)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                self.start()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def http(self, scope, receive, send):
+        body = await self.read_body(receive)
+        if self.pending >= self.max_pending:
+            await self.send_response(send, 503, [('Content-Type', 'application/json')], dumps(QUEUE_FULL))
+            return
+        self.start()
+        executor = self.executor
+        headers = [(name.decode('latin-1'), value.decode('latin-1')) for name, value in scope['headers']]
+        try:
+            future = executor.submit(handle_request, scope['method'], scope['path'],
+                                     scope.get('query_string', b'').decode('latin-1'), headers, body)
+            with self._lock:
+                self.pending += 1
+            # Released when the pool process is done, after a timeout too
+            future.add_done_callback(self._release)
+            status, response_headers, response_body = await asyncio.wait_for(
+                asyncio.wrap_future(future, loop=_running_loop()), self.timeout)
+        except asyncio.TimeoutError:
+            status, response_headers, response_body = 504, [('Content-Type', 'application/json')], dumps(TIMEOUT)
+        except BrokenProcessPool:
+            self.reset(executor)
+            status, response_headers, response_body = 503, [('Content-Type', 'application/json')], \
+                dumps(WORKERS_STOPPED)
+        await self.send_response(send, status, response_headers, response_body)
+
+    @staticmethod
+    async def read_body(receive):
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+            more_body = message.get('more_body', False)
+        return b''.join(chunks)
+
+    @staticmethod
+    async def send_response(send, status, headers, body):
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers]})
+        await send({'type': 'http.response.body', 'body': body})
+
+
+app = AsyncValidationApp.from_environment()
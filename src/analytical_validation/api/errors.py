@@ -0,0 +1,23 @@
+from analytical_validation.exceptions import NegativeValue, DataNotSymmetric, DataNotListOfLists, \
+    DataNotList, ValueNotValid, RequestBodyNotValid, FieldNotValid
+
+ERROR_MESSAGES = {
+    ValueNotValid: "Non number values are not valid. Check and try again.",
+    NegativeValue: "Negative values are not valid. Check and try again.",
+    DataNotList: "One of the input data is not a list.",
+    DataNotListOfLists: "The given data is not a list of lists.",
+    DataNotSymmetric: "The given data is not symmetric. Check if there's a value missing.",
+    RequestBodyNotValid: "The request body is not valid. Check and try again.",
+    FieldNotValid: "One of the fields is not valid. Check and try again.",
+}
+INTERNAL_ERROR = {"InternalError": {"body": "Something went wrong on the server. Try again later.", "status": 500}}
+
+
+def error_response(exception):
+    """
+    Error body of an exception, keyed by the exception name like the Linearity errors.
+    :param exception: One of the ERROR_MESSAGES exceptions.
+    :type exception: Exception
+    :rtype: dict
+    """
+    return {type(exception).__name__: {"body": ERROR_MESSAGES[type(exception)], "status": 400}}
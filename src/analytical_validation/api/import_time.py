@@ -0,0 +1,133 @@
+"""
+Import time of the API, measured by python -X importtime in a new interpreter:
+
+    python -m analytical_validation.api.import_time --top 20
+
+lists the modules by cumulative import time, and exits with status 1 when the app takes longer than the budget to
+import or imports one of the DEFERRED_MODULES, which are imported on first use or by the warm-up of the workers.
+"""
+import argparse
+import os
+import subprocess
+import sys
+from collections import namedtuple
+
+import analytical_validation
+
+DEFAULT_MODULE = 'analytical_validation.api.app'
+# Seconds, about twice the import time of the app on a laptop
+IMPORT_TIME_BUDGET = 1.0
+DEFERRED_MODULES = ('pandas', 'scipy.special', 'scipy.stats', 'statsmodels')
+
+ModuleImportTime = namedtuple('ModuleImportTime', ['module', 'self_time', 'cumulative_time', 'depth'])
+
+
+def parse_import_time(report):
+    """
+    Read the report written by python -X importtime.
+
+    Example:
+        >>> parse_import_time('import time:       521 |     178518 |   flask')
+        [ModuleImportTime(module='flask', self_time=0.000521, cumulative_time=0.178518, depth=1)]
+
+    :param report: The report, one line per imported module.
+    :type report: str
+    :return: Import time in seconds of each module, in the order of the report.
+    :rtype: list[ModuleImportTime]
+    """
+    import_times = []
+    for line in report.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        # The header, or a line of another program
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        module = fields[2].rstrip()
+        depth = (len(module) - len(module.lstrip()) - 1) // 2
+        import_times.append(ModuleImportTime(module.strip(), int(fields[0]) / 1e6, int(fields[1]) / 1e6, depth))
+    return import_times
+
+
+def measure_import_time(module=DEFAULT_MODULE, python=sys.executable):
+    """
+    Import the module in a new interpreter.
+    :param module: The absolute name of the module (default value = DEFAULT_MODULE).
+    :type module: str
+    :param python: The Python interpreter (default value = sys.executable).
+    :type python: str
+    :return: Import time in seconds of each module imported by the interpreter.
+    :rtype: list[ModuleImportTime]
+    """
+    environ = dict(os.environ)
+    source_path = os.path.dirname(os.path.dirname(os.path.abspath(analytical_validation.__file__)))
+    environ['PYTHONPATH'] = os.pathsep.join(path for path in (source_path, environ.get('PYTHONPATH')) if path)
+    process = subprocess.run([python, '-X', 'importtime', '-c', 'import {}'.format(module)], env=environ,
+                             stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    return parse_import_time(process.stderr)
+
+
+def check_import_time(import_times, module=DEFAULT_MODULE, budget=IMPORT_TIME_BUDGET,
+                      deferred_modules=DEFERRED_MODULES):
+    """
+    Regressions of the import time.
+
+    Example:
+        >>> check_import_time(measure_import_time())
+        []
+
+    :param import_times: The import times, from measure_import_time.
+    :type import_times: list[ModuleImportTime]
+    :param module: The absolute name of the measured module (default value = DEFAULT_MODULE).
+    :type module: str
+    :param budget: Seconds the module may take to import (default value = IMPORT_TIME_BUDGET).
+    :type budget: float
+    :param deferred_modules: Modules, and their submodules, that must not be imported with it (default value =
+    DEFERRED_MODULES).
+    :type deferred_modules: tuple[str]
+    :return: A message for each regression, an empty list when there's none.
+    :rtype: list[str]
+    """
+    problems = []
+    cumulative_time = sum(import_time.cumulative_time for import_time in import_times
+                          if import_time.module == module and import_time.depth == 0)
+    if cumulative_time > budget:
+        problems.append('{} takes {:.3f}s to import, over the budget of {:.3f}s'.format(module, cumulative_time,
+                                                                                       budget))
+    for deferred_module in deferred_modules:
+        if any(import_time.module == deferred_module or import_time.module.startswith(deferred_module + '.')
+               for import_time in import_times):
+            problems.append('{} imports {}, which should be imported on first use'.format(module, deferred_module))
+    return problems
+
+
+def format_report(import_times, top=20):
+    """
+    :return: The top modules by cumulative import time, one per line.
+    :rtype: str
+    """
+    lines = ['{:>10} {:>10}  module'.format('self [s]', 'total [s]')]
+    for import_time in sorted(import_times, key=lambda import_time: import_time.cumulative_time, reverse=True)[:top]:
+        lines.append('{:>10.4f} {:>10.4f}  {}{}'.format(import_time.self_time, import_time.cumulative_time,
+                                                        '  ' * import_time.depth, import_time.module))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Report the import time of the API and check it against a budget.')
+    parser.add_argument('module', nargs='?', default=DEFAULT_MODULE, help='module to import (default: %(default)s)')
+    parser.add_argument('--budget', type=float,
+                        default=float(os.environ.get('VALIDAWAREE_IMPORT_BUDGET', IMPORT_TIME_BUDGET)),
+                        help='seconds the module may take to import, VALIDAWAREE_IMPORT_BUDGET (default: %(default)s)')
+    parser.add_argument('--top', type=int, default=20, help='number of modules listed (default: %(default)s)')
+    arguments = parser.parse_args(argv)
+    import_times = measure_import_time(arguments.module)
+    print(format_report(import_times, arguments.top))
+    problems = check_import_time(import_times, arguments.module, arguments.budget)
+    for problem in problems:
+        print(problem, file=sys.stderr)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
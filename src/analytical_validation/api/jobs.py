@@ -0,0 +1,238 @@
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+
+from analytical_validation.api.errors import ERROR_MESSAGES, INTERNAL_ERROR, error_response
+from analytical_validation.api.request_body import loads
+from analytical_validation.api.runtime import available_cores, configured_threads, limit_threads
+from analytical_validation.api.serialization import dumps
+
+DEFAULT_PATH = os.path.join(tempfile.gettempdir(), 'validawaree_jobs.sqlite')
+QUEUED, RUNNING, DONE, FAILED = 'queued', 'running', 'done', 'failed'
+WORKERS_STOPPED = {"WorkersStopped": {"body": "The job workers stopped. Try again.", "status": 503}}
+ORPHANED = {"JobOrphaned": {"body": "The server running the job stopped. Try again.", "status": 503}}
+
+
+def process_is_alive(pid):
+    """
+    :return: Whether a process with this id is running on this machine.
+    :rtype: bool
+    """
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class JobStore(object):
+    """
+    State of the jobs, kept in a sqlite database so the results outlive the worker that ran them and are seen by
+    every gunicorn worker.
+
+    Each job keeps the id of the process that queued it. The queued and running jobs of processes that are no longer
+    running, e.g. after a restart, would never finish, so they are marked as failed when the store is opened.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, fail_orphaned_jobs=True):
+        """
+        :param path: Path of the sqlite database.
+        :type path: str
+        :param fail_orphaned_jobs: Whether to mark the jobs of stopped processes as failed (default value = True).
+        :type fail_orphaned_jobs: bool
+        """
+        self.path = path
+        with self.connect() as connection:
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('CREATE TABLE IF NOT EXISTS jobs (id TEXT PRIMARY KEY, kind TEXT NOT NULL, '
+                               'state TEXT NOT NULL, progress REAL NOT NULL, result TEXT, error TEXT, '
+                               'created REAL NOT NULL, updated REAL NOT NULL, owner INTEGER)')
+            # Stores created before the owner column
+            if 'owner' not in [row[1] for row in connection.execute('PRAGMA table_info(jobs)')]:
+                connection.execute('ALTER TABLE jobs ADD COLUMN owner INTEGER')
+        if fail_orphaned_jobs:
+            self.fail_orphaned_jobs()
+
+    @contextmanager
+    def connect(self):
+        # A connection per operation, sqlite connections can't be shared by processes
+        connection = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def create(self, kind):
+        """
+        Store a new queued job.
+        :param kind: Name of the job function.
+        :type kind: str
+        :return: The id of the job.
+        :rtype: str
+        """
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self.connect() as connection:
+            connection.execute('INSERT INTO jobs (id, kind, state, progress, created, updated, owner) '
+                               'VALUES (?, ?, ?, ?, ?, ?, ?)', (job_id, kind, QUEUED, 0.0, now, now, os.getpid()))
+        return job_id
+
+    def fail_orphaned_jobs(self):
+        """
+        Mark as failed the queued and running jobs whose process is not running.
+        :return: The ids of the failed jobs.
+        :rtype: list[str]
+        """
+        with self.connect() as connection:
+            rows = connection.execute('SELECT id, owner FROM jobs WHERE state IN (?, ?)', (QUEUED, RUNNING)).fetchall()
+        orphaned_ids = [job_id for job_id, owner in rows if owner is None or not process_is_alive(owner)]
+        for job_id in orphaned_ids:
+            self.update(job_id, FAILED, error=ORPHANED)
+        return orphaned_ids
+
+    def update(self, job_id, state, progress=None, result=None, error=None):
+        """Store the state of a job, its progress from 0 to 1 and its result or error."""
+        with self.connect() as connection:
+            connection.execute('UPDATE jobs SET state = ?, progress = COALESCE(?, progress), result = ?, error = ?, '
+                               'updated = ? WHERE id = ?',
+                               (state, progress, None if result is None else dumps(result).decode(),
+                                None if error is None else dumps(error).decode(), time.time(), job_id))
+
+    def get(self, job_id):
+        """
+        :return: The job, None when there's no job with that id.
+        :rtype: dict
+        """
+        with self.connect() as connection:
+            row = connection.execute('SELECT id, kind, state, progress, result, error, created, updated FROM jobs '
+                                     'WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        return {'id': row[0], 'kind': row[1], 'state': row[2], 'progress': row[3],
+                'result': None if row[4] is None else loads(row[4]),
+                'error': None if row[5] is None else loads(row[5]),
+                'created': row[6], 'updated': row[7]}
+
+
+def run_job(path, job_id, function, payload):
+    """
+    Run a job in a worker process, storing its progress and its result, or the error that stopped it.
+    :param path: Path of the JobStore database.
+    :type path: str
+    :param job_id: The id of the job.
+    :type job_id: str
+    :param function: Module level function called with the payload and a progress callback, returning the result.
+    :type function: callable
+    :param payload: The input of the job.
+    :type payload: dict
+    """
+    job_store = JobStore(path, fail_orphaned_jobs=False)
+    job_store.update(job_id, RUNNING)
+
+    def progress(fraction):
+        job_store.update(job_id, RUNNING, progress=fraction)
+
+    try:
+        result = function(payload, progress)
+    except tuple(ERROR_MESSAGES) as exception:
+        job_store.update(job_id, FAILED, error=error_response(exception))
+    except Exception:
+        job_store.update(job_id, FAILED, error=INTERNAL_ERROR)
+    else:
+        job_store.update(job_id, DONE, progress=1.0, result=result)
+
+
+class JobQueue(object):
+    """Jobs run on a local process pool, their state kept in a JobStore."""
+
+    def __init__(self, path=DEFAULT_PATH, max_workers=1):
+        """
+        :param path: Path of the JobStore database.
+        :type path: str
+        :param max_workers: Number of worker processes (default value = 1).
+        :type max_workers: int
+        """
+        self.job_store = JobStore(path)
+        self.max_workers = max_workers
+        self._executor = None
+
+    @classmethod
+    def from_environment(cls, environ=None):
+        """
+        Queue configured by the VALIDAWAREE_JOBS_PATH and VALIDAWAREE_JOB_WORKERS variables. Each gunicorn worker
+        has its own queue, so by default the VALIDAWAREE_WORKERS workers share the cores between their pools.
+        :rtype: JobQueue
+        """
+        environ = os.environ if environ is None else environ
+        max_workers = environ.get('VALIDAWAREE_JOB_WORKERS')
+        if max_workers is None:
+            max_workers = max(available_cores() // int(environ.get('VALIDAWAREE_WORKERS', 1)), 1)
+        return cls(environ.get('VALIDAWAREE_JOBS_PATH') or DEFAULT_PATH, int(max_workers))
+
+    @property
+    def executor(self):
+        # Started on the first job, after the gunicorn workers are forked
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.max_workers, initializer=limit_threads,
+                                                 initargs=(configured_threads(),))
+        return self._executor
+
+    def submit(self, function, payload):
+        """
+        Queue a job.
+
+        Example:
+            >>> job_id = job_queue.submit(linearity_job, {'analytical_data': [[0.1]], 'concentration_data': [[0.01]]})
+            >>> job_queue.get(job_id)['state']
+
+        :param function: Module level function called with the payload and a progress callback, returning the result.
+        :type function: callable
+        :param payload: The input of the job.
+        :type payload: dict
+        :return: The id of the job.
+        :rtype: str
+        """
+        job_id = self.job_store.create(function.__name__)
+        executor = self.executor
+        try:
+            future = executor.submit(run_job, self.job_store.path, job_id, function, payload)
+        except BrokenProcessPool:
+            # A worker process died, e.g. killed for lack of memory; the next job starts a new pool
+            self.job_store.update(job_id, FAILED, error=WORKERS_STOPPED)
+            self.reset()
+            return job_id
+        future.add_done_callback(lambda future: self._job_done(job_id, executor, future))
+        return job_id
+
+    def _job_done(self, job_id, executor, future):
+        # run_job stores its own errors, so an exception here means the pool broke while the job was queued or running
+        if future.cancelled() or future.exception() is None:
+            return
+        if self._executor is executor:
+            # The processes of a broken pool are already stopped
+            self._executor = None
+        self.job_store.update(job_id, FAILED, error=WORKERS_STOPPED)
+
+    def get(self, job_id):
+        """
+        :return: The job, None when there's no job with that id.
+        :rtype: dict
+        """
+        return self.job_store.get(job_id)
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait)
+            self._executor = None
+
+    def reset(self):
+        """Drop a broken pool, so the next job starts a new one."""
+        self.shutdown(wait=False)
@@ -0,0 +1,100 @@
+import json
+
+import jsonschema
+
+from analytical_validation.exceptions import RequestBodyNotValid
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+MSGPACK_MIMETYPES = ('application/msgpack', 'application/x-msgpack')
+
+# Data sets are sent as JSON lists, or as JSON encoded strings of them by the older clients. Only the envelope is
+# checked by the schemas, the values are checked by DataHandler in one vectorized pass.
+_DATA_SETS_SCHEMA = {'type': ['array', 'string']}
+_ALPHA_SCHEMA = {'type': 'number', 'exclusiveMinimum': 0, 'exclusiveMaximum': 1}
+LINEARITY_SCHEMA = {
+    'type': 'object',
+    'properties': {'analytical_data': _DATA_SETS_SCHEMA,
+                   'concentration_data': _DATA_SETS_SCHEMA,
+                   'alpha': _ALPHA_SCHEMA},
+    'required': ['analytical_data', 'concentration_data'],
+}
+LINEARITY_BATCH_SCHEMA = {
+    'type': 'object',
+    # A malformed curve is an error of that curve only, not of the batch
+    'properties': {'curves': {'type': 'array'},
+                   'alpha': _ALPHA_SCHEMA},
+    'required': ['curves'],
+}
+# A job holds the body of the resource that runs it and the kind of the job
+JOB_SCHEMA = {'oneOf': [{'allOf': [schema, {'properties': {'kind': {'const': kind}}, 'required': ['kind']}]}
+                        for kind, schema in (('linearity', LINEARITY_SCHEMA),
+                                             ('linearity_batch', LINEARITY_BATCH_SCHEMA))]}
+
+# Validators are built once, at import
+linearity_validator = jsonschema.Draft7Validator(LINEARITY_SCHEMA)
+linearity_batch_validator = jsonschema.Draft7Validator(LINEARITY_BATCH_SCHEMA)
+job_validator = jsonschema.Draft7Validator(JOB_SCHEMA)
+
+
+def loads(data):
+    """
+    Decode JSON with orjson when installed, with the json module otherwise.
+    :param data: The JSON document.
+    :type data: bytes or str
+    :raises RequestBodyNotValid: When the data is not valid JSON.
+    """
+    try:
+        if orjson is not None:
+            return orjson.loads(data)
+        return json.loads(data)
+    except ValueError:
+        raise RequestBodyNotValid()
+
+
+def load_data(data):
+    """Input data sent either as a JSON list or as a JSON encoded string of it."""
+    return loads(data) if isinstance(data, str) else data
+
+
+def read_body(request, schema_validator=linearity_validator):
+    """
+    Read and check the body of a request, parsing it only once.
+
+    The body is read as MessagePack when its content type is application/msgpack, as JSON when its content type is
+    application/json and from the form values otherwise, the way reqparse read it before.
+
+    Example:
+        >>> body = read_body(flask.request)
+        >>> analytical_data = load_data(body['analytical_data'])
+
+    :param request: The Flask request.
+    :type request: flask.Request
+    :param schema_validator: Validator of the body schema (default value = linearity_validator).
+    :type schema_validator: jsonschema.Draft7Validator
+    :return: The body.
+    :rtype: dict
+    :raises RequestBodyNotValid: When the body can't be decoded or doesn't match the schema.
+    """
+    if request.mimetype in MSGPACK_MIMETYPES:
+        if msgpack is None:
+            raise RequestBodyNotValid()
+        try:
+            body = msgpack.unpackb(request.get_data(cache=False), raw=False)
+        except (ValueError, msgpack.UnpackException):
+            raise RequestBodyNotValid()
+    elif request.is_json:
+        body = loads(request.get_data(cache=False))
+    else:
+        body = request.values.to_dict()
+    if not schema_validator.is_valid(body):
+        raise RequestBodyNotValid()
+    return body
@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy
+
+from analytical_validation.api.serialization import dumps
+from analytical_validation.data_handler.data_handler import ragged_data_sets
+
+# Changed whenever the results of the same input change, so stale entries of the disk tier are never served
+CACHE_VERSION = b'linearity-1'
+DEFAULT_MAX_SIZE = 1024
+DEFAULT_TTL = 3600.0
+# Writes of a process to the disk tier between two purges of its expired and extra results
+PURGE_INTERVAL = 64
+
+
+def canonical_key(analytical_data, concentration_data, alpha=0.05):
+    """
+    Content address of a validation request: a hash of the normalized input arrays and alpha.
+
+    The data sets are hashed as float64 values and int64 level offsets, so inputs that DataHandler turns into the
+    same data (1 and 1.0, "1,0" and 1.0, a list of lists or an array) share the same key.
+
+    Example:
+        >>> canonical_key([[0.188, 0.192], [0.349, 0.346]], [[0.008, 0.008], [0.016, 0.016]])
+
+    :param analytical_data: The analytical data sets, as returned by DataHandler.handle_data.
+    :type analytical_data: tuple or list[list[float]]
+    :param concentration_data: The concentration data sets, as returned by DataHandler.handle_data.
+    :type concentration_data: tuple or list[list[float]]
+    :param alpha: Significance (default value = 0.05)
+    :type alpha: float
+    :return: Hexadecimal digest, also used as the ETag of the response.
+    :rtype: str
+    """
+    digest = hashlib.blake2b(CACHE_VERSION, digest_size=16)
+    digest.update(numpy.float64(alpha).tobytes())
+    for data in (analytical_data, concentration_data):
+        values, level_offsets = ragged_data_sets(data)
+        digest.update(level_offsets.astype('<i8').tobytes())
+        digest.update(numpy.ascontiguousarray(values, dtype='<f8').tobytes())
+    return digest.hexdigest()
+
+
+class ResultCache(object):
+    """
+    Cache of validation results with an in-process LRU tier and an optional sqlite tier shared by every worker.
+
+    Entries expire ttl seconds after being stored, and the least recently used entry is evicted from memory once
+    max_size entries are held. Results read from the disk tier are promoted to memory. Every purge_interval writes
+    to the disk tier, its expired results are deleted and only the disk_size most recently stored are kept.
+    """
+
+    def __init__(self, max_size=DEFAULT_MAX_SIZE, ttl=DEFAULT_TTL, path=None, disk_size=None,
+                 purge_interval=PURGE_INTERVAL):
+        """
+        :param max_size: Number of results kept in memory, 0 disables the memory tier.
+        :type max_size: int
+        :param ttl: Seconds a result is served after being stored.
+        :type ttl: float
+        :param path: Path of the sqlite database of the disk tier (default value = None, no disk tier).
+        :type path: str
+        :param disk_size: Number of results kept on disk (default value = None, max_size or DEFAULT_MAX_SIZE when the
+        memory tier is disabled).
+        :type disk_size: int
+        :param purge_interval: Writes to the disk tier between two purges (default value = PURGE_INTERVAL).
+        :type purge_interval: int
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self.disk_size = disk_size if disk_size is not None else (max_size if max_size > 0 else DEFAULT_MAX_SIZE)
+        self.purge_interval = purge_interval
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.disk_writes = 0
+        if self.path is not None:
+            with self.connect() as connection:
+                connection.execute('PRAGMA journal_mode=WAL')
+                connection.execute('CREATE TABLE IF NOT EXISTS results '
+                                   '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)')
+                connection.execute('CREATE INDEX IF NOT EXISTS results_expires ON results (expires)')
+
+    @classmethod
+    def from_environment(cls, environ=None):
+        """
+        Cache configured by the VALIDAWAREE_CACHE_SIZE, VALIDAWAREE_CACHE_TTL, VALIDAWAREE_CACHE_PATH and
+        VALIDAWAREE_CACHE_DISK_SIZE variables.
+        :rtype: ResultCache
+        """
+        environ = os.environ if environ is None else environ
+        disk_size = environ.get('VALIDAWAREE_CACHE_DISK_SIZE')
+        return cls(int(environ.get('VALIDAWAREE_CACHE_SIZE', DEFAULT_MAX_SIZE)),
+                   float(environ.get('VALIDAWAREE_CACHE_TTL', DEFAULT_TTL)),
+                   environ.get('VALIDAWAREE_CACHE_PATH') or None,
+                   None if disk_size is None else int(disk_size))
+
+    @contextmanager
+    def connect(self):
+        # A connection per operation, sqlite connections can't be shared by forked gunicorn workers
+        connection = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def get(self, key):
+        """
+        :return: The stored result, None when missing or expired.
+        :rtype: dict
+        """
+        now = time.time()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self.entries.move_to_end(key)
+                    return entry[1]
+                del self.entries[key]
+        if self.path is None:
+            return None
+        with self.connect() as connection:
+            row = connection.execute('SELECT value, expires FROM results WHERE key = ? AND expires > ?',
+                                     (key, now)).fetchone()
+        if row is None:
+            return None
+        value = json.loads(row[0])
+        self._store(key, value, row[1])
+        return value
+
+    def set(self, key, value):
+        """Store a result in every tier."""
+        expires = time.time() + self.ttl
+        self._store(key, value, expires)
+        if self.path is None:
+            return
+        with self.lock:
+            self.disk_writes += 1
+            purge = self.disk_writes % self.purge_interval == 0
+        with self.connect() as connection:
+            connection.execute('INSERT OR REPLACE INTO results (key, value, expires) VALUES (?, ?, ?)',
+                               (key, dumps(value).decode(), expires))
+            if purge:
+                self._purge_disk(connection, time.time())
+
+    def _store(self, key, value, expires):
+        if self.max_size <= 0:
+            return
+        with self.lock:
+            self.entries[key] = (expires, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+
+    def _purge_disk(self, connection, now):
+        connection.execute('DELETE FROM results WHERE expires <= ?', (now,))
+        # Results are stored with the same ttl, so the latest to expire are the most recently stored
+        connection.execute('DELETE FROM results WHERE key NOT IN '
+                           '(SELECT key FROM results ORDER BY expires DESC LIMIT ?)', (self.disk_size,))
+
+    def purge(self):
+        """Remove the expired results of every tier, and the results over disk_size of the disk tier."""
+        now = time.time()
+        with self.lock:
+            for key in [key for key, (expires, _) in self.entries.items() if expires <= now]:
+                del self.entries[key]
+        if self.path is not None:
+            with self.connect() as connection:
+                self._purge_disk(connection, now)
+
+    def clear(self):
+        """Remove every result of every tier."""
+        with self.lock:
+            self.entries.clear()
+        if self.path is not None:
+            with self.connect() as connection:
+                connection.execute('DELETE FROM results')
@@ -0,0 +1,195 @@
+"""
+Runtime configuration of the serving processes: BLAS/OpenMP threads of each worker and number of workers.
+
+With several workers, the BLAS and OpenMP thread pools of numpy and scipy would each start one thread per core and
+oversubscribe the cores during the regressions, so each worker caps them when it starts. By default each worker has 1
+BLAS thread and there is one worker per core. A calibration run on the deploy machine:
+
+    python -m analytical_validation.api.runtime
+
+times the validation of a synthetic curve with 1, 2, 4, ... BLAS threads and prints the VALIDAWAREE_WORKERS and
+VALIDAWAREE_BLAS_THREADS that share the cores best, so the servers don't time it at each start.
+"""
+import argparse
+import importlib
+import os
+import time
+from collections import namedtuple
+
+import numpy
+
+try:
+    import threadpoolctl
+except ImportError:
+    threadpoolctl = None
+
+# Read by the BLAS and OpenMP libraries when they are loaded, and inherited by the processes started later
+THREAD_VARIABLES = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS', 'BLIS_NUM_THREADS',
+                    'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS')
+# A number of BLAS threads is kept when its speedup is at least this fraction of the threads
+EFFICIENCY_THRESHOLD = 0.75
+# Lazily imported modules used by every validation, imported by the workers when they start instead of by their first
+# request. statsmodels, scipy.stats and pandas are only imported by the requests that use them.
+WARM_UP_MODULES = ('scipy.special',)
+
+WorkerConfiguration = namedtuple('WorkerConfiguration', ['workers', 'threads', 'cores', 'timings'])
+
+
+def available_cores():
+    """
+    :return: Number of cores this process may run on.
+    :rtype: int
+    """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def limit_threads(threads=1):
+    """
+    Cap the BLAS and OpenMP threads of this process, the libraries already loaded included when threadpoolctl is
+    installed.
+
+    Example:
+        >>> limit_threads(1)
+
+    :param threads: Number of threads of each thread pool.
+    :type threads: int
+    :return: The thread pools found by threadpoolctl, an empty list without it.
+    :rtype: list[dict]
+    """
+    for variable in THREAD_VARIABLES:
+        os.environ[variable] = str(threads)
+    if threadpoolctl is None:
+        return []
+    threadpoolctl.threadpool_limits(limits=threads)
+    return threadpoolctl.threadpool_info()
+
+
+def import_modules(names=WARM_UP_MODULES):
+    """
+    Import the modules, so importing them is not part of a request.
+
+    Example:
+        >>> import_modules(WARM_UP_MODULES + ('statsmodels.api',))
+
+    :param names: The absolute names of the modules (default value = WARM_UP_MODULES).
+    :type names: tuple[str]
+    """
+    for name in names:
+        importlib.import_module(name)
+
+
+def calibration_run(levels=10, replicates=50, seed=0):
+    """Validate a synthetic curve, the workload timed by calibrate."""
+    from analytical_validation.validators.linearity_validator import LinearityValidator
+    random_generator = numpy.random.default_rng(seed)
+    concentration_data = numpy.repeat(numpy.linspace(1.0, 10.0, levels)[:, numpy.newaxis], replicates, axis=1)
+    analytical_data = 2.0 * concentration_data + 0.5 + random_generator.normal(0.0, 0.05, concentration_data.shape)
+    LinearityValidator(analytical_data.tolist(), concentration_data.tolist()).validate_linearity()
+
+
+def _best_time(function, repeats):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def calibrate(cores=None, repeats=3, workload=calibration_run):
+    """
+    Time the workload with 1, 2, 4, ... BLAS threads, up to the number of cores.
+    :param cores: Number of cores (default value = None, the available cores).
+    :type cores: int
+    :param repeats: Runs of each number of threads, the best time is kept.
+    :type repeats: int
+    :param workload: The timed function.
+    :type workload: callable
+    :return: Best time in seconds of each number of threads.
+    :rtype: dict[int, float]
+    """
+    cores = cores or available_cores()
+    thread_counts = [threads for threads in (2 ** power for power in range(cores.bit_length())) if threads <= cores]
+    # A first run loads the libraries, so they are not part of the timings
+    workload()
+    timings = {}
+    for threads in thread_counts:
+        if threadpoolctl is None and threads > 1:
+            break
+        if threadpoolctl is None:
+            timings[threads] = _best_time(workload, repeats)
+            continue
+        with threadpoolctl.threadpool_limits(limits=threads):
+            timings[threads] = _best_time(workload, repeats)
+    return timings
+
+
+def worker_configuration(cores=None, timings=None, environ=None):
+    """
+    Number of workers and BLAS threads of each worker.
+
+    The threads are the largest number of threads whose calibrated speedup is at least EFFICIENCY_THRESHOLD times the
+    threads (1 when more threads don't pay off, which is the usual case for calibration curves), and the workers
+    share the cores between them. VALIDAWAREE_WORKERS and VALIDAWAREE_BLAS_THREADS override the choice.
+
+    Example:
+        >>> configuration = worker_configuration(timings=calibrate())
+        >>> configuration.workers, configuration.threads
+
+    :param cores: Number of cores (default value = None, the available cores).
+    :type cores: int
+    :param timings: Best time of each number of threads, from calibrate (default value = None, no calibration and
+    1 thread).
+    :type timings: dict[int, float]
+    :param environ: The environment variables (default value = None, os.environ).
+    :type environ: dict
+    :rtype: WorkerConfiguration
+    """
+    environ = os.environ if environ is None else environ
+    cores = cores or available_cores()
+    timings = timings or {}
+    threads = 1
+    for thread_count, elapsed in sorted(timings.items()):
+        if timings[1] / elapsed >= EFFICIENCY_THRESHOLD * thread_count:
+            threads = thread_count
+    threads = int(environ.get('VALIDAWAREE_BLAS_THREADS', threads))
+    workers = int(environ.get('VALIDAWAREE_WORKERS', max(cores // threads, 1)))
+    return WorkerConfiguration(workers, threads, cores, timings)
+
+
+def configured_threads(environ=None):
+    """
+    :return: BLAS threads of each worker set by VALIDAWAREE_BLAS_THREADS, 1 by default.
+    :rtype: int
+    """
+    environ = os.environ if environ is None else environ
+    return int(environ.get('VALIDAWAREE_BLAS_THREADS', 1))
+
+
+def format_configuration(configuration):
+    """
+    :return: The environment variables of the configuration, followed by the calibration timings.
+    :rtype: str
+    """
+    lines = ['VALIDAWAREE_WORKERS={} VALIDAWAREE_BLAS_THREADS={}'.format(configuration.workers,
+                                                                         configuration.threads)]
+    for threads, elapsed in sorted(configuration.timings.items()):
+        lines.append('# {} BLAS threads: {:.4f}s'.format(threads, elapsed))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Calibrate the number of workers and BLAS threads on this machine.')
+    parser.add_argument('--cores', type=int, default=None, help='number of cores (default: the available cores)')
+    parser.add_argument('--repeats', type=int, default=3, help='runs of each number of threads (default: %(default)s)')
+    arguments = parser.parse_args(argv)
+    # The configuration of the calibration, not the one of the environment
+    print(format_configuration(worker_configuration(arguments.cores, calibrate(arguments.cores, arguments.repeats),
+                                                    environ={})))
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,204 @@
+import base64
+import json
+
+import numpy
+from flask import make_response
+
+from analytical_validation.data_handler.data_handler import ragged_data_sets
+from analytical_validation.exceptions import FieldNotValid
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Packed arrays are little-endian float64, whatever the byte order of the server
+PACKED_DTYPE = '<f8'
+PACKED_ARRAYS = 'base64'
+# Sections of the linearity results and the LinearityValidator statistics each one of them needs
+FIELD_STATISTICS = {'regression_coefficients': ('regression',),
+                    'regression_anova': ('regression',),
+                    'cleaned_data': ('outliers',),
+                    'shapiro_pvalue': ('shapiro_wilk',),
+                    'breusch_pagan_pvalue': ('breusch_pagan',),
+                    'linearity_is_valid': ('linearity_is_valid',),
+                    'regression_residues': ('regression',),
+                    'is_normal_distribution': ('shapiro_wilk',),
+                    'is_homoscedastic': ('breusch_pagan',),
+                    'durbin_watson_value': ('durbin_watson',)}
+
+
+def json_default(value):
+    """numpy values orjson doesn't encode natively (and every numpy value for the json module), as Python values."""
+    if isinstance(value, numpy.ndarray):
+        return value.tolist()
+    if isinstance(value, numpy.generic):
+        return value.item()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(value).__name__))
+
+
+def dumps(value):
+    """
+    Encode a value as JSON, numpy scalars and arrays included, with orjson when installed. Nan values are encoded as
+    null by orjson.
+    :rtype: bytes
+    """
+    if orjson is not None:
+        return orjson.dumps(value, default=json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(value, default=json_default).encode()
+
+
+def output_json(data, code, headers=None):
+    """Flask-RESTful representation of JSON responses, encoded by dumps."""
+    response = make_response(dumps(data), code)
+    response.headers.extend(headers or {})
+    response.content_type = 'application/json'
+    return response
+
+
+def pack_array(values):
+    """
+    Pack values as base64 encoded little-endian float64 values.
+
+    Example:
+        >>> pack_array([0.5, -0.5])
+        {'dtype': 'float64', 'shape': [2], 'data': 'AAAAAAAA4D8AAAAAAADgvw=='}
+
+    :param values: The values.
+    :type values: list[float] or numpy.ndarray
+    :rtype: dict
+    """
+    values = numpy.ascontiguousarray(values, dtype=PACKED_DTYPE)
+    return {'dtype': 'float64', 'shape': list(values.shape), 'data': base64.b64encode(values.tobytes()).decode('ascii')}
+
+
+def pack_data_sets(data_sets):
+    """
+    Pack data sets as the packed array of all their values and the offset where each data set starts.
+    :param data_sets: The data sets.
+    :type data_sets: list[list[float]]
+    :rtype: dict
+    """
+    values, level_offsets = ragged_data_sets(data_sets)
+    packed = pack_array(values)
+    packed['level_offsets'] = level_offsets.tolist()
+    return packed
+
+
+def unpack_array(packed):
+    """
+    The values of a packed array, or the list of data sets when it holds level offsets.
+    :param packed: An array packed by pack_array or pack_data_sets.
+    :type packed: dict
+    :rtype: numpy.ndarray or list[numpy.ndarray]
+    """
+    values = numpy.frombuffer(base64.b64decode(packed['data']), dtype=PACKED_DTYPE).reshape(packed['shape'])
+    if 'level_offsets' not in packed:
+        return values
+    level_offsets = packed['level_offsets']
+    return [values[start:end] for start, end in zip(level_offsets[:-1], level_offsets[1:])]
+
+
+def pack_result(result):
+    """
+    Linearity results with the residues and the cleaned data as packed arrays.
+    :param result: The results of a curve, or the error of that curve.
+    :type result: dict
+    :rtype: dict
+    """
+    packed_result = dict(result)
+    if 'regression_residues' in result:
+        packed_result['regression_residues'] = pack_array(result['regression_residues'])
+    if 'cleaned_data' in result:
+        packed_result['cleaned_data'] = dict(result['cleaned_data'])
+        for key in ('cleaned_analytical_data', 'cleaned_concentration_data'):
+            packed_result['cleaned_data'][key] = pack_data_sets(result['cleaned_data'][key])
+    return packed_result
+
+
+def _scalar(value):
+    return value.item() if isinstance(value, (numpy.generic, numpy.ndarray)) else value
+
+
+def parse_fields(fields):
+    """
+    The sections selected by a fields parameter.
+
+    Example:
+        >>> parse_fields('linearity_is_valid,regression_coefficients')
+        ('linearity_is_valid', 'regression_coefficients')
+
+    :param fields: Comma separated names of FIELD_STATISTICS sections.
+    :type fields: str
+    :return: The sorted sections, None when no field is given.
+    :rtype: tuple[str]
+    :raises FieldNotValid: When a field is not one of FIELD_STATISTICS.
+    """
+    if not fields:
+        return None
+    fields = tuple(sorted({field.strip() for field in fields.split(',')}))
+    if any(field not in FIELD_STATISTICS for field in fields):
+        raise FieldNotValid()
+    return fields
+
+
+def field_statistics(fields=None):
+    """
+    :return: The LinearityValidator statistics needed by the sections, None (all of them) when no field is given.
+    :rtype: set[str]
+    """
+    if fields is None:
+        return None
+    return {statistic for field in fields for statistic in FIELD_STATISTICS[field]}
+
+
+def select_fields(result, fields=None):
+    """The selected sections of linearity results, and their status."""
+    if fields is None:
+        return result
+    selected_result = {field: result[field] for field in fields}
+    selected_result['status'] = result['status']
+    return selected_result
+
+
+def linearity_result(linearity_validator, fields=None):
+    """
+    Results of a validated curve, converted once to Python scalars and a float64 array of residues.
+    :param linearity_validator: The validator, after validate_linearity.
+    :type linearity_validator: LinearityValidator
+    :param fields: Sections of the results (default value = None, all of them).
+    :type fields: tuple[str]
+    :rtype: dict
+    """
+    sections = {
+        'regression_coefficients': lambda: {
+            'intercept': _scalar(linearity_validator.intercept),
+            'insignificant_intercept': _scalar(linearity_validator.insignificant_intercept),
+            'slope': _scalar(linearity_validator.slope),
+            'significant_slope': _scalar(linearity_validator.significant_slope),
+            'r_squared': _scalar(linearity_validator.r_squared),
+            'valid_regression': _scalar(linearity_validator.valid_regression_model)},
+        'regression_anova': lambda: {
+            'sum_of_squares_model': _scalar(linearity_validator.sum_of_squares_model),
+            'sum_of_squares_residues': _scalar(linearity_validator.sum_of_squares_resid),
+            'sum_of_squares_total': _scalar(linearity_validator.sum_of_squares_total),
+            'degrees_of_freedom_model': _scalar(linearity_validator.degrees_of_freedom_model),
+            'degrees_of_freedom_residues': _scalar(linearity_validator.degrees_of_freedom_residues),
+            'degrees_of_freedom_total': _scalar(linearity_validator.degrees_of_freedom_total),
+            'mean_squared_error_model': _scalar(linearity_validator.mean_squared_error_model),
+            'mean_squared_error_residues': _scalar(linearity_validator.mean_squared_error_residues),
+            'anova_f_value': _scalar(linearity_validator.anova_f_value),
+            'anova_f_pvalue': _scalar(linearity_validator.anova_f_pvalue)},
+        'cleaned_data': lambda: {'outliers': linearity_validator.outliers,
+                                 'cleaned_analytical_data': linearity_validator.cleaned_analytical_data,
+                                 'cleaned_concentration_data': linearity_validator.cleaned_concentration_data},
+        'shapiro_pvalue': lambda: _scalar(linearity_validator.shapiro_pvalue),
+        'breusch_pagan_pvalue': lambda: _scalar(linearity_validator.breusch_pagan_pvalue),
+        'linearity_is_valid': lambda: _scalar(linearity_validator.linearity_is_valid),
+        'regression_residues': lambda: numpy.asarray(linearity_validator.regression_residues, dtype=float),
+        'is_normal_distribution': lambda: _scalar(linearity_validator.is_normal_distribution),
+        'is_homoscedastic': lambda: _scalar(linearity_validator.is_homoscedastic),
+        'durbin_watson_value': lambda: _scalar(linearity_validator.durbin_watson_value)}
+    result = {field: sections[field]() for field in (FIELD_STATISTICS if fields is None else fields)}
+    result['status'] = 201
+    return result
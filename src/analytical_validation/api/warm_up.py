@@ -0,0 +1,83 @@
+"""
+Warm-up of the serving processes: a synthetic curve is validated and serialized once when a worker starts, so the
+first request of the worker doesn't pay for importing the statistical modules, the first calls into scipy and numpy
+and the first encoding of the results. GET /ready answers 200 only after the warm-up of the worker.
+"""
+import threading
+import time
+
+import numpy
+
+from analytical_validation.api.runtime import import_modules
+from analytical_validation.api.serialization import dumps, linearity_result, pack_result
+from analytical_validation.data_handler.data_handler import DataHandler
+from analytical_validation.validators.linearity_validator import LinearityValidator
+
+WARM_UP_LEVELS = 5
+WARM_UP_REPLICATES = 3
+
+_ready = threading.Event()
+_lock = threading.Lock()
+_thread = None
+
+
+def warm_up_curve(levels=WARM_UP_LEVELS, replicates=WARM_UP_REPLICATES):
+    """
+    A synthetic linear curve, the same at each call.
+    :return analytical_data: The analytical data sets.
+    :rtype analytical_data: list[list[float]]
+    :return concentration_data: The concentration data sets.
+    :rtype concentration_data: list[list[float]]
+    """
+    concentration_data = numpy.repeat(numpy.linspace(1.0, 10.0, levels)[:, numpy.newaxis], replicates, axis=1)
+    # Replicates spread around the line, so no value is an outlier and every test runs
+    analytical_data = 2.0 * concentration_data + 0.5 + numpy.linspace(-0.05, 0.05, replicates) * \
+        numpy.linspace(1.0, 2.0, levels)[:, numpy.newaxis]
+    return analytical_data.tolist(), concentration_data.tolist()
+
+
+def warm_up():
+    """
+    Push a synthetic curve through DataHandler, LinearityValidator.validate_linearity and the serialization of the
+    results, then mark the process as ready.
+
+    Example:
+        >>> warm_up()
+        0.0123
+        >>> is_ready()
+        True
+
+    :return: Seconds taken by the warm-up.
+    :rtype: float
+    """
+    start = time.perf_counter()
+    import_modules()
+    analytical_data, concentration_data = DataHandler(*warm_up_curve()).handle_data()
+    linearity_validator = LinearityValidator(analytical_data, concentration_data)
+    linearity_validator.validate_linearity()
+    result = linearity_result(linearity_validator)
+    dumps(result)
+    dumps(pack_result(result))
+    _ready.set()
+    return time.perf_counter() - start
+
+
+def start_warm_up():
+    """
+    Warm up in a background thread, when the process is not ready and no warm-up is running, e.g. for the
+    development server, which has no worker start hook.
+    """
+    global _thread
+    with _lock:
+        if _ready.is_set() or (_thread is not None and _thread.is_alive()):
+            return
+        _thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+        _thread.start()
+
+
+def is_ready():
+    """
+    :return: Whether the warm-up of this process is done.
+    :rtype: bool
+    """
+    return _ready.is_set()
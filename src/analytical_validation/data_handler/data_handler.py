@@ -1,32 +1,174 @@
-from copy import deepcopy
+from itertools import chain
+
+import numpy
 
 from analytical_validation.exceptions import DataNotList, DataNotListOfLists, ValueNotValid, NegativeValue, \
     DataNotSymmetric
+from analytical_validation.lazy_module import LazyModule
+
+# Only used to read files, imported on the first file read
+pandas = LazyModule('pandas')
 
 
 def check_values(value):
     """
-    Check for numbers converting it to float type.
+    Check for numbers converting it to float type, as parse_values does for many values.
     :param value: analytical signal or concentration value.
     :type value: any
     :raise ValueNotValid:
     :raise NegativeValue:
-    :return value: A positive number converted to float.
+    :return value: A positive number converted to float, None when the value is missing (None or nan).
     :rtype: float
     """
-    if value is None:
-        return value
-    elif isinstance(value, bool):
-        raise ValueNotValid()
-    elif isinstance(value, str):
-        value = value.replace(',', '.').replace(' ', '').replace('"', '').replace('\n', '').replace('"\\"', '')
+    parsed_values, invalid, negative = parse_values([value])
+    _check_parsed_values(invalid, negative)
+    return None if numpy.isnan(parsed_values[0]) else float(parsed_values[0])
+
+
+# Characters removed from numeric strings: blanks, stray quotes, escapes and the usual thousands separators
+_STRIPPED_CHARACTERS = str.maketrans('', '', ' "\'\n\r\t\\\xa0\u202f')
+
+
+_NUMBER, _STRING, _BOOL, _MISSING = range(4)
+_BOOL_TYPES = (bool, numpy.bool_)
+
+
+def _type_kind(value_type):
+    if value_type is type(None):
+        return _MISSING
+    if issubclass(value_type, str):
+        return _STRING
+    if issubclass(value_type, _BOOL_TYPES):
+        return _BOOL
+    return _NUMBER
+
+
+def _parse_each(values):
+    """Convert values one at a time, the slow path taken only when some value isn't a number.
+    :return parsed: The values converted to float, nan where the conversion fails.
+    :rtype parsed: numpy.ndarray
+    :return failed: True where the conversion fails.
+    :rtype failed: numpy.ndarray
+    """
+    parsed = numpy.empty(len(values))
+    failed = numpy.zeros(len(values), dtype=bool)
+    for index, value in enumerate(values):
+        try:
+            parsed[index] = float(value)
+        except (TypeError, ValueError):
+            parsed[index] = numpy.nan
+            failed[index] = True
+    return parsed, failed
+
+
+def _parse_strings(strings):
+    """Convert numeric strings with comma or dot decimals, nan where the string isn't a number."""
+    joined_text = '\0'.join(strings).translate(_STRIPPED_CHARACTERS)
+    if ',' in joined_text and '.' not in joined_text:
+        # Every comma is a decimal separator
+        joined_text = joined_text.replace(',', '.')
+    text = joined_text.split('\0')
+    if ',' not in joined_text and len(text) == len(strings):
+        try:
+            return numpy.array(text, dtype=float)
+        except ValueError:
+            pass
+    if len(text) != len(strings):
+        text = [string.translate(_STRIPPED_CHARACTERS) for string in strings]
+    text = numpy.array(text, dtype=str)
+    last_comma = numpy.char.rfind(text, ',')
+    last_dot = numpy.char.rfind(text, '.')
+    # The last separator is the decimal one when both are present, e.g. 1.234,5 and 1,234.5
+    comma_thousands = (last_dot > last_comma) & (last_comma >= 0)
+    comma_decimal = last_comma > last_dot
+    if comma_thousands.any():
+        text[comma_thousands] = numpy.char.replace(text[comma_thousands], ',', '')
+    if comma_decimal.any():
+        text[comma_decimal] = numpy.char.replace(
+            numpy.char.replace(text[comma_decimal], '.', ''), ',', '.')
     try:
-        if float(value) >= 0:
-            return float(value)
-        else:
-            raise NegativeValue()
+        parsed = text.astype(float)
     except ValueError:
-        raise ValueNotValid()
+        parsed, _ = _parse_each(text.tolist())
+    # Every nan of a string is invalid, as a nan string is not a measure either
+    return parsed
+
+
+def parse_values(values):
+    """
+    Convert a sequence of numbers, numeric strings and None to floats in vectorized passes.
+
+    Numeric strings may have comma or dot decimals, thousands separators, blanks and stray quotes, normalized at
+    once for all the strings. None and nan numbers are missing values and are neither invalid nor negative, as the
+    nan values of array data; check_values used to reject a nan number as negative.
+
+    Values that are all numbers (or None) are converted by a single numpy conversion and values that are all strings
+    by _parse_strings. Only other mixes are split by the type of each value, looked up in a table of their types.
+
+    Example:
+        >>> parsed_values, invalid, negative = parse_values(["1,5", 2, None, "abc", "-1.234,5"])
+        >>> parsed_values
+        array([ 1.5,  2. ,  nan,  nan, -1234.5])
+        >>> numpy.flatnonzero(invalid), numpy.flatnonzero(negative)
+        (array([3]), array([4]))
+
+    :param values: Analytical signal or concentration values.
+    :type values: list or numpy.ndarray
+    :return parsed_values: The values converted to float, nan where missing or invalid.
+    :rtype parsed_values: numpy.ndarray
+    :return invalid: True where the value isn't a number.
+    :rtype invalid: numpy.ndarray
+    :return negative: True where the value is negative.
+    :rtype negative: numpy.ndarray
+    """
+    if isinstance(values, numpy.ndarray) and values.dtype.kind in 'iuf':
+        parsed_values = values.astype(float, copy=False).reshape(-1)
+        return parsed_values, numpy.zeros(parsed_values.shape, dtype=bool), parsed_values < 0
+    # Only the types of the values are looked at one by one, each distinct type is classified once
+    type_kinds = {value_type: _type_kind(value_type) for value_type in set(map(type, values))}
+    kinds = set(type_kinds.values())
+    if kinds <= {_NUMBER, _MISSING}:
+        try:
+            # None is converted to nan
+            parsed_values = numpy.array(values, dtype=float)
+        except (TypeError, ValueError, OverflowError):
+            pass
+        else:
+            return parsed_values, numpy.zeros(parsed_values.shape, dtype=bool), parsed_values < 0
+    elif kinds == {_STRING}:
+        parsed_values = _parse_strings(values)
+        return parsed_values, numpy.isnan(parsed_values), parsed_values < 0
+    objects = numpy.empty(len(values), dtype=object)
+    objects[:] = values
+    value_kinds = numpy.fromiter(map(type_kinds.__getitem__, map(type, objects)), dtype=numpy.int8,
+                                 count=len(objects))
+    is_string = value_kinds == _STRING
+    is_bool = value_kinds == _BOOL
+    is_number = value_kinds == _NUMBER
+    parsed_values = numpy.full(len(objects), numpy.nan)
+    invalid = is_bool.copy()
+    if is_number.any():
+        try:
+            parsed_values[is_number] = objects[is_number].astype(float)
+        except (TypeError, ValueError):
+            parsed_values[is_number], invalid[is_number] = _parse_each(objects[is_number])
+    if is_string.any():
+        parsed_values[is_string] = _parse_strings(objects[is_string].tolist())
+        invalid |= is_string & numpy.isnan(parsed_values)
+    return parsed_values, invalid, parsed_values < 0
+
+
+def _check_parsed_values(invalid, negative):
+    """
+    Raise the error of the first value that isn't valid.
+    :raise ValueNotValid:
+    :raise NegativeValue:
+    """
+    errors = invalid | negative
+    if errors.any():
+        if invalid[numpy.argmax(errors)]:
+            raise ValueNotValid()
+        raise NegativeValue()
 
 
 def check_is_list(data):
@@ -38,6 +180,51 @@ def check_is_list(data):
         raise DataNotList()
 
 
+def is_array_data(data):
+    """
+    Check if the given data is an array layout of data sets: a numpy array, a (values, level_offsets) pair or any
+    other buffer protocol object, e.g. a memoryview. Bytes are not data sets, even if they support the protocol.
+    :rtype: bool
+    """
+    if isinstance(data, numpy.ndarray) or (isinstance(data, tuple) and len(data) == 2):
+        return True
+    if isinstance(data, (bytes, bytearray)):
+        return False
+    try:
+        memoryview(data)
+    except TypeError:
+        return False
+    return True
+
+
+def parse_data_sets(data):
+    """
+    Check and convert list data sets in a single vectorized pass over all their values.
+
+    Example:
+        >>> values, level_offsets = parse_data_sets([["1,5", 2, None], [4]])
+        >>> values, level_offsets
+        (array([1.5, 2. , nan, 4. ]), array([0, 3, 4]))
+
+    :param data: The data sets.
+    :type data: list[list]
+    :return values: The values of all data sets, one data set after the other, nan where missing.
+    :rtype values: numpy.ndarray
+    :return level_offsets: Start of each data set in values, followed by the number of values.
+    :rtype level_offsets: numpy.ndarray
+    :raise DataNotListOfLists:
+    :raise ValueNotValid:
+    :raise NegativeValue:
+    """
+    for data_set in data:
+        if isinstance(data_set, list) is False:
+            raise DataNotListOfLists()
+    lengths = numpy.fromiter(map(len, data), dtype=numpy.intp, count=len(data))
+    values, invalid, negative = parse_values(list(chain.from_iterable(data)))
+    _check_parsed_values(invalid, negative)
+    return values, numpy.concatenate(([0], numpy.cumsum(lengths, dtype=numpy.intp)))
+
+
 def check_list_of_lists(data):
     """
     Check for numbers converting it to float type.
@@ -47,29 +234,224 @@ def check_list_of_lists(data):
     :return float_data: List containing float only values.
     :rtype: list[list[float]]
     """
-    float_data = []
-    for data_set in data:
-        if isinstance(data_set, list) is False:
-            raise DataNotListOfLists()
-        float_data_set = [check_values(value) for value in data_set]
-        float_data.append(float_data_set)
-    return float_data
+    values, level_offsets = parse_data_sets(data)
+    float_values = values.tolist()
+    for index in numpy.flatnonzero(numpy.isnan(values)):
+        float_values[index] = None
+    return [float_values[start:end] for start, end in zip(level_offsets[:-1].tolist(), level_offsets[1:].tolist())]
+
+
+def ragged_data_sets(data):
+    """
+    Arrange data sets as a ragged array, all the values in one flat array and the offset where each data set starts.
+
+    Accepts a (values, level_offsets) pair, a list of lists or of arrays, and any 2-D array or buffer protocol
+    object with one data set per row. Missing values are kept as nan, including the masked values of a masked array.
+    Arrays of floats are returned as views, without copying or any per value Python work.
+
+    Example:
+        >>> values, level_offsets = ragged_data_sets([[1.0, 2.0, 3.0], [4.0, 5.0]])
+        >>> level_offsets
+        array([0, 3, 5])
+
+    :param data: The data sets.
+    :type data: tuple or list or numpy.ndarray
+    :return values: The values of all data sets, one data set after the other.
+    :rtype values: numpy.ndarray
+    :return level_offsets: Start of each data set in values, followed by the number of values.
+    :rtype level_offsets: numpy.ndarray
+    :raises DataNotListOfLists: When the data can't be arranged as data sets.
+    :raises ValueNotValid: When a value isn't a number.
+    """
+    try:
+        if isinstance(data, tuple) and len(data) == 2:
+            values = numpy.asarray(data[0], dtype=float)
+            level_offsets = numpy.asarray(data[1], dtype=numpy.intp)
+            if values.ndim != 1 or level_offsets.ndim != 1 or level_offsets.size == 0 or level_offsets[0] != 0 or \
+                    level_offsets[-1] != values.size or (numpy.diff(level_offsets) < 0).any():
+                raise DataNotListOfLists()
+            return values, level_offsets
+        if isinstance(data, list):
+            if not all(isinstance(data_set, (list, numpy.ndarray)) for data_set in data):
+                raise DataNotListOfLists()
+            data_sets = [numpy.asarray(data_set, dtype=float).reshape(-1) for data_set in data]
+            counts = [data_set.size for data_set in data_sets]
+            values = numpy.concatenate(data_sets) if data_sets else numpy.empty(0)
+        else:
+            if isinstance(data, numpy.ma.MaskedArray):
+                data = data.astype(float).filled(numpy.nan)
+            data = numpy.asarray(data, dtype=float)
+            if data.ndim != 2:
+                raise DataNotListOfLists()
+            counts = numpy.full(data.shape[0], data.shape[1])
+            values = data.reshape(-1)
+    except (TypeError, ValueError):
+        raise ValueNotValid()
+    return values, numpy.concatenate(([0], numpy.cumsum(counts, dtype=numpy.intp)))
+
+
+def paired_data_sets(analytical_data, concentration_data):
+    """
+    Arrange the analytical and concentration data sets as ragged arrays sharing their level offsets.
+
+    Pairs with a missing (nan) analytical or concentration value are dropped in one vectorized pass; when there is
+    none the arrays are views of the given data.
+    :param analytical_data: The analytical data sets, in any layout accepted by ragged_data_sets.
+    :type analytical_data: tuple or list or numpy.ndarray
+    :param concentration_data: The concentration data sets, in any layout accepted by ragged_data_sets.
+    :type concentration_data: tuple or list or numpy.ndarray
+    :return analytical_values: The analytical values of all data sets.
+    :rtype analytical_values: numpy.ndarray
+    :return concentration_values: The concentration values of all data sets.
+    :rtype concentration_values: numpy.ndarray
+    :return level_offsets: Start of each data set in the values, followed by the number of values.
+    :rtype level_offsets: numpy.ndarray
+    :raises DataNotSymmetric: When the data sets are not paired.
+    """
+    analytical_values, level_offsets = ragged_data_sets(analytical_data)
+    concentration_values, concentration_level_offsets = ragged_data_sets(concentration_data)
+    if not numpy.array_equal(level_offsets, concentration_level_offsets):
+        raise DataNotSymmetric()
+    kept = ~numpy.isnan(analytical_values) & ~numpy.isnan(concentration_values)
+    if not kept.all():
+        levels = numpy.repeat(numpy.arange(level_offsets.size - 1), numpy.diff(level_offsets))
+        counts = numpy.bincount(levels[kept], minlength=level_offsets.size - 1)
+        analytical_values, concentration_values = analytical_values[kept], concentration_values[kept]
+        level_offsets = numpy.concatenate(([0], numpy.cumsum(counts, dtype=numpy.intp)))
+    return analytical_values, concentration_values, level_offsets
+
+
+def split_data_sets(values, level_offsets):
+    """
+    Split a ragged array into the views of its data sets.
+    :param values: The values of all data sets.
+    :type values: numpy.ndarray
+    :param level_offsets: Start of each data set in values, followed by the number of values.
+    :type level_offsets: numpy.ndarray
+    :return: One array per data set, sharing the memory of values.
+    :rtype: list[numpy.ndarray]
+    """
+    return numpy.split(values, level_offsets[1:-1])
 
 
 class DataHandler(object):
     def __init__(self, external_analytical_data, external_concentration_data):
         """
          Prepare the data coming from the front end for analysis.
+
+         Each data is checked and converted once, in vectorized passes, and kept as a ragged array: all the values
+         in one flat array, nan where missing, and the offset where each data set starts. Lists of lists are parsed
+         by parse_data_sets; arrays, e.g. a (values, level_offsets) ragged array or a 2-D array or memoryview with
+         nan for missing values, are used without copying; see ragged_data_sets.
         :param external_analytical_data: List containing all measured analytical signal.
-        :type external_analytical_data: list[list[float]]
+        :type external_analytical_data: list[list[float]] or tuple or numpy.ndarray or memoryview
         :param external_concentration_data: List containing the concentration for each analytical signal
-        :type external_concentration_data: list[list[float]]
+        :type external_concentration_data: list[list[float]] or tuple or numpy.ndarray or memoryview
+        :raises DataNotList: When a data is neither a list nor an array.
+        """
+        for data in (external_analytical_data, external_concentration_data):
+            if not is_array_data(data):
+                check_is_list(data)
+        self.external_analytical_data = self.check_data(external_analytical_data)
+        self.external_concentration_data = self.check_data(external_concentration_data)
+        # Label of each data set, when read from a file
+        self.levels = None
+
+    @classmethod
+    def from_csv(cls, path_or_stream, level_column, signal_column, concentration_column=None, delimiter=';',
+                 decimal=',', thousands=None, chunk_size=65536):
+        """
+        Read an instrument export, one replicate per row, grouping the rows into concentration levels.
+
+        The file is parsed in chunks by the pandas C parser, which converts the decimal separator of each column in
+        a vectorized pass, so only the numeric columns of the whole file are held, as float arrays. The rows of a
+        level don't need to be contiguous: the levels keep the order of their first row and the replicates their
+        order in the file.
+
+        Example:
+            >>> data_handler = DataHandler.from_csv('run.csv', level_column='Level', signal_column='Area',
+            ...                                     concentration_column='Concentration')
+            >>> analytical_data, concentration_data = data_handler.handle_data()
+            >>> LinearityValidator(analytical_data, concentration_data).validate_linearity()
+
+        :param path_or_stream: Path or text stream of the delimited file, with a header row.
+        :type path_or_stream: str or io.TextIOBase
+        :param level_column: Name of the column identifying the concentration level of the row.
+        :type level_column: str
+        :param signal_column: Name of the analytical signal column.
+        :type signal_column: str
+        :param concentration_column: Name of the concentration column (default value = None, the level column holds
+        the concentration).
+        :type concentration_column: str
+        :param delimiter: Column delimiter, e.g. ',' or '\\t' (default value = ';').
+        :type delimiter: str
+        :param decimal: Decimal separator (default value = ',').
+        :type decimal: str
+        :param thousands: Thousands separator (default value = None).
+        :type thousands: str
+        :param chunk_size: Number of rows parsed at a time.
+        :type chunk_size: int
+        :return: The data handler of the file data, the level labels in levels.
+        :rtype: DataHandler
+        :raises ValueNotValid: When a column is missing or a value isn't a number.
+        :raises NegativeValue:
         """
+        concentration_column = level_column if concentration_column is None else concentration_column
+        numeric_columns = {signal_column: float, concentration_column: float}
+        level_codes = {}
+        codes, signals, concentrations = [], [], []
+        try:
+            reader = pandas.read_csv(path_or_stream, sep=delimiter, decimal=decimal, thousands=thousands,
+                                     usecols=list({level_column, signal_column, concentration_column}),
+                                     dtype=numeric_columns, chunksize=chunk_size)
+            for chunk in reader:
+                chunk_codes, levels = pandas.factorize(chunk[level_column])
+                # Rows without a level (code -1) are mapped to -1 by the last item and dropped
+                level_map = numpy.array([level_codes.setdefault(level, len(level_codes)) for level in levels] + [-1],
+                                        dtype=numpy.intp)
+                codes.append(level_map[chunk_codes])
+                signals.append(chunk[signal_column].to_numpy(dtype=float))
+                concentrations.append(chunk[concentration_column].to_numpy(dtype=float))
+        except ValueError:
+            raise ValueNotValid()
+        codes = numpy.concatenate(codes) if codes else numpy.empty(0, dtype=numpy.intp)
+        kept = codes >= 0
+        order = numpy.argsort(codes[kept], kind='stable')
+        level_offsets = numpy.concatenate(([0], numpy.cumsum(numpy.bincount(codes[kept], minlength=len(level_codes)))))
+        analytical_values = numpy.concatenate(signals)[kept][order] if signals else numpy.empty(0)
+        concentration_values = numpy.concatenate(concentrations)[kept][order] if concentrations else numpy.empty(0)
+        data_handler = cls((analytical_values, level_offsets), (concentration_values, level_offsets))
+        data_handler.levels = list(level_codes)
+        return data_handler
 
-        check_is_list(external_analytical_data)
-        check_is_list(external_concentration_data)
-        self.external_analytical_data = check_list_of_lists(external_analytical_data)
-        self.external_concentration_data = check_list_of_lists(external_concentration_data)
+    @staticmethod
+    def check_data(data):
+        """
+        Check list or array data, converting it to a ragged array.
+        :raise NegativeValue:
+        :raise ValueNotValid:
+        :raise DataNotListOfLists:
+        :return: The (values, level_offsets) ragged array, nan where a value is missing.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        if isinstance(data, list) and not any(isinstance(data_set, numpy.ndarray) for data_set in data):
+            return parse_data_sets(data)
+        return DataHandler.check_array_data(data)
+
+    @staticmethod
+    def check_array_data(data):
+        """
+        Check array data for negative values in a single vectorized pass.
+        :raise NegativeValue:
+        :raise ValueNotValid:
+        :raise DataNotListOfLists:
+        :return: The (values, level_offsets) ragged array, views of the given arrays, nan where a value is missing.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        """
+        values, level_offsets = ragged_data_sets(data)
+        if (values < 0).any():
+            raise NegativeValue()
+        return values, level_offsets
 
     def check_symmetric_data(self):
         """
@@ -77,7 +459,7 @@ class DataHandler(object):
         data have the same number of data sets.
         :raises DataNotSymmetric:
         """
-        if len(self.external_analytical_data) != len(self.external_concentration_data):
+        if len(self.external_analytical_data[1]) != len(self.external_concentration_data[1]):
             raise DataNotSymmetric()
 
     def check_symmetric_data_set(self):
@@ -86,51 +468,44 @@ class DataHandler(object):
         data sets have the same number of values.
         :raises DataNotSymmetric:
         """
-        if sum(list(map(lambda concentration_data_set: len(concentration_data_set),
-                        self.external_concentration_data))) != sum(
-            list(map(lambda analytical_data_set: len(analytical_data_set), self.external_analytical_data))):
+        if self.external_analytical_data[0].size != self.external_concentration_data[0].size:
             raise DataNotSymmetric()
 
     def replace_null_values(self):
         """
-        Checks for NoneType values in the analytical data set.
-        If the data set has a None value, the method removes it from the
-        analytical list and also removes the corresponding concentration value.
-        :return clean_analytical_data: List without NoneType.
-        :rtype: list[list[float]]
-        :return clean_concentration_data: List without corresponding index value of NoneType.
-        :rtype: list[list[float]]
-        """
-        clean_analytical_data = deepcopy(self.external_analytical_data)
-        clean_concentration_data = deepcopy(self.external_concentration_data)
-        none_index = []
-        for analytical_data_set in self.external_analytical_data:
-            none_index.append([index for index, value in enumerate(analytical_data_set) if value is None])
-        set_index = 0
-        while set_index < len(clean_analytical_data):
-            index_pop_correction = 0
-            for index_pop in none_index[set_index]:  # Corrects the index when there is more than 1 NoneType
-                index_pop -= list(range(len(none_index[set_index])))[index_pop_correction]
-                clean_analytical_data[set_index].pop(index_pop)
-                clean_concentration_data[set_index].pop(index_pop)
-                index_pop_correction += 1
-            set_index += 1
-
-        def clean_empty_lists(data):
-            return [data_set for data_set in data if data_set != []]
-
-        return clean_empty_lists(clean_analytical_data), clean_empty_lists(clean_concentration_data)
+        Checks for missing values in the analytical and concentration data sets.
+        A replicate missing its analytical or concentration value is removed from both, in one vectorized pass, and
+        the data sets left without any value are dropped.
+        :return clean_analytical_data: The analytical (values, level_offsets) ragged array, without missing values.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        :return clean_concentration_data: The concentration ragged array, sharing the level offsets.
+        :rtype: tuple[numpy.ndarray, numpy.ndarray]
+        :raises DataNotSymmetric: When the values of a data set are not paired.
+        """
+        analytical_values, concentration_values, level_offsets = paired_data_sets(self.external_analytical_data,
+                                                                                  self.external_concentration_data)
+        # Offsets are not decreasing, so the repeated offsets of the empty data sets are dropped
+        level_offsets = numpy.unique(level_offsets)
+        return (analytical_values, level_offsets), (concentration_values, level_offsets)
 
     def handle_data(self):
         """
         Prepare the data coming from the React-Redux Front-end for Linearity validation analysis.
-        :returns analytical_data: List containing the analytical data, ready to be validated.
-        :rtype analytical_data: list[list[float]]]
-        :returns analytical_data: List containing the concentration data, ready to be validated.
-        :rtype analytical_data: list[list[float]]]
-        """
-        data_handler = DataHandler(self.external_analytical_data, self.external_concentration_data)
-        data_handler.check_symmetric_data()
-        data_handler.check_symmetric_data_set()
-        checked_analytical_data, checked_concentration_data = data_handler.replace_null_values()
-        return checked_analytical_data, checked_concentration_data
+
+        The data are returned as ragged arrays, which LinearityValidator, LinearityValidator.validate_many and
+        canonical_key take without copying; split_data_sets gives the view of each data set.
+
+        Example:
+            >>> analytical_data, concentration_data = DataHandler([[1, None], [2, 3]], [[1, 1], [2, 2]]).handle_data()
+            >>> analytical_data
+            (array([1., 2., 3.]), array([0, 1, 3]))
+
+        :returns analytical_data: The analytical (values, level_offsets) ragged array, ready to be validated.
+        :rtype analytical_data: tuple[numpy.ndarray, numpy.ndarray]
+        :returns concentration_data: The concentration ragged array, ready to be validated.
+        :rtype concentration_data: tuple[numpy.ndarray, numpy.ndarray]
+        :raises DataNotSymmetric: When the data sets or the values of a data set are not paired.
+        """
+        self.check_symmetric_data()
+        self.check_symmetric_data_set()
+        return self.replace_null_values()
@@ -0,0 +1,107 @@
+"""
+Benchmark of parse_values against the value by value conversion it replaces:
+
+    python -m analytical_validation.data_handler.parse_benchmark --size 100000
+
+prints the best time of each one for numbers, numbers with missing values, dot decimal strings, comma decimal strings
+and a mix of them.
+"""
+import argparse
+import random
+import time
+from collections import namedtuple
+
+from analytical_validation.data_handler.data_handler import parse_values
+from analytical_validation.exceptions import NegativeValue, ValueNotValid
+
+DEFAULT_SIZE = 100000
+
+ParseTiming = namedtuple('ParseTiming', ['values', 'parse_values', 'each_value'])
+
+
+def _former_check_values(value):
+    if value is None:
+        return value
+    elif isinstance(value, bool):
+        raise ValueNotValid()
+    elif isinstance(value, str):
+        value = value.replace(',', '.').replace(' ', '').replace('"', '').replace('\n', '').replace('"\\"', '')
+    try:
+        if float(value) >= 0:
+            return float(value)
+        else:
+            raise NegativeValue()
+    except ValueError:
+        raise ValueNotValid()
+
+
+def check_each_value(values):
+    """
+    The value by value conversion parse_values replaces, the former check_values called on each value.
+    :rtype: list[float]
+    """
+    return [_former_check_values(value) for value in values]
+
+
+def benchmark_values(size=DEFAULT_SIZE, seed=0):
+    """
+    Values of each kind of input, the same at each call.
+    :rtype: dict[str, list]
+    """
+    random_generator = random.Random(seed)
+    numbers = [random_generator.uniform(0.0, 10.0) for _ in range(size)]
+    strings = ['{:.4f}'.format(number) for number in numbers]
+    return {'numbers': numbers,
+            'numbers and None': [None if index % 10 == 0 else number for index, number in enumerate(numbers)],
+            'dot decimal strings': strings,
+            'comma decimal strings': [string.replace('.', ',') for string in strings],
+            'mixed': [number if index % 2 else string for index, (number, string) in enumerate(zip(numbers, strings))]}
+
+
+def _best_time(function, values, repeats):
+    best_time = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(values)
+        best_time = min(best_time, time.perf_counter() - start)
+    return best_time
+
+
+def run_benchmark(size=DEFAULT_SIZE, repeats=5):
+    """
+    Time parse_values and check_each_value on each kind of input.
+    :param size: Number of values of each input.
+    :type size: int
+    :param repeats: Runs of each conversion, the best time is kept.
+    :type repeats: int
+    :return: Best time in seconds of each conversion, for each input.
+    :rtype: list[ParseTiming]
+    """
+    return [ParseTiming(name, _best_time(parse_values, values, repeats), _best_time(check_each_value, values, repeats))
+            for name, values in benchmark_values(size).items()]
+
+
+def format_report(parse_timings):
+    """
+    :return: The times and the speedup of parse_values on each input, one per line.
+    :rtype: str
+    """
+    lines = ['{:<24} {:>14} {:>14} {:>8}'.format('values', 'parse_values', 'each value', 'speedup')]
+    for parse_timing in parse_timings:
+        lines.append('{:<24} {:>13.4f}s {:>13.4f}s {:>7.1f}x'.format(
+            parse_timing.values, parse_timing.parse_values, parse_timing.each_value,
+            parse_timing.each_value / parse_timing.parse_values))
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Time parse_values against the value by value conversion.')
+    parser.add_argument('--size', type=int, default=DEFAULT_SIZE, help='values of each input (default: %(default)s)')
+    parser.add_argument('--repeats', type=int, default=5, help='runs of each conversion (default: %(default)s)')
+    arguments = parser.parse_args(argv)
+    print(format_report(run_benchmark(arguments.size, arguments.repeats)))
+    return 0
+
+
+if __name__ == '__main__':
+    main()
@@ -65,7 +65,7 @@ class DataIsEmpty(Exception):
 
 class DataIsOutOfRange(Exception):
     def __init__(self):
-        super().__init__("Dixon outlier Q test can't be used with less than 3 or more than 28 values in a data set.")
+        super().__init__("Dixon outlier Q test can't be used with less than 3 or more than 100 values in a data set.")
 
 
 class AlphaNotValid(Exception):
@@ -73,6 +73,17 @@ class AlphaNotValid(Exception):
         super().__init__("The alpha value is not valid. Only 0.01, 0.05, 0.10 are accepted values.")
 
 
+class DixonStatisticNotValid(Exception):
+    def __init__(self):
+        super().__init__("The Dixon statistic is not valid. Only r10, r11, r21 and r22 are accepted values.")
+
+
+class OutlierTestNotValid(Exception):
+    def __init__(self):
+        super().__init__("The outlier test is not valid. Only dixon, grubbs, generalized_esd and auto are accepted "
+                         "values.")
+
+
 class DirectionNotBoolean(Exception):
     def __init__(self):
         super().__init__("The left and right input values should be booleans (True or False).")
@@ -88,6 +99,16 @@ class DataWasNotFitted(Exception):
         super().__init__("There is no regression model!")
 
 
+class RegressionEngineNotValid(Exception):
+    def __init__(self):
+        super().__init__("The regression engine is not valid. Only closed_form and statsmodels are accepted values.")
+
+
+class WeightingNotValid(Exception):
+    def __init__(self):
+        super().__init__("The weighting is not valid. Only auto, 1/x, 1/x^2 and 1/s^2 are accepted values.")
+
+
 class DurbinWatsonValueError(Exception):
     def __init__(self):
         super().__init__("The Durbin Watson value is out of bounds. Should be less than 4 and more than 0.")
@@ -112,3 +133,18 @@ class IncorrectIntermediatePrecisionData(Exception):
     def __init__(self):
         super().__init__("Incorrect analytical data! Check your values and try again.")
 
+
+
+class RequestBodyNotValid(Exception):
+    def __init__(self):
+        super().__init__("The request body is not valid. Check and try again.")
+
+
+class StatisticNotValid(Exception):
+    def __init__(self):
+        super().__init__("The statistic is not valid. Check the statistics computed by the validator and try again.")
+
+
+class FieldNotValid(Exception):
+    def __init__(self):
+        super().__init__("One of the fields is not valid. Check and try again.")
@@ -0,0 +1,175 @@
+import bisect
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+# CPU time of the running thread, so the requests served by the other threads of a worker are not counted
+_cpu_time = getattr(time, 'thread_time', time.process_time)
+
+OK = 'ok'
+# Upper bounds in seconds of the histogram buckets, the last bucket holding every longer stage
+HISTOGRAM_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+StageTiming = namedtuple('StageTiming', ['stage', 'wall_time', 'cpu_time', 'outcome'])
+
+
+class StageHistogram(object):
+    """Distribution of the wall and CPU times of a stage, and the number of runs of each outcome."""
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        self.buckets = buckets
+        self.wall_time_counts = [0] * (len(buckets) + 1)
+        self.cpu_time_counts = [0] * (len(buckets) + 1)
+        self.wall_time_sum = 0.0
+        self.cpu_time_sum = 0.0
+        self.outcomes = {}
+
+    def add(self, stage_timing):
+        self.wall_time_counts[bisect.bisect_left(self.buckets, stage_timing.wall_time)] += 1
+        self.cpu_time_counts[bisect.bisect_left(self.buckets, stage_timing.cpu_time)] += 1
+        self.wall_time_sum += stage_timing.wall_time
+        self.cpu_time_sum += stage_timing.cpu_time
+        self.outcomes[stage_timing.outcome] = self.outcomes.get(stage_timing.outcome, 0) + 1
+
+    @property
+    def count(self):
+        return sum(self.outcomes.values())
+
+    def as_dict(self):
+        """
+        :return: The number of stages of each bucket, keyed by the upper bound of the bucket ('+Inf' for the last
+        one), the sums of the times and the number of runs of each outcome.
+        :rtype: dict
+        """
+        bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+        return {'count': self.count,
+                'wall_time': {'sum': self.wall_time_sum, 'buckets': dict(zip(bounds, self.wall_time_counts))},
+                'cpu_time': {'sum': self.cpu_time_sum, 'buckets': dict(zip(bounds, self.cpu_time_counts))},
+                'outcomes': dict(self.outcomes)}
+
+
+class TimerRegistry(object):
+    """
+    Histograms of the stage timings of every run of this process. The workers of a server each have their own
+    registry.
+    """
+
+    def __init__(self, buckets=HISTOGRAM_BUCKETS):
+        """
+        :param buckets: Upper bounds in seconds of the histogram buckets, sorted.
+        :type buckets: tuple[float]
+        """
+        self.buckets = buckets
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage_timing):
+        """
+        Add a stage timing to the histogram of its stage.
+        :type stage_timing: StageTiming
+        """
+        with self._lock:
+            if stage_timing.stage not in self.histograms:
+                self.histograms[stage_timing.stage] = StageHistogram(self.buckets)
+            self.histograms[stage_timing.stage].add(stage_timing)
+
+    def snapshot(self):
+        """
+        :return: The histogram of each stage.
+        :rtype: dict
+        """
+        with self._lock:
+            return {stage: histogram.as_dict() for stage, histogram in self.histograms.items()}
+
+    def export(self, prefix='validawaree_stage'):
+        """
+        The histograms in the Prometheus text format, with cumulative buckets.
+
+        Example:
+            >>> print(timer_registry.export())
+            # TYPE validawaree_stage_wall_seconds histogram
+            validawaree_stage_wall_seconds_bucket{stage="regression",le="0.0001"} 3
+            ...
+
+        :param prefix: Prefix of the metric names.
+        :type prefix: str
+        :rtype: str
+        """
+        with self._lock:
+            histograms = sorted(self.histograms.items())
+            lines = []
+            for metric, counts_attribute, sum_attribute in (('wall', 'wall_time_counts', 'wall_time_sum'),
+                                                            ('cpu', 'cpu_time_counts', 'cpu_time_sum')):
+                name = '{}_{}_seconds'.format(prefix, metric)
+                lines.append('# TYPE {} histogram'.format(name))
+                for stage, histogram in histograms:
+                    cumulative_count = 0
+                    bounds = [str(bound) for bound in self.buckets] + ['+Inf']
+                    for bound, count in zip(bounds, getattr(histogram, counts_attribute)):
+                        cumulative_count += count
+                        lines.append('{}_bucket{{stage="{}",le="{}"}} {}'.format(name, stage, bound, cumulative_count))
+                    lines.append('{}_sum{{stage="{}"}} {!r}'.format(name, stage, getattr(histogram, sum_attribute)))
+                    lines.append('{}_count{{stage="{}"}} {}'.format(name, stage, histogram.count))
+            name = '{}_runs_total'.format(prefix)
+            lines.append('# TYPE {} counter'.format(name))
+            for stage, histogram in histograms:
+                for outcome, count in sorted(histogram.outcomes.items()):
+                    lines.append('{}{{stage="{}",outcome="{}"}} {}'.format(name, stage, outcome, count))
+        return '\n'.join(lines) + '\n'
+
+    def clear(self):
+        with self._lock:
+            self.histograms = {}
+
+
+timer_registry = TimerRegistry()
+
+
+class StageTimer(object):
+    """
+    Wall time, CPU time and outcome of the stages of one run, added to the histograms of a TimerRegistry.
+
+    Example:
+        >>> stage_timer = StageTimer()
+        >>> with stage_timer.stage('regression'):
+        ...     linearity_validator.ordinary_least_squares_linear_regression()
+        >>> stage_timer.as_list()
+        [{'stage': 'regression', 'wall_time': 0.00012, 'cpu_time': 0.00011, 'outcome': 'ok'}]
+    """
+
+    def __init__(self, registry=timer_registry):
+        """
+        :param registry: The registry of the histograms (default value = timer_registry, None for no histograms).
+        :type registry: TimerRegistry
+        """
+        self.registry = registry
+        self.timings = []
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Time a stage. The outcome is 'ok', or the name of the exception raised by the stage, which is raised again.
+        :param name: Name of the stage.
+        :type name: str
+        """
+        outcome = OK
+        wall_start = time.perf_counter()
+        cpu_start = _cpu_time()
+        try:
+            yield
+        except BaseException as exception:
+            outcome = type(exception).__name__
+            raise
+        finally:
+            stage_timing = StageTiming(name, time.perf_counter() - wall_start, _cpu_time() - cpu_start, outcome)
+            self.timings.append(stage_timing)
+            if self.registry is not None:
+                self.registry.record(stage_timing)
+
+    def as_list(self):
+        """
+        :return: The timings of the stages, in the order they ran.
+        :rtype: list[dict]
+        """
+        return [dict(stage_timing._asdict()) for stage_timing in self.timings]
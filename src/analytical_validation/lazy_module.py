@@ -0,0 +1,58 @@
+import importlib
+
+
+class LazyModule(object):
+    """
+    Stand-in for a module imported on the first access to one of its attributes, so the statistical libraries only
+    used by some code paths (statsmodels, scipy.stats, pandas) are not imported with the package.
+
+    A submodule not imported by its package is imported when it is accessed. Attributes set or deleted on the
+    stand-in, e.g. by mock.patch, are set or deleted on the module.
+
+    Example:
+        >>> stats = LazyModule('scipy.stats')
+        >>> stats.shapiro([0.1, 0.2, 0.4])
+
+    :param name: The absolute name of the module.
+    :type name: str
+    """
+
+    def __init__(self, name):
+        object.__setattr__(self, '__name__', name)
+        object.__setattr__(self, '_module', None)
+
+    def load(self):
+        """
+        Import the module, if not already imported.
+        :return: The module.
+        :rtype: module
+        """
+        if self._module is None:
+            object.__setattr__(self, '_module', importlib.import_module(self.__name__))
+        return self._module
+
+    def __getattr__(self, name):
+        # Only called for the attributes not found on the stand-in
+        if name.startswith('__'):
+            raise AttributeError(name)
+        module = self.load()
+        try:
+            return getattr(module, name)
+        except AttributeError:
+            pass
+        try:
+            submodule = importlib.import_module('{}.{}'.format(self.__name__, name))
+        except ImportError:
+            raise AttributeError("module '{}' has no attribute '{}'".format(self.__name__, name))
+        # Bound again when it was deleted from its package, as importing it the first time does
+        setattr(module, name, submodule)
+        return submodule
+
+    def __setattr__(self, name, value):
+        setattr(self.load(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self.load(), name)
+
+    def __repr__(self):
+        return "<lazy module '{}'{}>".format(self.__name__, '' if self._module is None else ' (imported)')
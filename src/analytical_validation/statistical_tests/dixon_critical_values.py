@@ -0,0 +1,146 @@
+import os
+
+import numpy
+
+from analytical_validation.exceptions import AlphaNotValid, DataIsOutOfRange, DixonStatisticNotValid
+
+CRITICAL_VALUES_PATH = os.path.join(os.path.dirname(__file__), 'data', 'dixon_critical_values.npz')
+
+# Dixon ratio statistics: (gap order, number of values excluded from the opposite end of the range)
+STATISTICS = {'r10': (1, 0), 'r11': (1, 1), 'r21': (2, 1), 'r22': (2, 2)}
+MINIMUM_SAMPLE_SIZE = {'r10': 3, 'r11': 4, 'r21': 5, 'r22': 6}
+MAXIMUM_SAMPLE_SIZE = 100
+# Critical values are tabulated on a grid uniform in log(alpha), so an alpha is located by arithmetic
+ALPHA_RANGE = (0.001, 0.5)
+ALPHA_GRID_SIZE = 64
+SEED = 20201017
+SIMULATIONS = 200000
+# Critical values are stored as uint16 fractions of 1
+_QUANTIZATION = 65535
+
+_critical_values = None
+
+
+def alpha_grid():
+    """
+    :return: The alpha values of the critical value tables.
+    :rtype: numpy.ndarray
+    """
+    return numpy.geomspace(ALPHA_RANGE[0], ALPHA_RANGE[1], ALPHA_GRID_SIZE)
+
+
+def dixon_statistic(sorted_data, statistic='r10', nobs=None):
+    """
+    Dixon ratios of the lowest and highest values of sorted data sets.
+    :param sorted_data: Data sets sorted along the last axis, with missing values (nan) at the end.
+    :type sorted_data: numpy.ndarray
+    :param statistic: The Dixon ratio, one of 'r10', 'r11', 'r21' or 'r22'.
+    :type statistic: str
+    :param nobs: Number of values of each data set (default value = None, the last axis length).
+    :type nobs: numpy.ndarray
+    :return low: Ratio of the lowest value of each data set.
+    :rtype low: numpy.ndarray
+    :return high: Ratio of the highest value of each data set.
+    :rtype high: numpy.ndarray
+    """
+    gap, excluded = STATISTICS[statistic]
+    if nobs is None:
+        nobs = numpy.full(sorted_data.shape[:-1], sorted_data.shape[-1])
+
+    def order_statistic(index):
+        index = numpy.clip(index, 0, sorted_data.shape[-1] - 1)[..., numpy.newaxis]
+        return numpy.take_along_axis(sorted_data, index, axis=-1)[..., 0]
+
+    last = nobs - 1
+    minimum = sorted_data[..., 0]
+    maximum = order_statistic(last)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        low = (sorted_data[..., gap] - minimum) / (order_statistic(last - excluded) - minimum)
+        high = (maximum - order_statistic(last - gap)) / (maximum - sorted_data[..., excluded])
+    return low, high
+
+
+def generate_critical_values(seed=SEED, simulations=SIMULATIONS):
+    """
+    Generate the critical value tables by Monte Carlo simulation of normal samples.
+
+    The critical value of a sample size and alpha is the (1 - alpha) quantile of the largest of the low and high
+    Dixon ratios, the same convention of the published r10 tables used by DixonQTest.
+    :param seed: Seed of the random number generator.
+    :type seed: int
+    :param simulations: Number of simulated samples of each size.
+    :type simulations: int
+    :return: Critical values with shape (statistic, sample size - 3, alpha).
+    :rtype: numpy.ndarray
+    """
+    random_generator = numpy.random.default_rng(seed)
+    quantiles = 1.0 - alpha_grid()
+    sample_sizes = range(3, MAXIMUM_SAMPLE_SIZE + 1)
+    critical_values = numpy.full((len(STATISTICS), len(sample_sizes), ALPHA_GRID_SIZE), numpy.nan)
+    for size_index, sample_size in enumerate(sample_sizes):
+        samples = numpy.sort(random_generator.standard_normal((simulations, sample_size)), axis=-1)
+        for statistic_index, statistic in enumerate(STATISTICS):
+            if sample_size >= MINIMUM_SAMPLE_SIZE[statistic]:
+                ratio = numpy.maximum(*dixon_statistic(samples, statistic))
+                critical_values[statistic_index, size_index] = numpy.quantile(ratio, quantiles)
+    return critical_values
+
+
+def save_critical_values(critical_values, path=CRITICAL_VALUES_PATH, seed=SEED, simulations=SIMULATIONS):
+    """Store the critical value tables as a compressed array of uint16 fractions, 0 marking missing values."""
+    quantized = numpy.where(numpy.isnan(critical_values), 0,
+                            numpy.round(numpy.nan_to_num(critical_values) * _QUANTIZATION)).astype(numpy.uint16)
+    numpy.savez_compressed(path, critical_values=quantized, alphas=alpha_grid(), seed=seed, simulations=simulations)
+
+
+def load_critical_values(path=CRITICAL_VALUES_PATH):
+    """
+    The critical value tables, read from disk on first use.
+    :return: Critical values with shape (statistic, sample size - 3, alpha).
+    :rtype: numpy.ndarray
+    """
+    global _critical_values
+    if _critical_values is None:
+        with numpy.load(path) as stored:
+            quantized = stored['critical_values']
+        _critical_values = numpy.where(quantized == 0, numpy.nan, quantized / _QUANTIZATION)
+    return _critical_values
+
+
+def critical_value(sample_size, alpha=0.05, statistic='r10'):
+    """
+    Dixon critical value, linearly interpolated in log(alpha) between the tabulated alpha values.
+
+    Example:
+        >>> critical_value(10, alpha=0.05)
+        >>> critical_value(numpy.array([5, 50]), alpha=0.025, statistic='r22')
+
+    :param sample_size: Number of values of the data set, from the statistic minimum up to 100.
+    :type sample_size: int or numpy.ndarray
+    :param alpha: Significance, from 0.001 to 0.5.
+    :type alpha: float
+    :param statistic: The Dixon ratio, one of 'r10', 'r11', 'r21' or 'r22'.
+    :type statistic: str
+    :return: The critical value of each sample size.
+    :rtype: numpy.float64 or numpy.ndarray
+    :raises DixonStatisticNotValid: When the statistic is not one of STATISTICS.
+    :raises AlphaNotValid: When alpha is out of the tabulated range.
+    :raises DataIsOutOfRange: When a sample size is out of the tabulated range.
+    """
+    if statistic not in STATISTICS:
+        raise DixonStatisticNotValid()
+    if isinstance(alpha, bool) or not isinstance(alpha, (int, float)) or \
+            not ALPHA_RANGE[0] <= alpha <= ALPHA_RANGE[1]:
+        raise AlphaNotValid()
+    sample_size = numpy.asarray(sample_size)
+    if ((sample_size < MINIMUM_SAMPLE_SIZE[statistic]) | (sample_size > MAXIMUM_SAMPLE_SIZE)).any():
+        raise DataIsOutOfRange()
+    table = load_critical_values()[list(STATISTICS).index(statistic), sample_size - 3]
+    position = numpy.log(alpha / ALPHA_RANGE[0]) / numpy.log(ALPHA_RANGE[1] / ALPHA_RANGE[0]) * (ALPHA_GRID_SIZE - 1)
+    lower = min(int(position), ALPHA_GRID_SIZE - 2)
+    fraction = position - lower
+    return table[..., lower] * (1.0 - fraction) + table[..., lower + 1] * fraction
+
+
+if __name__ == '__main__':
+    save_critical_values(generate_critical_values())
@@ -1,4 +1,9 @@
-from analytical_validation.exceptions import DataNotList, DataNotNumber, DataIsEmpty, AlphaNotValid, DirectionNotBoolean
+import numpy
+
+from analytical_validation.exceptions import DataNotList, DataNotNumber, DataIsEmpty, AlphaNotValid, \
+    DirectionNotBoolean, DixonStatisticNotValid
+from analytical_validation.statistical_tests import dixon_critical_values
+from analytical_validation.statistical_tests.dixon_critical_values import dixon_statistic
 
 
 class DixonQTest(object):
@@ -19,6 +24,7 @@ class DixonQTest(object):
                      0.384, 0.38, 0.376, 0.372
                      ],
     }
+    ALPHA_KEYS = {0.10: 'alpha_10', 0.05: 'alpha_05', 0.01: 'alpha_01'}
 
     def __init__(self, data, left=True, right=True, alpha=0.05):
         """
@@ -84,14 +90,7 @@ class DixonQTest(object):
         :return q_critical: The critical Q value for the given data.
         :rtype q_critical: float
         """
-        alpha_q_values = None
-        if self.alpha == 0.10:
-            alpha_q_values = DixonQTest.QVALUES['alpha_10']
-        elif self.alpha == 0.05:
-            alpha_q_values = DixonQTest.QVALUES['alpha_05']
-        elif self.alpha == 0.01:
-            alpha_q_values = DixonQTest.QVALUES['alpha_01']
-        return {n: q for n, q in zip(range(3, len(alpha_q_values) + 1), alpha_q_values)}[len(self.data)]
+        return DixonQTest.QVALUES[DixonQTest.ALPHA_KEYS[self.alpha]][len(self.data) - 3]
 
     @property
     def calculated_q_value(self):
@@ -149,3 +148,91 @@ class DixonQTest(object):
             return self.remove_outliers()
         else:
             return [], self.data
+
+
+def pad_data_sets(data_sets):
+    """
+    Arrange data sets of different lengths in a 2-D array padded with nan.
+    :param data_sets: List containing the data sets.
+    :type data_sets: list[list[float]]
+    :return: The padded data sets, one data set per row.
+    :rtype: numpy.ndarray
+    """
+    padded_data = numpy.full((len(data_sets), max((len(data_set) for data_set in data_sets), default=0)), numpy.nan)
+    for index, data_set in enumerate(data_sets):
+        padded_data[index, :len(data_set)] = data_set
+    return padded_data
+
+
+def check_data_sets_for_outliers(data, left=True, right=True, alpha=0.05, statistic='r10'):
+    """
+    Dixon Q test of every data set of a padded array at once.
+
+    Applies the same rules of DixonQTest.check_data_for_outliers to each row: at most one outlier, the minimum or
+    the maximum value, is removed per set. The r10 test at alpha 0.01, 0.05 or 0.10 of sets with up to 30 values
+    uses the DixonQTest published critical values; any other statistic, alpha or set with up to 100 values uses the
+    Monte Carlo critical value tables. Sets out of the tabulated sizes are not checked.
+
+    Example:
+        >>> data = numpy.array([[1.0, 1.0, 10.0], [2.0, 6.0, 2.0], [3.0, 3.1, numpy.nan]])
+        >>> outliers_mask, cleaned_data = check_data_sets_for_outliers(data)
+        >>> outliers_mask
+        array([[False, False,  True], [False,  True, False], [False, False, False]])
+
+    :param data: Data sets padded with nan, one data set per row.
+    :type data: numpy.ndarray
+    :param left: Q-test of minimum value in the ordered data sets if True.
+    :type left: bool
+    :param right: Q-test of maximum value in the ordered data sets if True.
+    :type right: bool
+    :param alpha: Significance, from 0.001 to 0.5 (default value = 0.05)
+    :type alpha: float
+    :param statistic: The Dixon ratio, one of 'r10', 'r11', 'r21' or 'r22' (default value = 'r10')
+    :type statistic: str
+    :return outliers_mask: True where the value is an outlier.
+    :rtype outliers_mask: numpy.ndarray
+    :return cleaned_data: The data sets with the outliers replaced by nan.
+    :rtype cleaned_data: numpy.ndarray
+    :raises DirectionNotBoolean: When left and right are not booleans.
+    :raises AlphaNotValid: When alpha is out of the tabulated range.
+    :raises DixonStatisticNotValid: When the statistic is not one of r10, r11, r21 or r22.
+    """
+    if isinstance(left, bool) is False and isinstance(right, bool) is False:
+        raise DirectionNotBoolean()
+    if statistic not in dixon_critical_values.STATISTICS:
+        raise DixonStatisticNotValid()
+    if isinstance(alpha, bool) or not isinstance(alpha, (int, float)) or \
+            not dixon_critical_values.ALPHA_RANGE[0] <= alpha <= dixon_critical_values.ALPHA_RANGE[1]:
+        raise AlphaNotValid()
+    data = numpy.atleast_2d(numpy.asarray(data, dtype=float))
+    valid = ~numpy.isnan(data)
+    nobs = valid.sum(axis=-1)
+    minimum_sample_size = dixon_critical_values.MINIMUM_SAMPLE_SIZE[statistic]
+    published = statistic == 'r10' and alpha in DixonQTest.ALPHA_KEYS
+    checked = (nobs >= minimum_sample_size) & (nobs <= dixon_critical_values.MAXIMUM_SAMPLE_SIZE)
+    outliers_mask = numpy.zeros(data.shape, dtype=bool)
+    if not checked.any():
+        return outliers_mask, data.copy()
+    sample_size = numpy.clip(nobs, minimum_sample_size, dixon_critical_values.MAXIMUM_SAMPLE_SIZE)
+    if published:
+        alpha_q_values = numpy.array(DixonQTest.QVALUES[DixonQTest.ALPHA_KEYS[alpha]])
+        q_critical = alpha_q_values[numpy.minimum(sample_size, len(alpha_q_values) + 2) - 3]
+        large = sample_size > len(alpha_q_values) + 2
+        if large.any():
+            q_critical[large] = dixon_critical_values.critical_value(sample_size[large], alpha, statistic)
+    else:
+        q_critical = dixon_critical_values.critical_value(sample_size, alpha, statistic)
+    # nan values are sorted to the end of each row
+    sorted_data = numpy.sort(data, axis=-1)
+    q_left, q_right = dixon_statistic(sorted_data, statistic, sample_size)
+    q_left, q_right = numpy.round(q_left, 3), numpy.round(q_right, 3)
+    checked &= sorted_data[:, 0] != numpy.take_along_axis(sorted_data, sample_size[:, numpy.newaxis] - 1, axis=-1)[:, 0]
+    if left is True and right is True:
+        checked &= q_left != q_right
+    with numpy.errstate(invalid='ignore'):
+        left_outlier = checked & (left is True) & (q_left > q_critical)
+        right_outlier = checked & ~left_outlier & (right is True) & (q_right > q_critical)
+    rows = numpy.arange(data.shape[0])
+    outliers_mask[rows, numpy.argmin(numpy.where(valid, data, numpy.inf), axis=-1)] = left_outlier
+    outliers_mask[rows, numpy.argmax(numpy.where(valid, data, -numpy.inf), axis=-1)] |= right_outlier
+    return outliers_mask, numpy.where(outliers_mask, numpy.nan, data)
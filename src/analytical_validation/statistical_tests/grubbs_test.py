@@ -0,0 +1,165 @@
+import numpy
+
+from analytical_validation.exceptions import AlphaNotValid, ValueNotValid
+from analytical_validation.lazy_module import LazyModule
+
+# scipy.special is imported by the first critical value, or by the warm-up of the workers
+scipy = LazyModule('scipy')
+
+MINIMUM_SAMPLE_SIZE = 3
+
+
+def grubbs_critical_value(sample_size, alpha=0.05):
+    """
+    Two-sided Grubbs critical value, the same used by each step of the generalized ESD test.
+    :param sample_size: Number of values of the data set.
+    :type sample_size: int or numpy.ndarray
+    :param alpha: Significance (default value = 0.05)
+    :type alpha: float
+    :return: The critical value of each sample size, nan when there are less than 3 values.
+    :rtype: numpy.float64 or numpy.ndarray
+    """
+    sample_size = numpy.asarray(sample_size, dtype=float)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        degrees_of_freedom = numpy.where(sample_size >= MINIMUM_SAMPLE_SIZE, sample_size - 2.0, numpy.nan)
+        t = scipy.special.stdtrit(degrees_of_freedom, 1.0 - alpha / (2.0 * sample_size))
+        return (sample_size - 1.0) * t / numpy.sqrt((degrees_of_freedom + t * t) * sample_size)
+
+
+def _check_alpha(alpha):
+    if isinstance(alpha, bool) or not isinstance(alpha, (int, float)) or not 0 < alpha < 1:
+        raise AlphaNotValid()
+
+
+def _extreme_studentized_deviates(data, alpha, max_outliers, stop_at_first_non_significant=False):
+    """
+    Remove the most extreme value of each data set up to max_outliers times.
+
+    The data sets are sorted once, so the most extreme remaining value is always at one of the two ends of the
+    sorted values, and the running mean and sum of squared deviations are downdated (Welford) on each removal:
+    every step costs O(1) per data set instead of a new pass over the remaining values.
+    :param stop_at_first_non_significant: Stop removing the values of a data set after its first non significant
+    step, and stop the loop once no data set has a significant step left (default value = False).
+    :type stop_at_first_non_significant: bool
+    :return removed: Column index in data of the value removed at each step, -1 when the step was not run.
+    :rtype removed: numpy.ndarray
+    :return significant: True where the step statistic is greater than its critical value.
+    :rtype significant: numpy.ndarray
+    """
+    rows = numpy.arange(data.shape[0])
+    nobs = (~numpy.isnan(data)).sum(axis=-1)
+    steps = numpy.clip(numpy.minimum(max_outliers, nobs - 2), 0, None)
+    # nan values are sorted to the end of each row
+    order = numpy.argsort(data, axis=-1)
+    sorted_data = numpy.take_along_axis(data, order, axis=-1)
+    low = numpy.zeros(data.shape[0], dtype=int)
+    high = numpy.maximum(nobs - 1, 0)
+    remaining = nobs.astype(float)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        mean = numpy.nansum(data, axis=-1) / remaining
+        sum_of_squares = numpy.nansum((data - mean[:, numpy.newaxis]) ** 2, axis=-1)
+    total_steps = int(steps.max(initial=0))
+    removed = numpy.full((data.shape[0], total_steps), -1)
+    significant = numpy.zeros((data.shape[0], total_steps), dtype=bool)
+    still_significant = numpy.ones(data.shape[0], dtype=bool)
+    for step in range(total_steps):
+        active = (step < steps) & still_significant
+        low_value = sorted_data[rows, numpy.minimum(low, sorted_data.shape[-1] - 1)]
+        high_value = sorted_data[rows, high]
+        from_high = high_value - mean >= mean - low_value
+        value = numpy.where(from_high, high_value, low_value)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            deviate = numpy.abs(value - mean) / numpy.sqrt(sum_of_squares / (remaining - 1.0))
+            significant[:, step] = active & (deviate > grubbs_critical_value(remaining, alpha))
+        removed[:, step] = numpy.where(active, order[rows, numpy.where(from_high, high, low)], -1)
+        if stop_at_first_non_significant:
+            still_significant = significant[:, step]
+            if not still_significant.any():
+                return removed[:, :step + 1], significant[:, :step + 1]
+        # Welford downdate of the running mean and sum of squared deviations
+        downdated = numpy.where(active, remaining - 1.0, remaining)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            new_mean = numpy.where(active, mean - (value - mean) / downdated, mean)
+        sum_of_squares = numpy.where(active, sum_of_squares - (value - mean) * (value - new_mean), sum_of_squares)
+        mean, remaining = new_mean, downdated
+        high = numpy.where(active & from_high, high - 1, high)
+        low = numpy.where(active & ~from_high, low + 1, low)
+    return removed, significant
+
+
+def _outliers(data, removed, outliers_count):
+    outliers_mask = numpy.zeros(data.shape, dtype=bool)
+    taken = numpy.arange(removed.shape[-1]) < outliers_count[:, numpy.newaxis]
+    outliers_mask[numpy.nonzero(taken)[0], removed[taken]] = True
+    return outliers_mask, numpy.where(outliers_mask, numpy.nan, data)
+
+
+def _as_padded_data(data):
+    try:
+        return numpy.atleast_2d(numpy.asarray(data, dtype=float))
+    except (TypeError, ValueError):
+        raise ValueNotValid()
+
+
+def grubbs_outliers(data, alpha=0.05):
+    """
+    Iterated two-sided Grubbs test of every data set of a padded array at once.
+
+    The most extreme value is removed while it is an outlier by the Grubbs test of the remaining values, so the test
+    stops at the first step where no data set has an outlier left.
+
+    Example:
+        >>> outliers_mask, cleaned_data = grubbs_outliers([[1.0, 1.1, 0.9, 1.0, 1.05, 9.0]])
+
+    :param data: Data sets padded with nan, one data set per row.
+    :type data: numpy.ndarray
+    :param alpha: Significance (default value = 0.05)
+    :type alpha: float
+    :return outliers_mask: True where the value is an outlier.
+    :rtype outliers_mask: numpy.ndarray
+    :return cleaned_data: The data sets with the outliers replaced by nan.
+    :rtype cleaned_data: numpy.ndarray
+    :raises AlphaNotValid: When alpha is not between 0 and 1.
+    :raises ValueNotValid: When the data has a value that isn't a number.
+    """
+    _check_alpha(alpha)
+    data = _as_padded_data(data)
+    nobs = (~numpy.isnan(data)).sum(axis=-1)
+    removed, significant = _extreme_studentized_deviates(data, alpha, nobs, stop_at_first_non_significant=True)
+    # The number of outliers is the number of significant steps before the first non significant one
+    outliers_count = numpy.cumprod(significant, axis=-1).sum(axis=-1)
+    return _outliers(data, removed, outliers_count)
+
+
+def generalized_esd_outliers(data, alpha=0.05, max_outliers=None):
+    """
+    Generalized extreme studentized deviate (Rosner) test of every data set of a padded array at once.
+
+    Up to max_outliers extreme values are removed one at a time and the number of outliers is the largest step whose
+    statistic exceeds its critical value, so masked outliers are found where the iterated Grubbs test stops early.
+
+    Example:
+        >>> outliers_mask, cleaned_data = generalized_esd_outliers([[1.0, 1.1, 0.9, 1.0, 1.05, 9.0, 9.1]])
+
+    :param data: Data sets padded with nan, one data set per row.
+    :type data: numpy.ndarray
+    :param alpha: Significance (default value = 0.05)
+    :type alpha: float
+    :param max_outliers: Upper bound of the number of outliers of each data set (default value = None, 10% of the
+    values, at least 1).
+    :type max_outliers: int or numpy.ndarray
+    :return outliers_mask: True where the value is an outlier.
+    :rtype outliers_mask: numpy.ndarray
+    :return cleaned_data: The data sets with the outliers replaced by nan.
+    :rtype cleaned_data: numpy.ndarray
+    :raises AlphaNotValid: When alpha is not between 0 and 1.
+    :raises ValueNotValid: When the data has a value that isn't a number.
+    """
+    _check_alpha(alpha)
+    data = _as_padded_data(data)
+    if max_outliers is None:
+        max_outliers = numpy.maximum((~numpy.isnan(data)).sum(axis=-1) // 10, 1)
+    removed, significant = _extreme_studentized_deviates(data, alpha, numpy.asarray(max_outliers))
+    steps = numpy.arange(1, significant.shape[-1] + 1)
+    outliers_count = numpy.where(significant, steps, 0).max(axis=-1, initial=0)
+    return _outliers(data, removed, outliers_count)
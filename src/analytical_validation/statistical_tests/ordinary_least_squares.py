@@ -0,0 +1,283 @@
+from collections import namedtuple
+
+import numpy
+
+from analytical_validation.lazy_module import LazyModule
+
+# scipy.special is imported on its first use, or by the warm-up of the workers
+scipy = LazyModule('scipy')
+
+RegressionModelData = namedtuple('RegressionModelData', ['endog', 'exog'])
+
+
+class SufficientStatistics(object):
+    """
+    Sufficient statistics of a single predictor linear regression.
+
+    The statistics are kept centered (means and co-moments) instead of the raw
+    sums (n, Σx, Σy, Σxy, Σx², Σy²). Both carry the same information, but the
+    centered form does not lose precision when the signal is large compared
+    to its spread, which is the usual case for chromatographic areas.
+
+    Example:
+        >>> statistics = SufficientStatistics.from_data([1.0, 2.0, 3.0], [2.1, 3.9, 6.0])
+        >>> statistics.nobs
+        3
+    """
+
+    def __init__(self, nobs=0, mean_x=0.0, mean_y=0.0, sxx=0.0, syy=0.0, sxy=0.0, sum_of_weights=None):
+        """
+        :param nobs: Number of observations.
+        :type nobs: int
+        :param mean_x: Mean of the independent variable (concentration).
+        :type mean_x: float
+        :param mean_y: Mean of the dependent variable (analytical signal).
+        :type mean_y: float
+        :param sxx: Sum of squared deviations of x, Σ(x - x̄)².
+        :type sxx: float
+        :param syy: Sum of squared deviations of y, Σ(y - ȳ)².
+        :type syy: float
+        :param sxy: Sum of cross deviations, Σ(x - x̄)(y - ȳ).
+        :type sxy: float
+        :param sum_of_weights: Sum of the observation weights of a weighted fit, None when unweighted.
+        :type sum_of_weights: float
+        """
+        self.nobs = nobs
+        self.sum_of_weights = sum_of_weights
+        self.mean_x = mean_x
+        self.mean_y = mean_y
+        self.sxx = sxx
+        self.syy = syy
+        self.sxy = sxy
+
+    @classmethod
+    def from_data(cls, exog_data, endog_data, weights=None):
+        """
+        Compute the statistics of a data set in two vectorized passes.
+
+        When weights has more dimensions than the data, e.g. one row per candidate weighting, the statistics of every
+        row are computed at once over the same data.
+        :param exog_data: Independent variable values (concentration).
+        :type exog_data: list or numpy.ndarray
+        :param endog_data: Dependent variable values (analytical signal).
+        :type endog_data: list or numpy.ndarray
+        :param weights: Observation weights of a weighted fit (default value = None, unweighted).
+        :type weights: numpy.ndarray
+        :return: The sufficient statistics of the data set.
+        :rtype: SufficientStatistics
+        """
+        exog_data = numpy.asarray(exog_data, dtype=float)
+        endog_data = numpy.asarray(endog_data, dtype=float)
+        nobs = exog_data.shape[-1]
+        if weights is None:
+            mean_x = exog_data.mean(axis=-1)
+            mean_y = endog_data.mean(axis=-1)
+            deviation_x = exog_data - numpy.expand_dims(mean_x, -1)
+            deviation_y = endog_data - numpy.expand_dims(mean_y, -1)
+            return cls(nobs, mean_x, mean_y,
+                       (deviation_x * deviation_x).sum(axis=-1),
+                       (deviation_y * deviation_y).sum(axis=-1),
+                       (deviation_x * deviation_y).sum(axis=-1))
+        weights = numpy.asarray(weights, dtype=float)
+        sum_of_weights = weights.sum(axis=-1)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            mean_x = (weights * exog_data).sum(axis=-1) / sum_of_weights
+            mean_y = (weights * endog_data).sum(axis=-1) / sum_of_weights
+        deviation_x = exog_data - numpy.expand_dims(mean_x, -1)
+        deviation_y = endog_data - numpy.expand_dims(mean_y, -1)
+        return cls(nobs, mean_x, mean_y,
+                   (weights * deviation_x * deviation_x).sum(axis=-1),
+                   (weights * deviation_y * deviation_y).sum(axis=-1),
+                   (weights * deviation_x * deviation_y).sum(axis=-1),
+                   sum_of_weights)
+
+    @classmethod
+    def from_sums(cls, nobs, sum_x, sum_y, sum_xy, sum_xx, sum_yy):
+        """
+        Build the statistics from the raw sums (n, Σx, Σy, Σxy, Σx², Σy²).
+        :return: The sufficient statistics of the data set.
+        :rtype: SufficientStatistics
+        """
+        mean_x = sum_x / nobs
+        mean_y = sum_y / nobs
+        return cls(nobs, mean_x, mean_y,
+                   sum_xx - nobs * mean_x * mean_x,
+                   sum_yy - nobs * mean_y * mean_y,
+                   sum_xy - nobs * mean_x * mean_y)
+
+    def add(self, x, y):
+        """
+        Update the statistics of an unweighted fit with a new observation in O(1) (Welford update).
+        :param x: Independent variable value (concentration).
+        :type x: float
+        :param y: Dependent variable value (analytical signal).
+        :type y: float
+        """
+        self.nobs += 1
+        deviation_x = x - self.mean_x
+        deviation_y = y - self.mean_y
+        self.mean_x += deviation_x / self.nobs
+        self.mean_y += deviation_y / self.nobs
+        self.sxx += deviation_x * (x - self.mean_x)
+        self.syy += deviation_y * (y - self.mean_y)
+        self.sxy += deviation_x * (y - self.mean_y)
+
+    def remove(self, x, y):
+        """
+        Downdate the statistics of an unweighted fit removing an observation in O(1), the inverse of add.
+        :param x: Independent variable value (concentration) of the removed observation.
+        :type x: float
+        :param y: Dependent variable value (analytical signal) of the removed observation.
+        :type y: float
+        """
+        if self.nobs <= 1:
+            self.__init__()
+            return
+        self.nobs -= 1
+        deviation_x = x - self.mean_x
+        deviation_y = y - self.mean_y
+        self.mean_x -= deviation_x / self.nobs
+        self.mean_y -= deviation_y / self.nobs
+        self.sxx -= deviation_x * (x - self.mean_x)
+        self.syy -= deviation_y * (y - self.mean_y)
+        self.sxy -= (x - self.mean_x) * deviation_y
+
+    def replace(self, old_x, old_y, x, y):
+        """
+        Replace an observation in O(1).
+        :param old_x: Independent variable value of the replaced observation.
+        :type old_x: float
+        :param old_y: Dependent variable value of the replaced observation.
+        :type old_y: float
+        :param x: Independent variable value of the new observation.
+        :type x: float
+        :param y: Dependent variable value of the new observation.
+        :type y: float
+        """
+        self.remove(old_x, old_y)
+        self.add(x, y)
+
+    def copy(self):
+        """
+        :return: An independent copy of the statistics.
+        :rtype: SufficientStatistics
+        """
+        return SufficientStatistics(self.nobs, self.mean_x, self.mean_y, self.sxx, self.syy, self.sxy,
+                                    self.sum_of_weights)
+
+    def select(self, index):
+        """
+        Statistics of one of the data sets or weightings held at once, without going over the data again.
+        :param index: Index of the data set or weighting.
+        :type index: int
+        :return: The statistics of the data set or weighting.
+        :rtype: SufficientStatistics
+        """
+        return SufficientStatistics(*[value if numpy.ndim(value) == 0 else value[index]
+                                      for value in (self.nobs, self.mean_x, self.mean_y, self.sxx, self.syy, self.sxy,
+                                                    self.sum_of_weights)])
+
+
+class OrdinaryLeastSquaresResult(object):
+    """
+    Closed form result of a single predictor Ordinary Least Squares regression.
+
+    Exposes the subset of the statsmodels ``RegressionResults`` interface read
+    by the validators (params, pvalues, rsquared, ess, ssr, fvalue, resid, ...),
+    so both engines can be used interchangeably. The values are plain numpy
+    scalars, or numpy arrays when the statistics hold many data sets at once.
+    """
+
+    def __init__(self, statistics, exog_data=None, endog_data=None):
+        """
+        :param statistics: Sufficient statistics of the fitted data.
+        :type statistics: SufficientStatistics
+        :param exog_data: Independent variable values, needed for residues.
+        :type exog_data: numpy.ndarray
+        :param endog_data: Dependent variable values, needed for residues.
+        :type endog_data: numpy.ndarray
+        """
+        self.statistics = statistics
+        self.exog_data = exog_data
+        self.endog_data = endog_data
+        nobs = numpy.asarray(statistics.nobs, dtype=float)
+        sum_of_weights = nobs if statistics.sum_of_weights is None else statistics.sum_of_weights
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            slope = statistics.sxy / statistics.sxx
+            intercept = statistics.mean_y - slope * statistics.mean_x
+            self.nobs = nobs
+            self.df_model = numpy.ones_like(nobs)
+            self.df_resid = nobs - 2.0
+            self.centered_tss = statistics.syy
+            self.ssr = numpy.maximum(statistics.syy - slope * statistics.sxy, 0.0)
+            self.ess = self.centered_tss - self.ssr
+            self.rsquared = 1.0 - self.ssr / self.centered_tss
+            self.rsquared_adj = 1.0 - (nobs - 1.0) / self.df_resid * (1.0 - self.rsquared)
+            self.mse_model = self.ess / self.df_model
+            self.mse_resid = self.ssr / self.df_resid
+            self.mse_total = self.centered_tss / (nobs - 1.0)
+            self.fvalue = self.mse_model / self.mse_resid
+            self.f_pvalue = scipy.special.fdtrc(self.df_model, self.df_resid, self.fvalue)
+            slope_bse = numpy.sqrt(self.mse_resid / statistics.sxx)
+            intercept_bse = numpy.sqrt(self.mse_resid * (1.0 / sum_of_weights +
+                                                         statistics.mean_x ** 2 / statistics.sxx))
+            self.params = numpy.array([intercept, slope])
+            self.bse = numpy.array([intercept_bse, slope_bse])
+            self.tvalues = self.params / self.bse
+            self.pvalues = 2.0 * scipy.special.stdtr(self.df_resid, -numpy.abs(self.tvalues))
+        self._resid = None
+
+    @property
+    def fittedvalues(self):
+        """Values predicted by the regression for each observation.
+        :rtype: numpy.ndarray
+        """
+        if self.exog_data is None:
+            return None
+        intercept, slope = self.params
+        return numpy.expand_dims(intercept, -1) + numpy.expand_dims(slope, -1) * self.exog_data
+
+    @property
+    def resid(self):
+        """Residues of the regression, computed on first access.
+        :rtype: numpy.ndarray
+        """
+        if self._resid is None and self.endog_data is not None:
+            self._resid = self.endog_data - self.fittedvalues
+        return self._resid
+
+    @property
+    def model(self):
+        """Design data of the fit, with the same ``endog``/``exog`` layout as statsmodels.
+        :rtype: RegressionModelData
+        """
+        exog = numpy.column_stack((numpy.ones_like(self.exog_data), self.exog_data))
+        return RegressionModelData(self.endog_data, exog)
+
+
+class OrdinaryLeastSquares(object):
+    """
+    Single predictor Ordinary Least Squares regression solved in closed form.
+
+    Example:
+        >>> fitted_result = OrdinaryLeastSquares([1.0, 2.0, 3.0], [2.1, 3.9, 6.0]).fit()
+        >>> intercept, slope = fitted_result.params
+    """
+
+    def __init__(self, exog_data, endog_data):
+        """
+        :param exog_data: Independent variable values (concentration).
+        :type exog_data: list or numpy.ndarray
+        :param endog_data: Dependent variable values (analytical signal).
+        :type endog_data: list or numpy.ndarray
+        """
+        self.exog_data = numpy.asarray(exog_data, dtype=float)
+        self.endog_data = numpy.asarray(endog_data, dtype=float)
+
+    def fit(self):
+        """Fit the regression line.
+        :return: The regression result.
+        :rtype: OrdinaryLeastSquaresResult
+        """
+        statistics = SufficientStatistics.from_data(self.exog_data, self.endog_data)
+        return OrdinaryLeastSquaresResult(statistics, self.exog_data, self.endog_data)
@@ -0,0 +1,208 @@
+from collections import namedtuple
+
+import numpy
+
+from analytical_validation.lazy_module import LazyModule
+
+# scipy.special is imported on its first use, or by the warm-up of the workers
+scipy = LazyModule('scipy')
+
+ResidualDiagnostics = namedtuple('ResidualDiagnostics', ['durbin_watson_value', 'breusch_pagan_lagrange_multiplier',
+                                                         'breusch_pagan_pvalue', 'shapiro_w', 'shapiro_pvalue'])
+
+# Royston (1992, 1995) polynomial approximations, the same used by scipy.stats.shapiro (algorithm AS R94)
+_SHAPIRO_A_N = [0.0, 0.221157, -0.147981, -2.071190, 4.434685, -2.706056]
+_SHAPIRO_A_N_1 = [0.0, 0.042981, -0.293762, -1.752461, 5.682633, -3.582633]
+_SHAPIRO_SMALL_GAMMA = [-2.273, 0.459]
+_SHAPIRO_SMALL_MEAN = [0.5440, -0.39978, 0.025054, -6.714e-4]
+_SHAPIRO_SMALL_SIGMA = [1.3822, -0.77857, 0.062767, -0.0020322]
+_SHAPIRO_LARGE_MEAN = [-1.5861, -0.31082, -0.083751, 0.0038915]
+_SHAPIRO_LARGE_SIGMA = [-0.4803, -0.082676, 0.0030302]
+
+
+def _polynomial(coefficients, value):
+    """Evaluate c[0] + c[1] * value + c[2] * value² + ..."""
+    return numpy.polynomial.polynomial.polyval(value, coefficients)
+
+
+def _as_masked_2d(data, mask=None):
+    """
+    Arrange data as a 2-D array with its mask of valid values.
+    :return data: Data with one curve per row, zero where masked.
+    :rtype data: numpy.ndarray
+    :return mask: True where the data holds a value.
+    :rtype mask: numpy.ndarray
+    :return is_1d: True when the given data was a single curve.
+    :rtype is_1d: bool
+    """
+    data = numpy.asarray(data, dtype=float)
+    is_1d = data.ndim == 1
+    data = numpy.atleast_2d(data)
+    mask = ~numpy.isnan(data) if mask is None else numpy.atleast_2d(numpy.asarray(mask, dtype=bool))
+    return numpy.where(mask, data, 0.0), mask, is_1d
+
+
+def _result(values, is_1d):
+    return values[0] if is_1d else values
+
+
+def _durbin_watson(resid, resid_squared, mask):
+    consecutive = mask[:, 1:] & mask[:, :-1]
+    difference = numpy.where(consecutive, numpy.diff(resid, axis=-1), 0.0)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return (difference * difference).sum(axis=-1) / resid_squared.sum(axis=-1)
+
+
+def _breusch_pagan(resid_squared, exog, mask):
+    nobs = mask.sum(axis=-1)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        mean_x = exog.sum(axis=-1) / nobs
+        mean_z = resid_squared.sum(axis=-1) / nobs
+        deviation_x = numpy.where(mask, exog - mean_x[:, numpy.newaxis], 0.0)
+        deviation_z = numpy.where(mask, resid_squared - mean_z[:, numpy.newaxis], 0.0)
+        rsquared = (deviation_x * deviation_z).sum(axis=-1) ** 2 / (
+                (deviation_x * deviation_x).sum(axis=-1) * (deviation_z * deviation_z).sum(axis=-1))
+    lagrange_multiplier = nobs * rsquared
+    return lagrange_multiplier, scipy.special.chdtrc(1, lagrange_multiplier)
+
+
+def _shapiro_coefficients(nobs):
+    """Shapiro-Wilk coefficients of a sample of size nobs, ordered as the sorted sample."""
+    if nobs == 3:
+        return numpy.array([-numpy.sqrt(0.5), 0.0, numpy.sqrt(0.5)])
+    expected_order_statistics = scipy.special.ndtri((numpy.arange(1, nobs + 1) - 0.375) / (nobs + 0.25))
+    sum_of_squares = (expected_order_statistics * expected_order_statistics).sum()
+    inverse_square_root_n = 1.0 / numpy.sqrt(nobs)
+    normalized = expected_order_statistics / numpy.sqrt(sum_of_squares)
+    coefficients = numpy.empty(nobs)
+    a_n = normalized[-1] + _polynomial(_SHAPIRO_A_N, inverse_square_root_n)
+    if nobs > 5:
+        a_n_1 = normalized[-2] + _polynomial(_SHAPIRO_A_N_1, inverse_square_root_n)
+        phi = (sum_of_squares - 2 * expected_order_statistics[-1] ** 2 - 2 * expected_order_statistics[-2] ** 2) / (
+                1 - 2 * a_n ** 2 - 2 * a_n_1 ** 2)
+        coefficients[2:-2] = expected_order_statistics[2:-2] / numpy.sqrt(phi)
+        coefficients[[0, 1, -2, -1]] = [-a_n, -a_n_1, a_n_1, a_n]
+    else:
+        phi = (sum_of_squares - 2 * expected_order_statistics[-1] ** 2) / (1 - 2 * a_n ** 2)
+        coefficients[1:-1] = expected_order_statistics[1:-1] / numpy.sqrt(phi)
+        coefficients[[0, -1]] = [-a_n, a_n]
+    return coefficients
+
+
+def _shapiro_pvalue(w, nobs):
+    """P-value of the Shapiro-Wilk W statistic of samples of size nobs (Royston 1995)."""
+    if nobs == 3:
+        return numpy.maximum(6.0 / numpy.pi * (numpy.arcsin(numpy.sqrt(w)) - numpy.arcsin(numpy.sqrt(0.75))), 0.0)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        log_one_minus_w = numpy.log1p(-w)
+        if nobs <= 11:
+            gamma = _polynomial(_SHAPIRO_SMALL_GAMMA, nobs)
+            normalized_w = -numpy.log(gamma - log_one_minus_w)
+            mean = _polynomial(_SHAPIRO_SMALL_MEAN, nobs)
+            sigma = numpy.exp(_polynomial(_SHAPIRO_SMALL_SIGMA, nobs))
+            pvalue = scipy.special.ndtr(-(normalized_w - mean) / sigma)
+            return numpy.where(log_one_minus_w >= gamma, 0.0, pvalue)
+        log_n = numpy.log(nobs)
+        mean = _polynomial(_SHAPIRO_LARGE_MEAN, log_n)
+        sigma = numpy.exp(_polynomial(_SHAPIRO_LARGE_SIGMA, log_n))
+        return scipy.special.ndtr(-(log_one_minus_w - mean) / sigma)
+
+
+def _shapiro_wilk(data, mask):
+    nobs = mask.sum(axis=-1)
+    w = numpy.full(data.shape[0], numpy.nan)
+    pvalue = numpy.full(data.shape[0], numpy.nan)
+    # Masked values are sorted after the valid ones, so each row starts with its sorted sample
+    sorted_data = numpy.sort(numpy.where(mask, data, numpy.inf), axis=-1)
+    for sample_size in numpy.unique(nobs[nobs >= 3]):
+        rows = nobs == sample_size
+        sample = sorted_data[rows, :sample_size]
+        deviation = sample - sample.mean(axis=-1, keepdims=True)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            w_rows = (sample @ _shapiro_coefficients(sample_size)) ** 2 / (deviation * deviation).sum(axis=-1)
+        w_rows = numpy.minimum(w_rows, 1.0)
+        w[rows] = w_rows
+        pvalue[rows] = _shapiro_pvalue(w_rows, sample_size)
+    return w, pvalue
+
+
+def durbin_watson(resid, mask=None):
+    """
+    Durbin-Watson statistic of the residues.
+    :param resid: Residues of the regression, one curve per row when 2-D.
+    :type resid: numpy.ndarray
+    :param mask: True where resid holds a value (default value = None, valid where not nan).
+    :type mask: numpy.ndarray
+    :return: The Durbin-Watson value of each curve.
+    :rtype: numpy.float64 or numpy.ndarray
+    """
+    resid, mask, is_1d = _as_masked_2d(resid, mask)
+    return _result(_durbin_watson(resid, resid * resid, mask), is_1d)
+
+
+def breusch_pagan(resid, exog, mask=None):
+    """
+    Studentized (Koenker) Breusch-Pagan test, the statsmodels het_breuschpagan default, with the auxiliary regression
+    of the squared residues on the concentration solved in closed form.
+    :param resid: Residues of the regression, one curve per row when 2-D.
+    :type resid: numpy.ndarray
+    :param exog: Concentration of each residue.
+    :type exog: numpy.ndarray
+    :param mask: True where resid holds a value (default value = None, valid where not nan).
+    :type mask: numpy.ndarray
+    :return lagrange_multiplier: The LM statistic of each curve.
+    :rtype lagrange_multiplier: numpy.float64 or numpy.ndarray
+    :return pvalue: The LM test p-value of each curve.
+    :rtype pvalue: numpy.float64 or numpy.ndarray
+    """
+    resid, mask, is_1d = _as_masked_2d(resid, mask)
+    exog = numpy.where(mask, numpy.atleast_2d(numpy.asarray(exog, dtype=float)), 0.0)
+    lagrange_multiplier, pvalue = _breusch_pagan(resid * resid, exog, mask)
+    return _result(lagrange_multiplier, is_1d), _result(pvalue, is_1d)
+
+
+def shapiro_wilk(data, mask=None):
+    """
+    Shapiro-Wilk normality test, nan for samples with less than 3 values.
+    :param data: The sample, one sample per row when 2-D.
+    :type data: numpy.ndarray
+    :param mask: True where data holds a value (default value = None, valid where not nan).
+    :type mask: numpy.ndarray
+    :return w: The W statistic of each sample.
+    :rtype w: numpy.float64 or numpy.ndarray
+    :return pvalue: The p-value of each sample.
+    :rtype pvalue: numpy.float64 or numpy.ndarray
+    """
+    data, mask, is_1d = _as_masked_2d(data, mask)
+    w, pvalue = _shapiro_wilk(data, mask)
+    return _result(w, is_1d), _result(pvalue, is_1d)
+
+
+def residual_diagnostics(resid, exog, normality_data=None, mask=None):
+    """
+    Durbin-Watson, Breusch-Pagan and Shapiro-Wilk tests in one fused pass over the residues.
+
+    The squared residues are computed once and shared by the Durbin-Watson denominator and the Breusch-Pagan
+    auxiliary regression.
+    :param resid: Residues of the regression, one curve per row when 2-D.
+    :type resid: numpy.ndarray
+    :param exog: Concentration of each residue.
+    :type exog: numpy.ndarray
+    :param normality_data: Sample checked by the Shapiro-Wilk test (default value = None, the residues).
+    :type normality_data: numpy.ndarray
+    :param mask: True where resid holds a value (default value = None, valid where not nan).
+    :type mask: numpy.ndarray
+    :return: The diagnostics of each curve.
+    :rtype: ResidualDiagnostics
+    """
+    resid, mask, is_1d = _as_masked_2d(resid, mask)
+    exog = numpy.where(mask, numpy.atleast_2d(numpy.asarray(exog, dtype=float)), 0.0)
+    resid_squared = resid * resid
+    durbin_watson_value = _durbin_watson(resid, resid_squared, mask)
+    lagrange_multiplier, breusch_pagan_pvalue = _breusch_pagan(resid_squared, exog, mask)
+    if normality_data is None:
+        shapiro_w, shapiro_pvalue = _shapiro_wilk(resid, mask)
+    else:
+        shapiro_w, shapiro_pvalue = _shapiro_wilk(numpy.atleast_2d(numpy.asarray(normality_data, dtype=float)), mask)
+    return ResidualDiagnostics(*(_result(values, is_1d) for values in (
+        durbin_watson_value, lagrange_multiplier, breusch_pagan_pvalue, shapiro_w, shapiro_pvalue)))
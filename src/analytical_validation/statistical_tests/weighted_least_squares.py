@@ -0,0 +1,152 @@
+import numpy
+
+from analytical_validation.data_handler.data_handler import ragged_data_sets, split_data_sets
+from analytical_validation.exceptions import WeightingNotValid
+from analytical_validation.statistical_tests.ordinary_least_squares import OrdinaryLeastSquaresResult, \
+    SufficientStatistics
+
+WEIGHTINGS = ('1/x', '1/x^2', '1/s^2')
+
+
+def weighting_factors(analytical_data, concentration_data):
+    """
+    Weights of every candidate weighting for each observation, stacked one weighting per row.
+
+    The 1/s² weights use the variance of the analytical signal of the replicates in the same concentration level.
+    Weights that can't be computed (zero concentration, single replicate or constant level) are infinite or nan.
+    :param analytical_data: List containing the analytical signal of each concentration level, or any layout
+    accepted by ragged_data_sets.
+    :type analytical_data: list[list[float]]
+    :param concentration_data: List containing the concentration of each analytical signal.
+    :type concentration_data: list[list[float]]
+    :return: Weights with shape (len(WEIGHTINGS), number of observations).
+    :rtype: numpy.ndarray
+    """
+    concentration, _ = ragged_data_sets(concentration_data)
+    analytical, level_offsets = ragged_data_sets(analytical_data)
+    level_variance = [numpy.var(data_set, ddof=1) if len(data_set) > 1 else numpy.nan
+                      for data_set in split_data_sets(analytical, level_offsets)]
+    variance = numpy.repeat(level_variance, numpy.diff(level_offsets))
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        return numpy.stack((1.0 / concentration, 1.0 / concentration ** 2, 1.0 / variance))
+
+
+class WeightedLeastSquaresResult(OrdinaryLeastSquaresResult):
+    """
+    Closed form result of a single predictor Weighted Least Squares regression.
+
+    Follows statsmodels ``WLS``: ``resid`` holds the unweighted residues and ``wresid`` the residues multiplied by
+    the square root of the weights.
+    """
+
+    def __init__(self, statistics, exog_data, endog_data, weights):
+        """
+        :param statistics: Weighted sufficient statistics of the fitted data.
+        :type statistics: SufficientStatistics
+        :param exog_data: Independent variable values.
+        :type exog_data: numpy.ndarray
+        :param endog_data: Dependent variable values.
+        :type endog_data: numpy.ndarray
+        :param weights: Observation weights.
+        :type weights: numpy.ndarray
+        """
+        super().__init__(statistics, exog_data, endog_data)
+        self.weights = weights
+
+    def select(self, index):
+        """Result of one of the weightings fitted at once, sliced out of this result without fitting again.
+        :param index: Row of the weighting in the weights.
+        :type index: int
+        :rtype: WeightedLeastSquaresResult
+        """
+        fitted_result = WeightedLeastSquaresResult(self.statistics.select(index), self.exog_data, self.endog_data,
+                                                   self.weights[index])
+        if self._resid is not None:
+            fitted_result._resid = self._resid[index]
+        return fitted_result
+
+    @property
+    def wresid(self):
+        """Weighted residues of the regression.
+        :rtype: numpy.ndarray
+        """
+        return numpy.sqrt(self.weights) * self.resid
+
+    @property
+    def sum_of_relative_errors(self):
+        """Sum of the absolute relative errors between the concentrations back calculated by the regression and the
+        nominal concentrations.
+        :rtype: numpy.float64
+        """
+        intercept, slope = self.params
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            back_calculated = (self.endog_data - numpy.expand_dims(intercept, -1)) / numpy.expand_dims(slope, -1)
+            return numpy.abs((back_calculated - self.exog_data) / self.exog_data).sum(axis=-1)
+
+
+class WeightedLeastSquares(object):
+    """
+    Single predictor Weighted Least Squares regression solved in closed form.
+
+    The weights may have one row per candidate weighting, in which case all of them are fitted in one vectorized
+    pass over the same data.
+
+    Example:
+        >>> fitted_result = WeightedLeastSquares([1.0, 2.0, 4.0], [2.1, 3.9, 8.3], [1.0, 0.5, 0.25]).fit()
+        >>> intercept, slope = fitted_result.params
+    """
+
+    def __init__(self, exog_data, endog_data, weights):
+        """
+        :param exog_data: Independent variable values (concentration).
+        :type exog_data: list or numpy.ndarray
+        :param endog_data: Dependent variable values (analytical signal).
+        :type endog_data: list or numpy.ndarray
+        :param weights: Observation weights, one row per weighting.
+        :type weights: numpy.ndarray
+        """
+        self.exog_data = numpy.asarray(exog_data, dtype=float)
+        self.endog_data = numpy.asarray(endog_data, dtype=float)
+        self.weights = numpy.asarray(weights, dtype=float)
+
+    def fit(self):
+        """Fit the regression line.
+        :return: The regression result.
+        :rtype: WeightedLeastSquaresResult
+        """
+        statistics = SufficientStatistics.from_data(self.exog_data, self.endog_data, self.weights)
+        return WeightedLeastSquaresResult(statistics, self.exog_data, self.endog_data, self.weights)
+
+
+def select_weighting(analytical_data, concentration_data, weightings=WEIGHTINGS):
+    """
+    Fit every candidate weighting at once and select the one with the smallest sum of relative errors.
+    :param analytical_data: List containing the analytical signal of each concentration level.
+    :type analytical_data: list[list[float]]
+    :param concentration_data: List containing the concentration of each analytical signal.
+    :type concentration_data: list[list[float]]
+    :param weightings: The candidate weightings, a subset of WEIGHTINGS.
+    :type weightings: tuple
+    :return weighting: The selected weighting, or None when no weighting could be fitted.
+    :rtype weighting: str
+    :return fitted_result: The regression result of the selected weighting, sliced out of the vectorized fit.
+    :rtype fitted_result: WeightedLeastSquaresResult
+    :return sum_of_relative_errors: The sum of relative errors of every candidate weighting.
+    :rtype sum_of_relative_errors: dict
+    :raises WeightingNotValid: When a candidate is not one of WEIGHTINGS.
+    """
+    if any(weighting not in WEIGHTINGS for weighting in weightings):
+        raise WeightingNotValid()
+    all_weights = weighting_factors(analytical_data, concentration_data)
+    weights = all_weights[[WEIGHTINGS.index(weighting) for weighting in weightings]]
+    analytical, _ = ragged_data_sets(analytical_data)
+    concentration, _ = ragged_data_sets(concentration_data)
+    fitted_results = WeightedLeastSquares(concentration, analytical, weights).fit()
+    relative_errors = numpy.where(numpy.isfinite(weights).all(axis=-1), fitted_results.sum_of_relative_errors,
+                                  numpy.inf)
+    relative_errors = numpy.where(numpy.isnan(relative_errors), numpy.inf, relative_errors)
+    sum_of_relative_errors = dict(zip(weightings, relative_errors.tolist()))
+    best = int(numpy.argmin(relative_errors))
+    if not numpy.isfinite(relative_errors[best]):
+        return None, None, sum_of_relative_errors
+    return weightings[best], fitted_results.select(best), sum_of_relative_errors
@@ -23,8 +23,10 @@ class IntermediatePrecision(object):
 
         This class is used to validate the precision of an analytical method given the analytical and concentration data
         of different days and analysts ordered inside a dictionary containing the data inside a list of lists.
+        The analytical data may also be a 1-D numpy array or buffer protocol object, with nan for missing values,
+        which is used without copying.
         :param analytical_data:
-        :type analytical_data: list
+        :type analytical_data: list or numpy.ndarray
         :param intercept:
         :type intercept: float
         :param slope:
@@ -49,7 +51,14 @@ class IntermediatePrecision(object):
         """
         self.calculated_concentration = []
         if isinstance(self.original_analytical_data, list) is False:
-            raise IncorrectIntermediatePrecisionData()
+            try:
+                analytical_data = numpy.asarray(self.original_analytical_data, dtype=float)
+            except (TypeError, ValueError):
+                raise IncorrectIntermediatePrecisionData()
+            if analytical_data.ndim != 1:
+                raise IncorrectIntermediatePrecisionData()
+            self.calculated_concentration = analytical_data * self.slope + self.intercept
+            return
         for value in self.original_analytical_data:
             if value is None:
                 self.calculated_concentration.append(value)
@@ -0,0 +1,158 @@
+from collections import namedtuple
+
+import numpy
+
+from analytical_validation.data_handler.data_handler import DataHandler
+from analytical_validation.exceptions import ValueNotValid
+from analytical_validation.statistical_tests.dixon_qtest import check_data_sets_for_outliers
+from analytical_validation.validators.linearity_batch import LinearityBatchResult
+
+CURVE_COLUMNS = ('curve_id', 'level', 'replicate', 'signal', 'concentration')
+
+CurveTable = namedtuple('CurveTable', ['curve_ids', 'analytical_data', 'concentration_data', 'curve_index',
+                                       'level_index', 'replicate_index', 'curve_offsets'])
+
+
+def _import_pyarrow():
+    """pyarrow is an optional dependency, only needed by the Arrow and Parquet readers and writers."""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Arrow and Parquet support requires pyarrow: pip install pyarrow")
+    return pyarrow
+
+
+def _dictionary_codes(column):
+    """Codes of a column in order of first appearance, and the distinct values, without Python objects."""
+    encoded = column.combine_chunks().dictionary_encode()
+    if encoded.null_count:
+        raise ValueNotValid()
+    return encoded.indices.to_numpy(zero_copy_only=False).astype(numpy.intp), encoded.dictionary
+
+
+def _float_column(column):
+    """A numeric column as a float array, nan where null."""
+    try:
+        return column.combine_chunks().to_numpy(zero_copy_only=False).astype(float, copy=False)
+    except (TypeError, ValueError):
+        raise ValueNotValid()
+
+
+def read_curves(source):
+    """
+    Read a table of calibration curves, one replicate per row, sorted into curves and concentration levels.
+
+    The table has the CURVE_COLUMNS columns. Curves keep the order of their first row, numeric levels and the
+    replicates are sorted by value and other levels keep the order of their first row. Rows with a null signal or
+    concentration are dropped, like None values of the DataHandler lists, and the values are checked by DataHandler
+    in one vectorized pass.
+
+    Example:
+        >>> curve_table = read_curves('runs.parquet')
+        >>> curve_table.curve_ids
+
+    :param source: Arrow table or path of a Parquet file.
+    :type source: pyarrow.Table or str
+    :return: The sorted values and the curve, level and replicate index of each of them.
+    :rtype: CurveTable
+    :raises ImportError: When pyarrow is not installed.
+    :raises ValueNotValid: When a column is missing, has a null key or isn't numeric.
+    :raises NegativeValue:
+    """
+    pyarrow = _import_pyarrow()
+    if isinstance(source, pyarrow.Table):
+        table = source
+    else:
+        try:
+            table = pyarrow.parquet.read_table(source, columns=list(CURVE_COLUMNS))
+        except pyarrow.ArrowInvalid:
+            raise ValueNotValid()
+    if any(column not in table.column_names for column in CURVE_COLUMNS):
+        raise ValueNotValid()
+    curve_codes, curve_ids = _dictionary_codes(table.column('curve_id'))
+    level_column = table.column('level')
+    if pyarrow.types.is_integer(level_column.type) or pyarrow.types.is_floating(level_column.type):
+        level_codes = _float_column(level_column)
+        if numpy.isnan(level_codes).any():
+            raise ValueNotValid()
+    else:
+        level_codes, _ = _dictionary_codes(level_column)
+    replicate = _float_column(table.column('replicate'))
+    analytical_data = _float_column(table.column('signal'))
+    concentration_data = _float_column(table.column('concentration'))
+    kept = ~numpy.isnan(analytical_data) & ~numpy.isnan(concentration_data)
+    order = numpy.flatnonzero(kept)[numpy.lexsort((replicate[kept], level_codes[kept], curve_codes[kept]))]
+    curve_codes, level_codes = curve_codes[order], level_codes[order]
+    analytical_data, concentration_data = analytical_data[order], concentration_data[order]
+    # A new curve or level starts where the sorted keys change
+    new_curve = numpy.diff(curve_codes, prepend=-1) != 0
+    new_level = new_curve | (numpy.diff(level_codes, prepend=-1) != 0)
+    curve_index = numpy.cumsum(new_curve) - 1
+    level_index = numpy.cumsum(new_level) - 1
+    level_starts = numpy.flatnonzero(new_level)
+    replicate_index = numpy.arange(order.size) - level_starts[level_index]
+    level_offsets = numpy.append(level_starts, order.size)
+    DataHandler.check_array_data((analytical_data, level_offsets))
+    DataHandler.check_array_data((concentration_data, level_offsets))
+    return CurveTable(curve_ids.take(pyarrow.array(numpy.unique(curve_codes))), analytical_data, concentration_data,
+                      curve_index, level_index, replicate_index, numpy.append(numpy.flatnonzero(new_curve), order.size))
+
+
+def validate_curves(source, alpha=0.05):
+    """
+    Validate the linearity of every curve of a table in vectorized passes, without Python lists.
+
+    Example:
+        >>> results = validate_curves('runs.parquet')
+        >>> results.column('linearity_is_valid')
+
+    :param source: Arrow table or path of a Parquet file with the CURVE_COLUMNS columns.
+    :type source: pyarrow.Table or str
+    :param alpha: Significance (default value = 0.05)
+    :type alpha: float
+    :return: One row per curve: the curve_id, every LinearityBatchResult column and the outliers_mask of the
+    replicates, sorted by level and replicate.
+    :rtype: pyarrow.Table
+    :raises ImportError: When pyarrow is not installed.
+    """
+    pyarrow = _import_pyarrow()
+    curve_table = read_curves(source)
+    curves = len(curve_table.curve_ids)
+    position = numpy.arange(curve_table.analytical_data.size) - curve_table.curve_offsets[curve_table.curve_index]
+    shape = (curves, int(numpy.diff(curve_table.curve_offsets).max(initial=0)))
+    analytical_data, concentration_data, mask = numpy.zeros(shape), numpy.zeros(shape), numpy.zeros(shape, dtype=bool)
+    analytical_data[curve_table.curve_index, position] = curve_table.analytical_data
+    concentration_data[curve_table.curve_index, position] = curve_table.concentration_data
+    mask[curve_table.curve_index, position] = True
+    batch_result = LinearityBatchResult(analytical_data, concentration_data, mask, alpha).compute()
+    # Dixon Q test of all the levels of all the curves at once
+    levels = numpy.full((int(curve_table.level_index.max(initial=-1)) + 1,
+                         int(curve_table.replicate_index.max(initial=-1)) + 1), numpy.nan)
+    levels[curve_table.level_index, curve_table.replicate_index] = curve_table.analytical_data
+    outliers_mask, _ = check_data_sets_for_outliers(levels)
+    outliers = outliers_mask[curve_table.level_index, curve_table.replicate_index]
+    columns = {'curve_id': curve_table.curve_ids}
+    columns.update((column, pyarrow.array(getattr(batch_result, column)))
+                   for column in LinearityBatchResult.COLUMNS)
+    columns['outliers_mask'] = pyarrow.ListArray.from_arrays(
+        pyarrow.array(curve_table.curve_offsets.astype(numpy.int32)), pyarrow.array(outliers))
+    return pyarrow.table(columns)
+
+
+def validate_parquet(source_path, result_path, alpha=0.05):
+    """
+    Validate the curves of a Parquet file, writing the results to another Parquet file.
+    :param source_path: Path of the Parquet file with the CURVE_COLUMNS columns.
+    :type source_path: str
+    :param result_path: Path of the Parquet file written with the validate_curves results.
+    :type result_path: str
+    :param alpha: Significance (default value = 0.05)
+    :type alpha: float
+    :return: The results.
+    :rtype: pyarrow.Table
+    """
+    pyarrow = _import_pyarrow()
+    results = validate_curves(source_path, alpha)
+    pyarrow.parquet.write_table(results, result_path)
+    return results
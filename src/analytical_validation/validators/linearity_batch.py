@@ -0,0 +1,190 @@
+import numpy
+
+from analytical_validation.data_handler.data_handler import paired_data_sets, split_data_sets
+from analytical_validation.statistical_tests.dixon_qtest import check_data_sets_for_outliers, pad_data_sets
+from analytical_validation.statistical_tests.ordinary_least_squares import OrdinaryLeastSquaresResult, \
+    SufficientStatistics
+from analytical_validation.statistical_tests.residual_diagnostics import residual_diagnostics
+
+
+def stack_curves(curves):
+    """
+    Stack many calibration curves into padded arrays.
+
+    Each curve is flattened in the same order used by LinearityValidator and left aligned in its row. Positions
+    after the end of a curve are padded with zeros and flagged False in the mask.
+    :param curves: Sequence of (analytical_data, concentration_data) pairs, each one a list of lists or any array
+    layout accepted by LinearityValidator.
+    :type curves: list[tuple[list[list[float]], list[list[float]]]]
+    :return analytical_data: Padded analytical data, one curve per row.
+    :rtype analytical_data: numpy.ndarray
+    :return concentration_data: Padded concentration data, one curve per row.
+    :rtype concentration_data: numpy.ndarray
+    :return mask: True where the padded arrays hold a value.
+    :rtype mask: numpy.ndarray
+    """
+    flat_analytical_data = []
+    flat_concentration_data = []
+    for analytical_data, concentration_data in curves:
+        analytical_values, concentration_values, _ = paired_data_sets(analytical_data, concentration_data)
+        flat_analytical_data.append(analytical_values)
+        flat_concentration_data.append(concentration_values)
+    lengths = numpy.fromiter(map(len, flat_analytical_data), dtype=int, count=len(flat_analytical_data))
+    mask = numpy.arange(lengths.max(initial=0)) < lengths[:, numpy.newaxis]
+    analytical_data = numpy.zeros(mask.shape)
+    concentration_data = numpy.zeros(mask.shape)
+    if flat_analytical_data:
+        analytical_data[mask] = numpy.concatenate(flat_analytical_data)
+        concentration_data[mask] = numpy.concatenate(flat_concentration_data)
+    return analytical_data, concentration_data, mask
+
+
+def masked_sufficient_statistics(exog_data, endog_data, mask):
+    """
+    Sufficient statistics of every row of padded data, ignoring the masked positions.
+    :rtype: SufficientStatistics
+    """
+    nobs = mask.sum(axis=-1)
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        mean_x = numpy.where(mask, exog_data, 0.0).sum(axis=-1) / nobs
+        mean_y = numpy.where(mask, endog_data, 0.0).sum(axis=-1) / nobs
+    deviation_x = numpy.where(mask, exog_data - mean_x[..., numpy.newaxis], 0.0)
+    deviation_y = numpy.where(mask, endog_data - mean_y[..., numpy.newaxis], 0.0)
+    return SufficientStatistics(nobs, mean_x, mean_y,
+                                (deviation_x * deviation_x).sum(axis=-1),
+                                (deviation_y * deviation_y).sum(axis=-1),
+                                (deviation_x * deviation_y).sum(axis=-1))
+
+
+class LinearityBatchResult(object):
+    """
+    Columnar linearity results of many calibration curves.
+
+    Every attribute named after a LinearityValidator property holds a numpy array with one entry per curve, in the
+    order the curves were given.
+
+    Example:
+        >>> result = LinearityValidator.validate_many([(analytical_data, concentration_data)])
+        >>> result.slope[0]
+        >>> result.curve(0)['linearity_is_valid']
+    """
+
+    COLUMNS = ('intercept', 'slope', 'r_squared', 'r_squared_adj', 'significant_slope', 'insignificant_intercept',
+               'valid_r_squared', 'valid_regression_model', 'sum_of_squares_model', 'sum_of_squares_resid',
+               'sum_of_squares_total', 'degrees_of_freedom_model', 'degrees_of_freedom_residues',
+               'degrees_of_freedom_total', 'mean_squared_error_model', 'mean_squared_error_residues',
+               'anova_f_value', 'anova_f_pvalue', 'valid_anova_f_pvalue', 'shapiro_pvalue', 'is_normal_distribution',
+               'breusch_pagan_pvalue', 'is_homoscedastic', 'durbin_watson_value', 'positive_correlation',
+               'linearity_is_valid')
+
+    def __init__(self, analytical_data, concentration_data, mask, alpha=0.05):
+        """
+        :param analytical_data: Padded analytical data, one curve per row.
+        :type analytical_data: numpy.ndarray
+        :param concentration_data: Padded concentration data, one curve per row.
+        :type concentration_data: numpy.ndarray
+        :param mask: True where the padded arrays hold a value.
+        :type mask: numpy.ndarray
+        :param alpha: Significance (default value = 0.05)
+        :type alpha: float
+        """
+        self.analytical_data = analytical_data
+        self.concentration_data = concentration_data
+        self.mask = mask
+        self.alpha = alpha
+        self.fitted_result = None
+        for column in LinearityBatchResult.COLUMNS:
+            setattr(self, column, None)
+        self.outliers = []
+        self.cleaned_analytical_data = []
+        self.cleaned_concentration_data = []
+
+    def __len__(self):
+        return self.mask.shape[0]
+
+    def compute(self):
+        """Run the regression, ANOVA and residue diagnostics for all curves at once."""
+        statistics = masked_sufficient_statistics(self.concentration_data, self.analytical_data, self.mask)
+        self.fitted_result = OrdinaryLeastSquaresResult(statistics, self.concentration_data, self.analytical_data)
+        fitted_result = self.fitted_result
+        resid = numpy.where(self.mask, fitted_result.resid, 0.0)
+        # Regression coefficients
+        self.intercept, self.slope = fitted_result.params
+        self.r_squared = fitted_result.rsquared
+        self.r_squared_adj = fitted_result.rsquared_adj
+        with numpy.errstate(invalid='ignore'):
+            self.significant_slope = fitted_result.pvalues[1] < self.alpha
+            self.insignificant_intercept = fitted_result.pvalues[0] > self.alpha
+            self.valid_r_squared = fitted_result.rsquared >= 0.990
+        self.valid_regression_model = self.significant_slope & self.insignificant_intercept & self.valid_r_squared
+        # ANOVA table values
+        self.sum_of_squares_model = fitted_result.ess
+        self.sum_of_squares_resid = fitted_result.ssr
+        self.sum_of_squares_total = fitted_result.ess + fitted_result.ssr
+        self.degrees_of_freedom_model = fitted_result.df_model
+        self.degrees_of_freedom_residues = fitted_result.df_resid
+        self.degrees_of_freedom_total = fitted_result.df_model + fitted_result.df_resid
+        self.mean_squared_error_model = fitted_result.mse_model
+        self.mean_squared_error_residues = fitted_result.mse_resid
+        self.anova_f_value = fitted_result.fvalue
+        self.anova_f_pvalue = fitted_result.f_pvalue
+        # Residue diagnostics
+        diagnostics = residual_diagnostics(resid, self.concentration_data, self.analytical_data, self.mask)
+        self.shapiro_pvalue = diagnostics.shapiro_pvalue
+        self.breusch_pagan_pvalue = diagnostics.breusch_pagan_pvalue
+        self.durbin_watson_value = diagnostics.durbin_watson_value
+        with numpy.errstate(invalid='ignore'):
+            self.valid_anova_f_pvalue = fitted_result.f_pvalue < self.alpha
+            self.is_normal_distribution = self.shapiro_pvalue > self.alpha
+            self.is_homoscedastic = self.breusch_pagan_pvalue > self.alpha
+            self.positive_correlation = (0 < self.durbin_watson_value) & (self.durbin_watson_value < 4)
+        self.linearity_is_valid = self.valid_regression_model & self.is_homoscedastic & \
+            self.is_normal_distribution & self.positive_correlation
+        return self
+
+    def check_outliers(self, curves):
+        """Dixon Q test of every concentration level of every curve at once, as LinearityValidator.check_outliers.
+        :param curves: The curves given to stack_curves.
+        :type curves: list[tuple[list[list[float]], list[list[float]]]]
+        """
+        analytical_data_sets, concentration_data_sets, levels = [], [], []
+        for analytical_data, concentration_data in curves:
+            analytical_values, concentration_values, level_offsets = paired_data_sets(analytical_data,
+                                                                                      concentration_data)
+            analytical_data_sets.extend(split_data_sets(analytical_values, level_offsets))
+            concentration_data_sets.extend(split_data_sets(concentration_values, level_offsets))
+            levels.append(len(level_offsets) - 1)
+        data = pad_data_sets(analytical_data_sets)
+        concentration = pad_data_sets(concentration_data_sets)
+        outliers_mask, cleaned_data = check_data_sets_for_outliers(data)
+        cleaned_mask = ~numpy.isnan(data) & ~outliers_mask
+        outliers = [data_set[outliers_set].tolist() for data_set, outliers_set in zip(data, outliers_mask)]
+        cleaned_analytical_data = [data_set[mask].tolist() for data_set, mask in zip(cleaned_data, cleaned_mask)]
+        cleaned_concentration_data = [data_set[mask].tolist() for data_set, mask in zip(concentration, cleaned_mask)]
+        level_offsets = numpy.concatenate(([0], numpy.cumsum(levels, dtype=int)))
+        self.outliers = [outliers[start:end] for start, end in zip(level_offsets[:-1], level_offsets[1:])]
+        self.cleaned_analytical_data = [cleaned_analytical_data[start:end]
+                                        for start, end in zip(level_offsets[:-1], level_offsets[1:])]
+        self.cleaned_concentration_data = [cleaned_concentration_data[start:end]
+                                           for start, end in zip(level_offsets[:-1], level_offsets[1:])]
+        return self
+
+    def regression_residues(self, index):
+        """Residues of the regression of one curve.
+        :rtype: list
+        """
+        return self.fitted_result.resid[index][self.mask[index]].tolist()
+
+    def curve(self, index):
+        """Results of one curve.
+        :return: Dictionary with the value of every column for the curve.
+        :rtype: dict
+        """
+        return {column: getattr(self, column)[index].item() for column in LinearityBatchResult.COLUMNS}
+
+    def to_dict(self):
+        """Columnar results.
+        :return: Dictionary mapping every column to the list of values of all curves.
+        :rtype: dict
+        """
+        return {column: getattr(self, column).tolist() for column in LinearityBatchResult.COLUMNS}
@@ -1,16 +1,40 @@
-from copy import deepcopy
-
-import scipy.stats
-import statsmodels.api as statsmodels
-import statsmodels.stats.api as statsmodelsapi
-import statsmodels.stats.stattools as stattools
-
-from analytical_validation.exceptions import DataWasNotFitted
-from analytical_validation.statistical_tests.dixon_qtest import DixonQTest
+import numpy
+
+from analytical_validation.data_handler.data_handler import paired_data_sets, split_data_sets
+from analytical_validation.exceptions import DataWasNotFitted, OutlierTestNotValid, RegressionEngineNotValid, \
+    StatisticNotValid, WeightingNotValid
+from analytical_validation.instrumentation import StageTimer
+from analytical_validation.lazy_module import LazyModule
+from analytical_validation.statistical_tests.dixon_qtest import check_data_sets_for_outliers, pad_data_sets
+from analytical_validation.statistical_tests.grubbs_test import generalized_esd_outliers, grubbs_outliers
+from analytical_validation.statistical_tests.ordinary_least_squares import OrdinaryLeastSquares, \
+    OrdinaryLeastSquaresResult, SufficientStatistics
+from analytical_validation.statistical_tests.residual_diagnostics import breusch_pagan, durbin_watson, \
+    residual_diagnostics, shapiro_wilk
+from analytical_validation.statistical_tests.weighted_least_squares import WEIGHTINGS, select_weighting
+from analytical_validation.validators.linearity_batch import LinearityBatchResult, stack_curves
+
+# Only used by the statsmodels engine, imported on its first use
+scipy = LazyModule('scipy')
+statsmodels = LazyModule('statsmodels.api')
+statsmodelsapi = LazyModule('statsmodels.stats.api')
+stattools = LazyModule('statsmodels.stats.stattools')
 
 
 class LinearityValidator(object):
     """
+    The regression can be computed by two engines: ``closed_form`` (default) solves the single predictor
+    regression from its sufficient statistics, while ``statsmodels`` builds the full statsmodels OLS model and is
+    kept as the reference implementation.
+
+    Heteroskedastic curves can be fitted by Weighted Least Squares with the weighting argument: 'auto' selects,
+    only when the Breusch-Pagan test fails, the weighting (1/x, 1/x², 1/s²) with the smallest sum of relative errors;
+    a weighting name forces that weighting.
+
+    The outliers of each concentration level are checked by the Dixon Q test (default), which removes at most one
+    value and skips levels with more than 100 replicates, by the iterated Grubbs test or by the generalized ESD test,
+    which handle levels with hundreds of replicates; 'auto' uses the Dixon Q test up to 30 replicates and the
+    generalized ESD test above that.
 
     Example:
         >>> analytical_data = [[0.1,0.2,0.1],[0.3,0.3,0.32],[0.41,0.43,0.45],[0.51,0.53,0.55]]
@@ -23,24 +47,74 @@ class LinearityValidator(object):
         >>> linearity_validator.anova_f_value
     """
 
-    def __init__(self, analytical_data, concentration_data, alpha=0.05):
+    REGRESSION_ENGINES = ('closed_form', 'statsmodels')
+    WEIGHTINGS = (None, 'auto') + WEIGHTINGS
+    OUTLIER_TESTS = ('dixon', 'grubbs', 'generalized_esd', 'auto')
+    DIXON_MAXIMUM_SAMPLE_SIZE = 30
+    # Statistics computed by validate_linearity and the statistics each one of them depends on
+    STATISTICS = {'regression': (),
+                  'shapiro_wilk': ('regression',),
+                  'breusch_pagan': ('regression',),
+                  'durbin_watson': ('regression',),
+                  'outliers': (),
+                  'linearity_is_valid': ('regression', 'shapiro_wilk', 'breusch_pagan', 'durbin_watson')}
+
+    def __init__(self, analytical_data, concentration_data, alpha=0.05, engine='closed_form', weighting=None,
+                 outlier_test='dixon'):
         """
         Validate the linearity of the method.
+
+        Besides lists of lists, the data may be numpy arrays or buffer protocol objects, e.g. a (values,
+        level_offsets) ragged array or a 2-D array with one concentration level per row; see
+        data_handler.ragged_data_sets. Arrays are used without copying or per value Python work, pairs with a
+        missing (nan) value being dropped.
         :param analytical_data: List containing all measured analytical signal.
-        :type analytical_data: list
+        :type analytical_data: list or tuple or numpy.ndarray
         :param concentration_data: List containing the concentration for each analytical signal
-        :type concentration_data: list
+        :type concentration_data: list or tuple or numpy.ndarray
         :param alpha: Significance (default value = 0.05)
         :type alpha: float
+        :param engine: Regression engine, 'closed_form' or 'statsmodels' (default value = 'closed_form')
+        :type engine: str
+        :param weighting: Weighted Least Squares weighting, None, 'auto', '1/x', '1/x^2' or '1/s^2'
+        (default value = None, Ordinary Least Squares only)
+        :type weighting: str
+        :param outlier_test: Outlier test of each concentration level, 'dixon', 'grubbs', 'generalized_esd' or 'auto'
+        (default value = 'dixon')
+        :type outlier_test: str
+        :raises RegressionEngineNotValid: When the engine is not one of REGRESSION_ENGINES.
+        :raises WeightingNotValid: When the weighting is not one of WEIGHTINGS.
+        :raises OutlierTestNotValid: When the outlier test is not one of OUTLIER_TESTS.
         """
-        self.original_analytical_data = analytical_data
-        self.original_concentration_data = concentration_data
-        # Flattened data
-        self.analytical_data = [x for y in analytical_data for x in y]
-        self.concentration_data = [x for y in concentration_data for x in y]
+        if engine not in LinearityValidator.REGRESSION_ENGINES:
+            raise RegressionEngineNotValid()
+        if weighting not in LinearityValidator.WEIGHTINGS:
+            raise WeightingNotValid()
+        if outlier_test not in LinearityValidator.OUTLIER_TESTS:
+            raise OutlierTestNotValid()
+        self.engine = engine
+        self.weighting = weighting
+        self.outlier_test = outlier_test
+        if isinstance(analytical_data, list) and isinstance(concentration_data, list):
+            self.original_analytical_data = analytical_data
+            self.original_concentration_data = concentration_data
+            # Flattened data
+            self.analytical_data = [x for y in analytical_data for x in y]
+            self.concentration_data = [x for y in concentration_data for x in y]
+        else:
+            self.analytical_data, self.concentration_data, level_offsets = paired_data_sets(analytical_data,
+                                                                                           concentration_data)
+            # One view of the flattened data per concentration level
+            self.original_analytical_data = split_data_sets(self.analytical_data, level_offsets)
+            self.original_concentration_data = split_data_sets(self.concentration_data, level_offsets)
         self.alpha = alpha
         # Ordinary least squares linear regression coefficients
         self.fitted_result = None
+        # Running sufficient statistics of the incremental mode
+        self.sufficient_statistics = None
+        # Weighted least squares
+        self.selected_weighting = None
+        self.sum_of_relative_errors = {}
         # Anova parameters
         self.has_required_parameters = False
         # Durbin Watson parameters
@@ -49,14 +123,43 @@ class LinearityValidator(object):
         self.breusch_pagan_pvalue = None
         self.linearity_is_valid = False
         self.outliers = []
+        # Whether refit_without_outliers already removed the outliers from the data
+        self.outliers_removed = False
         self.cleaned_analytical_data = []
         self.cleaned_concentration_data = []
+        # Timings of the stages of the last validate_linearity
+        self.stage_timer = None
 
     def ordinary_least_squares_linear_regression(self):
         """Fit the data using the Ordinary Least Squares method of Linear Regression."""
-        concentration_data = statsmodels.add_constant(self.concentration_data)
-        model = statsmodels.OLS(self.analytical_data, concentration_data)
-        self.fitted_result = model.fit()
+        if self.engine == 'statsmodels':
+            concentration_data = statsmodels.add_constant(self.concentration_data)
+            model = statsmodels.OLS(self.analytical_data, concentration_data)
+            self.fitted_result = model.fit()
+        else:
+            self.fitted_result = OrdinaryLeastSquares(self.concentration_data, self.analytical_data).fit()
+        self.selected_weighting = None
+
+    def weighted_least_squares_linear_regression(self):
+        """Fit the data using the Weighted Least Squares method of Linear Regression.
+
+        All candidate weightings are fitted in one vectorized pass and the one with the smallest sum of relative
+        errors replaces the fitted result. The fitted result is kept when no weighting can be computed, e.g. when
+        there is a zero concentration or a level with a single replicate.
+        """
+        weightings = WEIGHTINGS if self.weighting in (None, 'auto') else (self.weighting,)
+        selected_weighting, fitted_result, self.sum_of_relative_errors = select_weighting(
+            self.original_analytical_data, self.original_concentration_data, weightings)
+        if selected_weighting is not None:
+            self.fitted_result = fitted_result
+            self.selected_weighting = selected_weighting
+
+    @property
+    def _diagnostic_residues(self):
+        """Residues checked by the diagnostic tests, weighted when a weighting was selected."""
+        if self.selected_weighting is not None:
+            return self.fitted_result.wresid
+        return self.fitted_result.resid
 
     # Regression coefficients
     @property
@@ -250,9 +353,11 @@ class LinearityValidator(object):
         return self.fitted_result.f_pvalue < self.alpha
 
     # Outlier check
-    def check_outliers(self):
+    def check_outliers(self, outlier_test=None):
         """Check for outliers in the data set
-        using the Dixon Q value test.
+        using the Dixon Q value, Grubbs or generalized ESD test, for all concentration levels at once.
+        :param outlier_test: Outlier test, one of OUTLIER_TESTS (default value = None, the validator outlier_test).
+        :type outlier_test: str
         :return outliers: List containing all the outliers.
         :rtype outliers: list[list[float]]]
         :return cleaned_analytical_data: List containing the analytical data without outliers.
@@ -260,24 +365,146 @@ class LinearityValidator(object):
         :return cleaned_concentration_data: List containing the concentration data without
         corresponding analytical data outliers.
         :rtype outliers: list[list[float]]]
+        :raises OutlierTestNotValid: When the outlier test is not one of OUTLIER_TESTS.
+        """
+        outlier_test = self.outlier_test if outlier_test is None else outlier_test
+        if outlier_test not in LinearityValidator.OUTLIER_TESTS:
+            raise OutlierTestNotValid()
+        data = pad_data_sets(self.original_analytical_data)
+        concentration = pad_data_sets(self.original_concentration_data)
+        if outlier_test == 'grubbs':
+            outliers_mask, cleaned_data = grubbs_outliers(data)
+        elif outlier_test == 'generalized_esd':
+            outliers_mask, cleaned_data = generalized_esd_outliers(data)
+        else:
+            outliers_mask, cleaned_data = check_data_sets_for_outliers(data)
+        if outlier_test == 'auto':
+            large = (~numpy.isnan(data)).sum(axis=-1) > LinearityValidator.DIXON_MAXIMUM_SAMPLE_SIZE
+            if large.any():
+                outliers_mask[large], cleaned_data[large] = generalized_esd_outliers(data[large])
+        cleaned_mask = ~numpy.isnan(data) & ~outliers_mask
+        self.outliers = [data_set[outliers_set].tolist() for data_set, outliers_set in zip(data, outliers_mask)]
+        self.outliers_removed = False
+        self.cleaned_analytical_data = [data_set[mask].tolist() for data_set, mask in zip(cleaned_data, cleaned_mask)]
+        self.cleaned_concentration_data = [data_set[mask].tolist()
+                                           for data_set, mask in zip(concentration, cleaned_mask)]
+
+    # Incremental mode
+    def start_incremental_mode(self):
+        """Keep running sufficient statistics of the data, so points can be added, removed or replaced without
+        refitting: the statistics are updated in O(1), the data lists in O(n).
+
+        The data lists are copied once, so the caller's lists are never modified by the incremental updates.
+        :return: The running sufficient statistics.
+        :rtype: SufficientStatistics
+        """
+        if self.sufficient_statistics is None:
+            self.original_analytical_data = [list(data_set) for data_set in self.original_analytical_data]
+            self.original_concentration_data = [list(data_set) for data_set in self.original_concentration_data]
+            self.analytical_data = list(self.analytical_data)
+            self.concentration_data = list(self.concentration_data)
+            # The statistics of a weighted fit hold weighted means and co-moments, so they are computed again
+            if isinstance(self.fitted_result, OrdinaryLeastSquaresResult) and \
+                    self.fitted_result.statistics.sum_of_weights is None:
+                self.sufficient_statistics = self.fitted_result.statistics.copy()
+            else:
+                self.sufficient_statistics = SufficientStatistics.from_data(self.concentration_data,
+                                                                            self.analytical_data)
+        return self.sufficient_statistics
+
+    def _flat_index(self, level, index):
+        """Position in the flattened data of the value at the given level and index, in O(levels)."""
+        return sum(len(data_set) for data_set in self.original_analytical_data[:level]) + index
+
+    def add_point(self, level, analytical_value, concentration_value):
+        """Add a replicate to a concentration level, updating the sufficient statistics in O(1) and inserting it in
+        the flattened data in O(n).
+        :param level: Index of the concentration level. A new level is created when equal to the number of levels.
+        :type level: int
+        :param analytical_value: The analytical signal of the replicate.
+        :type analytical_value: float
+        :param concentration_value: The concentration of the replicate.
+        :type concentration_value: float
+        """
+        statistics = self.start_incremental_mode()
+        if level == len(self.original_analytical_data):
+            self.original_analytical_data.append([])
+            self.original_concentration_data.append([])
+        flat_index = self._flat_index(level, len(self.original_analytical_data[level]))
+        self.original_analytical_data[level].append(analytical_value)
+        self.original_concentration_data[level].append(concentration_value)
+        self.analytical_data.insert(flat_index, analytical_value)
+        self.concentration_data.insert(flat_index, concentration_value)
+        statistics.add(concentration_value, analytical_value)
+
+    def remove_point(self, level, index):
+        """Remove a replicate from a concentration level, downdating the sufficient statistics in O(1) and deleting it
+        from the flattened data in O(n).
+        :param level: Index of the concentration level.
+        :type level: int
+        :param index: Index of the replicate inside the level.
+        :type index: int
+        :return: The removed analytical signal and concentration.
+        :rtype: tuple(float, float)
+        """
+        statistics = self.start_incremental_mode()
+        flat_index = self._flat_index(level, index)
+        analytical_value = self.original_analytical_data[level].pop(index)
+        concentration_value = self.original_concentration_data[level].pop(index)
+        del self.analytical_data[flat_index]
+        del self.concentration_data[flat_index]
+        statistics.remove(concentration_value, analytical_value)
+        return analytical_value, concentration_value
+
+    def replace_point(self, level, index, analytical_value, concentration_value):
+        """Replace a replicate of a concentration level, updating the sufficient statistics in O(1) and the data in
+        O(levels).
+        :param level: Index of the concentration level.
+        :type level: int
+        :param index: Index of the replicate inside the level.
+        :type index: int
+        :param analytical_value: The new analytical signal.
+        :type analytical_value: float
+        :param concentration_value: The new concentration.
+        :type concentration_value: float
         """
-        data = deepcopy(self.original_analytical_data)
-        concentration = deepcopy(self.original_concentration_data)
-        for data_set in data:
-            outliers_set, cleaned_data_set = DixonQTest(data_set).check_data_for_outliers()
-            self.outliers.append(outliers_set)
-            self.cleaned_analytical_data.append(cleaned_data_set)
-
-        for index in range(len(data)):
-            try:
-                concentration[index].pop(self.original_analytical_data[index].index(self.outliers[index][0]))
-            except:
-                pass
-            index += 1
-            self.cleaned_concentration_data = concentration
+        statistics = self.start_incremental_mode()
+        flat_index = self._flat_index(level, index)
+        statistics.replace(self.original_concentration_data[level][index], self.original_analytical_data[level][index],
+                           concentration_value, analytical_value)
+        self.original_analytical_data[level][index] = analytical_value
+        self.original_concentration_data[level][index] = concentration_value
+        self.analytical_data[flat_index] = analytical_value
+        self.concentration_data[flat_index] = concentration_value
+
+    def refresh_regression(self):
+        """Refresh the regression, ANOVA and Durbin-Watson results from the running sufficient statistics,
+        without rebuilding the design matrix."""
+        statistics = self.start_incremental_mode()
+        self.fitted_result = OrdinaryLeastSquaresResult(statistics.copy(),
+                                                        numpy.asarray(self.concentration_data, dtype=float),
+                                                        numpy.asarray(self.analytical_data, dtype=float))
+        self.selected_weighting = None
+        self.check_residual_autocorrelation()
+
+    def refit_without_outliers(self):
+        """Downdate the regression removing the outliers found by check_outliers and refresh the results.
+
+        The outliers are removed once: calling it again before the next check_outliers only refreshes the results.
+        """
+        self.start_incremental_mode()
+        if not self.outliers_removed:
+            for level, outliers_set in enumerate(self.outliers):
+                for outlier in outliers_set:
+                    self.remove_point(level, self.original_analytical_data[level].index(outlier))
+            self.outliers_removed = True
+        self.refresh_regression()
 
     def run_shapiro_wilk_test(self):
-        self.shapiro_pvalue = (scipy.stats.shapiro(self.analytical_data))[1]
+        if self.engine == 'statsmodels':
+            self.shapiro_pvalue = (scipy.stats.shapiro(self.analytical_data))[1]
+        else:
+            self.shapiro_pvalue = shapiro_wilk(self.analytical_data)[1]
 
     @property
     def is_normal_distribution(self):
@@ -291,12 +518,14 @@ class LinearityValidator(object):
         """Run the Breusch-Pagan test."""
         if self.fitted_result is None:
             raise DataWasNotFitted()
-        # Calculate the residues based on fitted model of linear regression
-        breusch_pagan_test = statsmodelsapi.het_breuschpagan(self.fitted_result.resid,
-                                                             self.fitted_result.model.exog)
+        if self.engine == 'statsmodels':
+            # Calculate the residues based on fitted model of linear regression
+            breusch_pagan_test = statsmodelsapi.het_breuschpagan(self._diagnostic_residues,
+                                                                 self.fitted_result.model.exog)
+        else:
+            breusch_pagan_test = breusch_pagan(self._diagnostic_residues, self.fitted_result.exog_data)
         # labels = ["LM Statistic", "LM-Test p-value", "F-Statistic", "F-Test p-value"]
         self.breusch_pagan_pvalue = float(breusch_pagan_test[1])
-        # TODO: Deal with heteroskedastic, removing outliers or using Weighted Least Squares Regression
 
     @property
     def is_homoscedastic(self):
@@ -323,15 +552,84 @@ class LinearityValidator(object):
         """
         if self.fitted_result is None:
             raise DataWasNotFitted()
-        self.durbin_watson_value = stattools.durbin_watson(self.fitted_result.resid)
+        if self.engine == 'statsmodels':
+            self.durbin_watson_value = stattools.durbin_watson(self._diagnostic_residues)
+        else:
+            self.durbin_watson_value = durbin_watson(self._diagnostic_residues)
+
+    def run_residual_diagnostics(self, statistics=None):
+        """Run the Shapiro-Wilk, Breusch-Pagan and Durbin-Watson tests.
+
+        With the closed_form engine the three tests are computed in one fused pass over the residues.
+        :param statistics: Tests to run, 'shapiro_wilk', 'breusch_pagan' or 'durbin_watson' (default value = None,
+        all of them).
+        :type statistics: set[str]
+        :raises DataWasNotFitted:
+        """
+        if self.fitted_result is None:
+            raise DataWasNotFitted()
+        if statistics is not None and not {'shapiro_wilk', 'breusch_pagan', 'durbin_watson'} <= set(statistics):
+            if 'shapiro_wilk' in statistics:
+                self.run_shapiro_wilk_test()
+            if 'breusch_pagan' in statistics:
+                self.run_breusch_pagan_test()
+            if 'durbin_watson' in statistics:
+                self.check_residual_autocorrelation()
+            return
+        if self.engine == 'statsmodels':
+            self.run_shapiro_wilk_test()
+            self.run_breusch_pagan_test()
+            self.check_residual_autocorrelation()
+            return
+        diagnostics = residual_diagnostics(self._diagnostic_residues, self.fitted_result.exog_data,
+                                           self.analytical_data)
+        self.shapiro_pvalue = diagnostics.shapiro_pvalue
+        self.breusch_pagan_pvalue = float(diagnostics.breusch_pagan_pvalue)
+        self.durbin_watson_value = diagnostics.durbin_watson_value
 
     @property
     def positive_correlation(self):
-        if 0 < self.durbin_watson_value < 4:
-            return self.positive_correlation is True
+        """The Durbin-Watson value avaliation.
+
+        If 0 < Durbin-Watson value < 4, the residual autocorrelation is acceptable.
 
-    def validate_linearity(self):
+        :return: The avaliation of the Durbin-Watson value.
+        :rtype: bool
+        """
+        return 0 < self.durbin_watson_value < 4
+
+    @classmethod
+    def required_statistics(cls, statistics):
+        """The statistics and every statistic they depend on, following the STATISTICS dependency graph.
+        :param statistics: Names of the statistics, keys of STATISTICS.
+        :type statistics: iterable[str]
+        :rtype: set[str]
+        :raises StatisticNotValid: When a statistic is not one of STATISTICS.
+        """
+        required = set()
+        pending = list(statistics)
+        while pending:
+            statistic = pending.pop()
+            if statistic not in cls.STATISTICS:
+                raise StatisticNotValid()
+            if statistic not in required:
+                required.add(statistic)
+                pending.extend(cls.STATISTICS[statistic])
+        return required
+
+    def validate_linearity(self, statistics=None, stage_timer=None):
         """Validate the linearity of given data.
+
+        Only the given statistics and the ones they depend on are computed, e.g. the Shapiro-Wilk test is skipped
+        when neither the normality nor the linearity validity are needed; the others are left as None.
+
+        The wall time, CPU time and outcome of each stage (regression, residual_diagnostics, weighted_regression,
+        weighted_residual_diagnostics, outliers, linearity_is_valid) are kept in stage_timer, so a stage that failed
+        is seen even though the validation only returns linearity_is_valid.
+        :param statistics: Names of the statistics to compute, keys of STATISTICS (default value = None, all of them).
+        :type statistics: iterable[str]
+        :param stage_timer: Timer of the stages (default value = None, a new StageTimer added to timer_registry).
+        :type stage_timer: StageTimer
         :return outliers: List containing all the outliers.
         :rtype outliers: list[list[float]]]
         :return cleaned_analytical_data: List containing the analytical data without outliers.
@@ -344,14 +642,46 @@ class LinearityValidator(object):
         :raises DataWasNotFitted():
         :raises DurbinWatsonValueError() :
         """
+        required = self.required_statistics(LinearityValidator.STATISTICS if statistics is None else statistics)
+        if 'regression' in required and self.weighting == 'auto':
+            # The weighted regression is only fitted when the Breusch-Pagan test fails
+            required.add('breusch_pagan')
+        self.stage_timer = StageTimer() if stage_timer is None else stage_timer
+        stage = self.stage_timer.stage
         try:
-            self.ordinary_least_squares_linear_regression()
-            self.run_shapiro_wilk_test()
-            self.run_breusch_pagan_test()
-            self.check_residual_autocorrelation()
-            self.check_outliers()
-            if self.valid_regression_model and self.is_homoscedastic and self.is_normal_distribution \
-                    and self.positive_correlation:
-                self.linearity_is_valid = True
+            if 'regression' in required:
+                with stage('regression'):
+                    self.ordinary_least_squares_linear_regression()
+                with stage('residual_diagnostics'):
+                    self.run_residual_diagnostics(required)
+                if self.weighting is not None and (self.weighting != 'auto' or not self.is_homoscedastic):
+                    with stage('weighted_regression'):
+                        self.weighted_least_squares_linear_regression()
+                    with stage('weighted_residual_diagnostics'):
+                        self.run_residual_diagnostics(required)
+            if 'outliers' in required:
+                with stage('outliers'):
+                    self.check_outliers()
+            if 'linearity_is_valid' in required:
+                with stage('linearity_is_valid'):
+                    if self.valid_regression_model and self.is_homoscedastic and self.is_normal_distribution and \
+                            self.positive_correlation:
+                        self.linearity_is_valid = True
         except:
             return self.linearity_is_valid
+
+    @classmethod
+    def validate_many(cls, curves, alpha=0.05):
+        """Validate the linearity of many calibration curves in vectorized passes.
+
+        The regression, ANOVA, Durbin-Watson and Breusch-Pagan results and the outliers of all curves are computed at
+        once over padded arrays, giving the same values as calling validate_linearity for each curve.
+        :param curves: Sequence of (analytical_data, concentration_data) pairs, each one a list of lists.
+        :type curves: list[tuple[list[list[float]], list[list[float]]]]
+        :param alpha: Significance (default value = 0.05)
+        :type alpha: float
+        :return: The columnar results, one entry per curve.
+        :rtype: LinearityBatchResult
+        """
+        analytical_data, concentration_data, mask = stack_curves(curves)
+        return LinearityBatchResult(analytical_data, concentration_data, mask, alpha).compute().check_outliers(curves)
@@ -1,7 +1,12 @@
 import json
 import pytest
 
+import analytical_validation.api.api
+from analytical_validation.api.api import result_cache, stream_linearity_batch, validate_linearity_batch
+from analytical_validation.api.result_cache import canonical_key
+from analytical_validation.api.serialization import unpack_array
 from analytical_validation.api.app import app
+from analytical_validation.validators.linearity_validator import LinearityValidator
 
 url = 'http://127.0.0.1:5000'
 
@@ -33,7 +38,13 @@ class TestApp(object):
          "Non number values are not valid. Check and try again.", "ValueNotValid"),
         ({"analytical_data": "[[-3,1,2],[1,2,3]]",
           "concentration_data": "[[0.008, 0.008, 0.008], [0.016, 0.016, 0.016]]"},
-         "Negative values are not valid. Check and try again.", "NegativeValue")])
+         "Negative values are not valid. Check and try again.", "NegativeValue"),
+        ({"analytical_data": '"abc"', "concentration_data": "[[0.008, 0.008, 0.008], [0.016, 0.016, 0.016]]"},
+         "One of the input data is not a list.", "DataNotList"),
+        ({"analytical_data": "[1, 2, 3]", "concentration_data": "[[0.008, 0.008, 0.008], [0.016, 0.016, 0.016]]"},
+         "The given data is not a list of lists.", "DataNotListOfLists"),
+        ({"analytical_data": "[[1, 2, 3], [1, 2, 3]]", "concentration_data": "[[0.008, 0.008, 0.008], [0.016, 0.016]]"},
+         "The given data is not symmetric. Check if there's a value missing.", "DataNotSymmetric")])
     def test_api_must_serve_exceptions_to_frontend(self, client, param_json_data, param_error_text, param_exception):
         """"Given data that`s not a list, the api must send a message to frontend with the error"""
         headers = {
@@ -43,3 +54,218 @@ class TestApp(object):
         response = client.post(url + '/linearity', data=json.dumps(param_json_data), headers=headers)
         assert response.status_code == 400
         assert response.json[param_exception]["body"] == param_error_text
+
+
+class TestLinearityBatch(object):
+    headers = {
+        'Content-Type': 'application/json',
+        'Accept': 'application/json'
+    }
+    curve = {"analytical_data": [[0.188, 0.192, 0.203], [0.349, 0.346, 0.348], [0.489, 0.482, 0.492],
+                                 [0.637, 0.641, 0.641], [0.762, 0.768, 0.786]],
+             "concentration_data": [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016], [0.02, 0.02, 0.02],
+                                    [0.028, 0.028, 0.028], [0.032, 0.032, 0.032]]}
+
+    def test_linearity_batch_must_validate_every_curve(self, client):
+        json_data = {"curves": [self.curve, {key: json.dumps(value) for key, value in self.curve.items()}]}
+        response = client.post(url + '/linearity/batch', data=json.dumps(json_data), headers=self.headers)
+        assert response.status_code == 200
+        results = response.json['results']
+        assert len(results) == 2
+        assert results[0] == results[1]
+        assert results[0]['status'] == 201
+        linearity_validator = LinearityValidator(self.curve["analytical_data"], self.curve["concentration_data"])
+        linearity_validator.validate_linearity()
+        assert results[0]['regression_coefficients']['slope'] == pytest.approx(linearity_validator.slope)
+        assert results[0]['cleaned_data']['outliers'] == linearity_validator.outliers
+
+    @pytest.mark.parametrize('param_curve, param_exception', [
+        ({"analytical_data": [["CCCC", 1, 2], [1, 2, 3]], "concentration_data": [[1, 1, 1], [2, 2, 2]]},
+         "ValueNotValid"),
+        ({"analytical_data": [[-3, 1, 2], [1, 2, 3]], "concentration_data": [[1, 1, 1], [2, 2, 2]]},
+         "NegativeValue"),
+        ({"analytical_data": [[1, 2, 3], [1, 2, 3]], "concentration_data": [[1, 1, 1], [2, 2]]},
+         "DataNotSymmetric"),
+        ({"analytical_data": [[1, 2, 3], [1, 2, 3]]}, "TypeError")])
+    def test_linearity_batch_must_serve_errors_per_curve(self, client, param_curve, param_exception):
+        json_data = {"curves": [param_curve, self.curve]}
+        response = client.post(url + '/linearity/batch', data=json.dumps(json_data), headers=self.headers)
+        assert response.status_code == 200
+        error, result = response.json['results']
+        assert error[param_exception]["status"] == 400
+        assert result['status'] == 201
+
+    def test_linearity_batch_must_require_a_list_of_curves(self, client):
+        response = client.post(url + '/linearity/batch', data=json.dumps({"curves": "[]"}), headers=self.headers)
+        assert response.status_code == 400
+        assert "RequestBodyNotValid" in response.json
+
+    def test_linearity_batch_must_stream_ndjson(self, client):
+        json_data = {"curves": [self.curve, {"analytical_data": [[-3, 1, 2], [1, 2, 3]],
+                                             "concentration_data": [[1, 1, 1], [2, 2, 2]]}, self.curve]}
+        headers = dict(self.headers, Accept='application/x-ndjson')
+        response = client.post(url + '/linearity/batch', data=json.dumps(json_data), headers=headers)
+        assert response.status_code == 200
+        assert response.mimetype == 'application/x-ndjson'
+        lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        buffered = client.post(url + '/linearity/batch', data=json.dumps(json_data), headers=self.headers)
+        assert lines == buffered.json['results']
+        assert lines[1]["NegativeValue"]["status"] == 400
+
+
+class TestStreamLinearityBatch(object):
+    def test_stream_linearity_batch_must_yield_each_curve_in_order(self):
+        curves = [TestLinearityBatch.curve, {"analytical_data": [[1, 2, 3]]}] * 3
+        lines = list(stream_linearity_batch(curves, chunk_size=4))
+        assert len(lines) == 6
+        assert all(line.endswith(b'\n') for line in lines)
+        results = [json.loads(line) for line in lines]
+        expected = validate_linearity_batch(curves)
+        assert [result.get('status') for result in results] == [201, None] * 3
+        assert [result.get('linearity_is_valid') for result in results] == \
+               [result.get('linearity_is_valid') for result in expected]
+        assert results[4]['regression_coefficients'] == pytest.approx(expected[4]['regression_coefficients'])
+
+
+class TestLinearityCache(object):
+    headers = {
+        'Content-Type': 'application/json',
+        'Accept': 'application/json'
+    }
+    json_data = {"analytical_data": '[[0.188, 0.192, 0.203], [0.349, 0.346, 0.348]]',
+                 "concentration_data": '[[0.008, 0.008, 0.008], [0.016, 0.016, 0.016]]'}
+
+    def test_linearity_must_not_send_the_body_of_a_known_etag(self, client, mocker):
+        validator_mock = mocker.patch('analytical_validation.api.api.LinearityValidator')
+        key = canonical_key([[0.188, 0.192, 0.203], [0.349, 0.346, 0.348]],
+                            [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016]])
+        headers = dict(self.headers, **{'If-None-Match': '"{}"'.format(key)})
+        response = client.post(url + '/linearity', data=json.dumps(self.json_data), headers=headers)
+        assert response.status_code == 304
+        assert response.headers['ETag'] == '"{}"'.format(key)
+        assert response.get_data() == b''
+        validator_mock.assert_not_called()
+
+    def test_linearity_must_serve_cached_results(self, client, mocker):
+        key = canonical_key([[0.188, 0.192, 0.203], [0.349, 0.346, 0.348]],
+                            [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016]])
+        mocker.patch.object(result_cache, 'get', return_value={'linearity_is_valid': True, 'status': 201})
+        validator_mock = mocker.patch('analytical_validation.api.api.LinearityValidator')
+        response = client.post(url + '/linearity', data=json.dumps(self.json_data), headers=self.headers)
+        assert response.status_code == 201
+        assert response.json == {'linearity_is_valid': True, 'status': 201}
+        assert response.headers['ETag'] == '"{}"'.format(key)
+        result_cache.get.assert_called_once_with(key)
+        validator_mock.assert_not_called()
+
+
+class TestLinearityRequestBody(object):
+    analytical_data = [[0.188, 0.192, 0.203], [0.349, 0.346, 0.348]]
+    concentration_data = [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016]]
+
+    @pytest.fixture
+    def data_handler_spy(self, mocker):
+        mocker.patch.object(result_cache, 'get', return_value={'status': 201})
+        return mocker.spy(analytical_validation.api.api, 'DataHandler')
+
+    def assert_data_handler_called(self, data_handler_spy):
+        data_handler_spy.assert_called_once_with(self.analytical_data, self.concentration_data)
+
+    @pytest.mark.parametrize('param_encode', [lambda data: data, json.dumps])
+    def test_linearity_must_accept_a_native_json_body(self, client, data_handler_spy, param_encode):
+        json_data = {"analytical_data": param_encode(self.analytical_data),
+                     "concentration_data": param_encode(self.concentration_data)}
+        response = client.post(url + '/linearity', data=json.dumps(json_data), content_type='application/json')
+        assert response.status_code == 201
+        self.assert_data_handler_called(data_handler_spy)
+
+    def test_linearity_must_accept_a_msgpack_body(self, client, data_handler_spy):
+        msgpack = pytest.importorskip('msgpack')
+        data = msgpack.packb({"analytical_data": self.analytical_data, "concentration_data": self.concentration_data})
+        response = client.post(url + '/linearity', data=data, content_type='application/msgpack')
+        assert response.status_code == 201
+        self.assert_data_handler_called(data_handler_spy)
+
+    def test_linearity_must_accept_form_values(self, client, data_handler_spy):
+        response = client.post(url + '/linearity', data={"analytical_data": json.dumps(self.analytical_data),
+                                                         "concentration_data": json.dumps(self.concentration_data)})
+        assert response.status_code == 201
+        self.assert_data_handler_called(data_handler_spy)
+
+    @pytest.mark.parametrize('param_data', [
+        '{"analytical_data": [[1, 2, 3]]',
+        '{"analytical_data": [[1, 2, 3]]}',
+        '{"analytical_data": 1, "concentration_data": [[1, 1, 1]]}',
+        '{"analytical_data": "[[1, 2, 3]", "concentration_data": [[1, 1, 1]]}',
+        '{"analytical_data": [[1, 2, 3]], "concentration_data": [[1, 1, 1]], "alpha": 2}'])
+    def test_linearity_must_refuse_a_body_not_valid(self, client, param_data):
+        response = client.post(url + '/linearity', data=param_data, content_type='application/json')
+        assert response.status_code == 400
+        assert response.json["RequestBodyNotValid"]["status"] == 400
+
+    def test_linearity_must_send_packed_arrays(self, client, mocker):
+        mocker.patch.object(result_cache, 'get', return_value=None)
+        json_data = {"analytical_data": TestLinearityBatch.curve["analytical_data"],
+                     "concentration_data": TestLinearityBatch.curve["concentration_data"]}
+        response = client.post(url + '/linearity?arrays=base64', data=json.dumps(json_data),
+                               content_type='application/json')
+        assert response.status_code == 201
+        assert response.headers['ETag'].endswith('-base64"')
+        residues = unpack_array(response.json['regression_residues'])
+        unpacked_response = client.post(url + '/linearity', data=json.dumps(json_data),
+                                        content_type='application/json')
+        assert residues.tolist() == pytest.approx(unpacked_response.json['regression_residues'])
+
+
+class TestLinearityFields(object):
+    json_data = {"analytical_data": TestLinearityBatch.curve["analytical_data"],
+                 "concentration_data": TestLinearityBatch.curve["concentration_data"]}
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self, mocker):
+        mocker.patch.object(result_cache, 'get', return_value=None)
+
+    def test_linearity_must_send_the_selected_fields(self, client, mocker):
+        validate_linearity_spy = mocker.spy(LinearityValidator, 'validate_linearity')
+        response = client.post(url + '/linearity?fields=linearity_is_valid,regression_coefficients',
+                               data=json.dumps(self.json_data), content_type='application/json')
+        complete_response = client.post(url + '/linearity', data=json.dumps(self.json_data),
+                                        content_type='application/json')
+        assert response.status_code == 201
+        assert set(response.json) == {'linearity_is_valid', 'regression_coefficients', 'status'}
+        assert response.json['linearity_is_valid'] == complete_response.json['linearity_is_valid']
+        assert response.json['regression_coefficients'] == complete_response.json['regression_coefficients']
+        assert response.headers['ETag'] != complete_response.headers['ETag']
+        assert validate_linearity_spy.call_args_list[0][0][1] == {'linearity_is_valid', 'regression'}
+
+    def test_linearity_must_refuse_fields_not_valid(self, client):
+        response = client.post(url + '/linearity?fields=slope', data=json.dumps(self.json_data),
+                               content_type='application/json')
+        assert response.status_code == 400
+        assert response.json["FieldNotValid"]["status"] == 400
+
+
+class TestLinearityTimings(object):
+    json_data = TestLinearityFields.json_data
+
+    def test_linearity_must_send_the_timings(self, client):
+        response = client.post(url + '/linearity?timings=true', data=json.dumps(self.json_data),
+                               content_type='application/json')
+        assert response.status_code == 201
+        assert 'ETag' not in response.headers
+        stages = [timing['stage'] for timing in response.json['timings']]
+        assert stages == ['read_body', 'handle_data', 'regression', 'residual_diagnostics', 'outliers',
+                          'linearity_is_valid', 'result']
+        assert {timing['outcome'] for timing in response.json['timings']} == {'ok'}
+
+    def test_linearity_must_not_send_the_timings_by_default(self, client):
+        response = client.post(url + '/linearity', data=json.dumps(self.json_data), content_type='application/json')
+        assert 'timings' not in response.json
+
+    def test_metrics_must_export_the_histograms(self, client):
+        client.post(url + '/linearity?timings=1', data=json.dumps(self.json_data), content_type='application/json')
+        response = client.get('/metrics')
+        assert response.mimetype == 'text/plain'
+        assert 'validawaree_stage_wall_seconds_bucket{stage="regression",le="+Inf"}' in response.get_data(as_text=True)
+        response = client.get('/metrics', headers={'Accept': 'application/json'})
+        assert response.json['stages']['regression']['count'] >= 1
@@ -0,0 +1,169 @@
+import asyncio
+import json
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from analytical_validation.api.app import app
+from analytical_validation.api.asgi import AsyncValidationApp, handle_request
+
+curve = {"analytical_data": [[0.188, 0.192, 0.203], [0.349, 0.346, 0.348], [0.489, 0.482, 0.492],
+                             [0.637, 0.641, 0.641], [0.762, 0.768, 0.786]],
+         "concentration_data": [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016], [0.02, 0.02, 0.02],
+                                [0.028, 0.028, 0.028], [0.032, 0.032, 0.032]]}
+
+
+def call(asgi_app, path, body, query_string=b''):
+    """Send a POST request to an ASGI app, in two body chunks, returning the status, headers and body."""
+    chunks = [{'type': 'http.request', 'body': body[:10], 'more_body': True},
+              {'type': 'http.request', 'body': body[10:], 'more_body': False}]
+    messages = []
+
+    async def receive():
+        return chunks.pop(0)
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'method': 'POST', 'path': path, 'query_string': query_string,
+             'headers': [(b'content-type', b'application/json')]}
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(asgi_app(scope, receive, send))
+    finally:
+        loop.close()
+    return messages[0]['status'], dict(messages[0]['headers']), messages[1]['body']
+
+
+class StubExecutor(object):
+    """Pool whose futures are left running, or which is broken."""
+
+    def __init__(self, broken=False):
+        self.broken = broken
+        self.futures = []
+        self.stopped = False
+
+    def submit(self, function, *args):
+        if self.broken:
+            raise BrokenProcessPool()
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self.futures.append(future)
+        return future
+
+    def shutdown(self, wait=True):
+        self.stopped = True
+
+
+@pytest.fixture
+def asgi_app():
+    asgi_app = AsyncValidationApp(max_workers=1)
+    yield asgi_app
+    asgi_app.shutdown()
+
+
+class TestHandleRequest(object):
+    def test_handle_request_must_answer_as_the_flask_app(self):
+        status, headers, body = handle_request('POST', '/linearity', 'fields=linearity_is_valid',
+                                               [('Content-Type', 'application/json')], json.dumps(curve).encode())
+        with app.test_client() as client:
+            response = client.post('/linearity?fields=linearity_is_valid', data=json.dumps(curve),
+                                   content_type='application/json')
+        assert status == response.status_code == 201
+        assert json.loads(body) == response.json
+        assert dict(headers)['ETag'] == response.headers['ETag']
+
+
+class TestAsyncValidationApp(object):
+    def test_asgi_app_must_validate_on_the_process_pool(self, asgi_app):
+        status, headers, body = call(asgi_app, '/linearity', json.dumps(curve).encode(), b'fields=linearity_is_valid')
+        assert status == 201
+        assert headers[b'content-type'] == b'application/json'
+        assert set(json.loads(body)) == {'linearity_is_valid', 'status'}
+        assert asgi_app.pending == 0
+
+    def test_asgi_app_must_refuse_requests_when_the_queue_is_full(self, asgi_app):
+        asgi_app.max_pending = 0
+        status, _, body = call(asgi_app, '/linearity', json.dumps(curve).encode())
+        assert status == 503
+        assert json.loads(body)["QueueFull"]["status"] == 503
+        assert asgi_app.executor is None
+
+    def test_asgi_app_must_time_out(self, asgi_app):
+        asgi_app.timeout = 1e-9
+        status, _, body = call(asgi_app, '/linearity/batch', json.dumps({"curves": [curve] * 10}).encode())
+        assert status == 504
+        assert json.loads(body)["Timeout"]["status"] == 504
+        asgi_app.shutdown()
+        assert asgi_app.pending == 0
+
+    def test_asgi_app_must_count_timed_out_requests_until_their_process_is_done(self):
+        asgi_app = AsyncValidationApp(max_workers=1, max_pending=1, timeout=1e-9)
+        asgi_app.executor = StubExecutor()
+        assert call(asgi_app, '/linearity', json.dumps(curve).encode())[0] == 504
+        assert asgi_app.pending == 1
+        assert call(asgi_app, '/linearity', json.dumps(curve).encode())[0] == 503
+        asgi_app.executor.futures[0].set_result((201, [], b'{}'))
+        assert asgi_app.pending == 0
+
+    def test_asgi_app_must_start_a_new_pool_when_the_pool_is_broken(self, asgi_app):
+        broken_executor = asgi_app.executor = StubExecutor(broken=True)
+        status, _, body = call(asgi_app, '/linearity', json.dumps(curve).encode())
+        assert status == 503
+        assert json.loads(body)["WorkersStopped"]["status"] == 503
+        assert asgi_app.executor is None and broken_executor.stopped
+        assert call(asgi_app, '/linearity', json.dumps(curve).encode())[0] == 201
+
+    def test_asgi_app_must_answer_503_when_a_pool_process_dies(self):
+        asgi_app = AsyncValidationApp(max_workers=1)
+        executor = asgi_app.executor = StubExecutor()
+
+        async def request():
+            task = asyncio.ensure_future(asgi_app.http(
+                {'type': 'http', 'method': 'POST', 'path': '/linearity', 'headers': []},
+                receive, send))
+            while not executor.futures:
+                await asyncio.sleep(0)
+            executor.futures[0].set_exception(BrokenProcessPool())
+            await task
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'{}'}
+
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(request())
+        finally:
+            loop.close()
+        assert messages[0]['status'] == 503
+        assert asgi_app.executor is None and asgi_app.pending == 0
+
+    def test_asgi_app_must_start_and_stop_the_pool_with_the_lifespan(self, asgi_app):
+        messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message['type'])
+            assert (asgi_app.executor is not None) == (message['type'] == 'lifespan.startup.complete')
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(asgi_app({'type': 'lifespan'}, receive, send))
+        finally:
+            loop.close()
+        assert sent == ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+
+    def test_asgi_app_must_be_configured_from_the_environment(self):
+        asgi_app = AsyncValidationApp.from_environment({'VALIDAWAREE_ASGI_WORKERS': '2',
+                                                        'VALIDAWAREE_ASGI_QUEUE_DEPTH': '3',
+                                                        'VALIDAWAREE_ASGI_TIMEOUT': '0'})
+        assert (asgi_app.max_workers, asgi_app.max_pending, asgi_app.timeout) == (2, 3, None)
@@ -0,0 +1,44 @@
+import pytest
+
+from analytical_validation.api.import_time import DEFAULT_MODULE, ModuleImportTime, check_import_time, \
+    format_report, main, measure_import_time, parse_import_time
+
+REPORT = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      4000 |     600000 | analytical_validation.api.app
+import time:      1000 |     500000 |   analytical_validation.api.api
+import time:       700 |     300000 |     pandas
+import time:       300 |     200000 |       pandas.core
+"""
+
+
+class TestImportTime(object):
+    def test_parse_import_time_must_read_each_module(self):
+        import_times = parse_import_time(REPORT)
+        assert [import_time.module for import_time in import_times] == [
+            '_io', DEFAULT_MODULE, 'analytical_validation.api.api', 'pandas', 'pandas.core']
+        assert import_times[1] == ModuleImportTime(DEFAULT_MODULE, 0.004, 0.6, 0)
+        assert [import_time.depth for import_time in import_times] == [1, 0, 1, 2, 3]
+
+    @pytest.mark.parametrize('param_budget, param_problems', [
+        (1.0, 1),
+        (0.5, 2),
+    ])
+    def test_check_import_time_must_find_the_regressions(self, param_budget, param_problems):
+        problems = check_import_time(parse_import_time(REPORT), budget=param_budget)
+        assert len(problems) == param_problems
+        assert any('pandas' in problem for problem in problems)
+
+    def test_format_report_must_list_the_slowest_modules(self):
+        lines = format_report(parse_import_time(REPORT), top=2).splitlines()
+        assert len(lines) == 3
+        assert lines[1].endswith(DEFAULT_MODULE)
+
+    def test_app_must_not_import_the_deferred_modules(self):
+        import_times = measure_import_time()
+        assert any(import_time.module == DEFAULT_MODULE for import_time in import_times)
+        assert check_import_time(import_times, budget=float('inf')) == []
+
+    def test_main_must_fail_over_the_budget(self, capsys):
+        assert main(['--budget', '0', '--top', '1']) == 1
+        assert 'over the budget' in capsys.readouterr().err
@@ -0,0 +1,173 @@
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import analytical_validation.api.api
+from analytical_validation.api.api import linearity_batch_job, linearity_job
+from analytical_validation.api.app import app
+from analytical_validation.api import jobs
+from analytical_validation.api.jobs import DONE, FAILED, QUEUED, JobQueue, JobStore, run_job
+
+curve = {"analytical_data": [[0.188, 0.192, 0.203], [0.349, 0.346, 0.348], [0.489, 0.482, 0.492],
+                             [0.637, 0.641, 0.641], [0.762, 0.768, 0.786]],
+         "concentration_data": [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016], [0.02, 0.02, 0.02],
+                                [0.028, 0.028, 0.028], [0.032, 0.032, 0.032]]}
+negative_curve = {"analytical_data": [[-3, 1, 2], [1, 2, 3]], "concentration_data": [[1, 1, 1], [2, 2, 2]]}
+
+
+def killed_job(body, progress):
+    # The worker process dies, as when it is killed for lack of memory
+    os._exit(1)
+
+
+def stopped_process_id():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture
+def job_store_path(tmpdir):
+    return str(tmpdir.join('jobs.sqlite'))
+
+
+@pytest.fixture
+def job_queue(job_store_path, mocker):
+    job_queue = JobQueue(job_store_path, max_workers=1)
+    mocker.patch.object(analytical_validation.api.api, 'job_queue', job_queue)
+    yield job_queue
+    job_queue.shutdown()
+
+
+@pytest.fixture
+def client():
+    with app.test_client() as client:
+        yield client
+
+
+class TestJobStore(object):
+    def test_job_store_must_keep_jobs_between_instances(self, job_store_path):
+        job_id = JobStore(job_store_path).create('linearity_job')
+        job = JobStore(job_store_path).get(job_id)
+        assert (job['kind'], job['state'], job['progress'], job['result']) == ('linearity_job', QUEUED, 0.0, None)
+
+    def test_job_store_must_return_none_for_unknown_jobs(self, job_store_path):
+        assert JobStore(job_store_path).get('unknown') is None
+
+    def test_run_job_must_store_the_result(self, job_store_path):
+        job_store = JobStore(job_store_path)
+        job_id = job_store.create('linearity_job')
+        run_job(job_store_path, job_id, linearity_job, curve)
+        job = job_store.get(job_id)
+        assert (job['state'], job['progress']) == (DONE, 1.0)
+        assert job['result']['status'] == 201
+        assert job['result']['regression_residues'] == pytest.approx(
+            linearity_job(curve, None)['regression_residues'].tolist())
+
+    def test_run_job_must_store_the_error(self, job_store_path):
+        job_store = JobStore(job_store_path)
+        job_id = job_store.create('linearity_job')
+        run_job(job_store_path, job_id, linearity_job, negative_curve)
+        job = job_store.get(job_id)
+        assert job['state'] == FAILED
+        assert job['error']['NegativeValue']['status'] == 400
+
+    def test_job_store_must_fail_the_jobs_of_stopped_processes(self, job_store_path):
+        job_store = JobStore(job_store_path)
+        orphaned_job_id = job_store.create('linearity_job')
+        job_id = job_store.create('linearity_job')
+        with job_store.connect() as connection:
+            connection.execute('UPDATE jobs SET owner = ? WHERE id = ?', (stopped_process_id(), orphaned_job_id))
+        job_store = JobStore(job_store_path)
+        assert job_store.get(orphaned_job_id)['state'] == FAILED
+        assert 'JobOrphaned' in job_store.get(orphaned_job_id)['error']
+        assert job_store.get(job_id)['state'] == QUEUED
+
+    def test_run_job_must_report_unexpected_errors_as_internal_errors(self, job_store_path, mocker):
+        job_store = JobStore(job_store_path)
+        job_id = job_store.create('linearity_job')
+        run_job(job_store_path, job_id, mocker.MagicMock(side_effect=KeyError('analytical_data')), curve)
+        job = job_store.get(job_id)
+        assert job['state'] == FAILED
+        assert job['error'] == {"InternalError": {"body": "Something went wrong on the server. Try again later.",
+                                                  "status": 500}}
+
+
+class TestJobQueue(object):
+    @pytest.mark.parametrize('param_environ, param_max_workers', [
+        ({}, 8),
+        ({'VALIDAWAREE_WORKERS': '3'}, 2),
+        ({'VALIDAWAREE_WORKERS': '16'}, 1),
+        ({'VALIDAWAREE_WORKERS': '3', 'VALIDAWAREE_JOB_WORKERS': '5'}, 5),
+    ])
+    def test_from_environment_must_share_the_cores_between_the_workers(self, job_store_path, mocker, param_environ,
+                                                                       param_max_workers):
+        mocker.patch.object(jobs, 'available_cores', return_value=8)
+        param_environ['VALIDAWAREE_JOBS_PATH'] = job_store_path
+        assert JobQueue.from_environment(param_environ).max_workers == param_max_workers
+
+    def test_submit_must_fail_the_job_when_the_pool_is_broken(self, job_queue, mocker):
+        executor = mocker.MagicMock()
+        executor.submit.side_effect = BrokenProcessPool()
+        job_queue._executor = executor
+        job_id = job_queue.submit(linearity_job, curve)
+        job = job_queue.get(job_id)
+        assert job['state'] == FAILED
+        assert job['error']['WorkersStopped']['status'] == 503
+        assert job_queue._executor is None
+
+    def test_submit_must_fail_the_job_when_its_worker_dies(self, job_queue):
+        job_id = job_queue.submit(killed_job, curve)
+        deadline = time.time() + 60.0
+        while job_queue.get(job_id)['state'] != FAILED and time.time() < deadline:
+            time.sleep(0.05)
+        assert 'WorkersStopped' in job_queue.get(job_id)['error']
+        job_id = job_queue.submit(linearity_job, curve)
+        while job_queue.get(job_id)['state'] != DONE and time.time() < deadline:
+            time.sleep(0.05)
+        assert job_queue.get(job_id)['state'] == DONE
+
+
+class TestLinearityBatchJob(object):
+    def test_linearity_batch_job_must_report_progress(self, mocker):
+        progress = mocker.MagicMock()
+        result = linearity_batch_job({'curves': [curve, negative_curve, curve]}, progress, chunk_size=2)
+        assert [result.get('status') for result in result['results']] == [201, None, 201]
+        assert progress.call_args_list == [mocker.call(2 / 3), mocker.call(1.0)]
+
+
+class TestJobsApi(object):
+    def wait_for(self, client, location, timeout=60.0):
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            response = client.get(location)
+            if response.json['state'] in (DONE, FAILED):
+                return response
+            time.sleep(0.05)
+        raise AssertionError('The job did not finish')
+
+    def test_jobs_must_run_batches_on_the_process_pool(self, client, job_queue):
+        response = client.post('/jobs', data=json.dumps(dict(kind='linearity_batch', curves=[curve, negative_curve])),
+                               content_type='application/json')
+        assert response.status_code == 202
+        assert response.json['state'] == QUEUED
+        job = self.wait_for(client, response.headers['Location']).json
+        assert job['state'] == DONE
+        assert job['result']['results'][0]['status'] == 201
+        assert 'NegativeValue' in job['result']['results'][1]
+
+    def test_jobs_must_refuse_bodies_not_valid(self, client, job_queue):
+        response = client.post('/jobs', data=json.dumps(dict(curve, kind='linearity_batch')),
+                               content_type='application/json')
+        assert response.status_code == 400
+        assert 'RequestBodyNotValid' in response.json
+
+    def test_job_must_answer_unknown_jobs(self, client, job_queue):
+        response = client.get('/jobs/unknown')
+        assert response.status_code == 404
+        assert 'JobNotFound' in response.json
@@ -0,0 +1,82 @@
+import numpy
+import pytest
+
+from analytical_validation.api.result_cache import ResultCache, canonical_key
+
+
+class TestCanonicalKey(object):
+    def test_canonical_key_must_match_equal_data(self):
+        assert canonical_key([[1, 2], [3]], [[1, 1], [2]]) == \
+               canonical_key([[1.0, 2.0], numpy.array([3.0])], [[1.0, 1.0], [2.0]])
+
+    @pytest.mark.parametrize('param_analytical_data, param_concentration_data, param_alpha', [
+        ([[1.0, 2.0, 3.0]], [[1.0, 1.0], [2.0]], 0.05),
+        ([[1.0, 2.0], [3.0]], [[1.0, 1.0], [2.5]], 0.05),
+        ([[1.0, 2.0], [3.0]], [[1.0, 1.0], [2.0]], 0.01)])
+    def test_canonical_key_must_change_with_the_data(self, param_analytical_data, param_concentration_data,
+                                                     param_alpha):
+        assert canonical_key([[1.0, 2.0], [3.0]], [[1.0, 1.0], [2.0]]) != \
+               canonical_key(param_analytical_data, param_concentration_data, param_alpha)
+
+
+class TestResultCache(object):
+    def test_result_cache_must_evict_the_least_recently_used(self):
+        result_cache = ResultCache(max_size=2)
+        result_cache.set('a', {'value': 1})
+        result_cache.set('b', {'value': 2})
+        assert result_cache.get('a') == {'value': 1}
+        result_cache.set('c', {'value': 3})
+        assert result_cache.get('b') is None
+        assert result_cache.get('a') == {'value': 1}
+        assert result_cache.get('c') == {'value': 3}
+
+    def test_result_cache_must_expire_results(self, mocker):
+        result_cache = ResultCache(ttl=10.0)
+        time_mock = mocker.patch('analytical_validation.api.result_cache.time.time', return_value=100.0)
+        result_cache.set('a', {'value': 1})
+        time_mock.return_value = 109.0
+        assert result_cache.get('a') == {'value': 1}
+        time_mock.return_value = 111.0
+        assert result_cache.get('a') is None
+
+    def test_result_cache_must_share_the_disk_tier(self, tmpdir):
+        path = str(tmpdir.join('results.sqlite'))
+        ResultCache(path=path).set('a', {'slope': numpy.float64(2.5), 'valid': numpy.bool_(True),
+                                         'residues': numpy.array([0.5, -0.5])})
+        result_cache = ResultCache(path=path)
+        assert result_cache.get('a') == {'slope': 2.5, 'valid': True, 'residues': [0.5, -0.5]}
+        assert 'a' in result_cache.entries
+        result_cache.clear()
+        assert ResultCache(path=path).get('a') is None
+
+    def test_result_cache_must_bound_the_disk_tier(self, tmpdir, mocker):
+        path = str(tmpdir.join('results.sqlite'))
+        result_cache = ResultCache(max_size=0, ttl=10.0, path=path, disk_size=5, purge_interval=4)
+        time_mock = mocker.patch('analytical_validation.api.result_cache.time.time', return_value=100.0)
+        row_counts = []
+        for index in range(40):
+            result_cache.set(str(index), {'value': index})
+            with result_cache.connect() as connection:
+                row_counts.append(connection.execute('SELECT COUNT(*) FROM results').fetchone()[0])
+        assert max(row_counts) <= 5 + 4
+        assert result_cache.get('39') == {'value': 39}
+        assert result_cache.get('0') is None
+        time_mock.return_value = 200.0
+        result_cache.set('new', {'value': 1})
+        result_cache.purge()
+        with result_cache.connect() as connection:
+            assert connection.execute('SELECT key FROM results').fetchall() == [('new',)]
+
+    def test_result_cache_must_not_keep_results_in_memory_when_disabled(self):
+        result_cache = ResultCache(max_size=0)
+        result_cache.set('a', {'value': 1})
+        assert result_cache.get('a') is None
+
+    def test_result_cache_must_be_configured_from_the_environment(self, tmpdir):
+        path = str(tmpdir.join('results.sqlite'))
+        result_cache = ResultCache.from_environment({'VALIDAWAREE_CACHE_SIZE': '8', 'VALIDAWAREE_CACHE_TTL': '60',
+                                                     'VALIDAWAREE_CACHE_PATH': path})
+        assert (result_cache.max_size, result_cache.ttl, result_cache.path, result_cache.disk_size) == \
+            (8, 60.0, path, 8)
+        assert ResultCache.from_environment({'VALIDAWAREE_CACHE_PATH': path,
+                                             'VALIDAWAREE_CACHE_DISK_SIZE': '100'}).disk_size == 100
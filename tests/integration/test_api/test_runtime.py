@@ -0,0 +1,84 @@
+import os
+import sys
+
+import pytest
+
+from analytical_validation.api import runtime
+from analytical_validation.api.runtime import THREAD_VARIABLES, WARM_UP_MODULES, WorkerConfiguration, \
+    available_cores, calibrate, configured_threads, format_configuration, import_modules, limit_threads, main, \
+    worker_configuration
+
+
+@pytest.fixture
+def thread_variables(monkeypatch):
+    # Restored by monkeypatch after the test
+    for variable in THREAD_VARIABLES:
+        monkeypatch.setenv(variable, 'unset')
+
+
+class TestLimitThreads(object):
+    def test_limit_threads_must_set_the_thread_variables(self, thread_variables):
+        limit_threads(2)
+        assert {os.environ[variable] for variable in THREAD_VARIABLES} == {'2'}
+
+    def test_limit_threads_must_limit_the_loaded_libraries(self, thread_variables, mocker):
+        threadpoolctl = mocker.patch.object(runtime, 'threadpoolctl')
+        limit_threads(1)
+        threadpoolctl.threadpool_limits.assert_called_once_with(limits=1)
+
+    def test_limit_threads_must_work_without_threadpoolctl(self, thread_variables, mocker):
+        mocker.patch.object(runtime, 'threadpoolctl', None)
+        assert limit_threads(1) == []
+
+
+class TestCalibrate(object):
+    def test_calibrate_must_time_each_number_of_threads(self, mocker):
+        pytest.importorskip('threadpoolctl')
+        workload = mocker.MagicMock()
+        timings = calibrate(cores=6, repeats=2, workload=workload)
+        assert sorted(timings) == [1, 2, 4]
+        assert workload.call_count == 1 + 3 * 2
+
+    def test_calibrate_must_time_one_thread_without_threadpoolctl(self, mocker):
+        mocker.patch.object(runtime, 'threadpoolctl', None)
+        assert list(calibrate(cores=4, repeats=1, workload=lambda: None)) == [1]
+
+    def test_calibrate_must_run_the_calibration_curve(self):
+        assert list(calibrate(cores=1, repeats=1)) == [1]
+
+
+class TestWorkerConfiguration(object):
+    @pytest.mark.parametrize('param_timings, param_workers, param_threads', [
+        (None, 8, 1),
+        ({1: 1.0, 2: 0.9, 4: 0.8, 8: 0.8}, 8, 1),
+        ({1: 1.0, 2: 0.55, 4: 0.3, 8: 0.25}, 2, 4),
+        ({1: 1.0, 2: 0.5, 4: 0.25, 8: 0.125}, 1, 8)])
+    def test_worker_configuration_must_share_the_cores(self, param_timings, param_workers, param_threads):
+        configuration = worker_configuration(cores=8, timings=param_timings, environ={})
+        assert (configuration.workers, configuration.threads) == (param_workers, param_threads)
+
+    def test_worker_configuration_must_be_overridden_by_the_environment(self):
+        configuration = worker_configuration(cores=8, environ={'VALIDAWAREE_WORKERS': '3',
+                                                               'VALIDAWAREE_BLAS_THREADS': '2'})
+        assert (configuration.workers, configuration.threads) == (3, 2)
+        assert configured_threads({'VALIDAWAREE_BLAS_THREADS': '2'}) == 2
+        assert configured_threads({}) == 1
+
+    def test_format_configuration_must_print_the_environment_variables(self):
+        lines = format_configuration(WorkerConfiguration(2, 4, 8, {1: 1.0, 4: 0.3})).splitlines()
+        assert lines == ['VALIDAWAREE_WORKERS=2 VALIDAWAREE_BLAS_THREADS=4', '# 1 BLAS threads: 1.0000s',
+                         '# 4 BLAS threads: 0.3000s']
+
+    def test_main_must_print_the_calibrated_configuration(self, capsys, mocker):
+        mocker.patch.object(runtime, 'calibrate', return_value={1: 1.0, 2: 0.5})
+        assert main(['--cores', '2']) == 0
+        assert capsys.readouterr().out.splitlines()[0] == 'VALIDAWAREE_WORKERS=1 VALIDAWAREE_BLAS_THREADS=2'
+
+    def test_available_cores_must_be_positive(self):
+        assert available_cores() >= 1
+
+
+class TestImportModules(object):
+    def test_import_modules_must_import_the_warm_up_modules(self):
+        import_modules()
+        assert all(name in sys.modules for name in WARM_UP_MODULES)
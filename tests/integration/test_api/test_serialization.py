@@ -0,0 +1,76 @@
+import json
+
+import numpy
+import pytest
+
+from analytical_validation.api import serialization
+from analytical_validation.api.serialization import dumps, linearity_result, pack_array, pack_data_sets, \
+    pack_result, unpack_array
+from analytical_validation.validators.linearity_validator import LinearityValidator
+
+
+@pytest.fixture
+def linearity_validator():
+    linearity_validator = LinearityValidator([[0.188, 0.192, 0.203], [0.349, 0.346, 0.348], [0.489, 0.482, 0.492],
+                                              [0.637, 0.641, 0.641], [0.762, 0.768, 0.786]],
+                                             [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016], [0.02, 0.02, 0.02],
+                                              [0.028, 0.028, 0.028], [0.032, 0.032, 0.032]])
+    linearity_validator.validate_linearity()
+    return linearity_validator
+
+
+class TestDumps(object):
+    value = {'float': numpy.float64(1.5), 'bool': numpy.bool_(True), 'int': numpy.int64(3),
+             'scalar_array': numpy.array(2.0), 'array': numpy.array([0.5, -0.5]), 'list': [1, 2.5]}
+    expected = {'float': 1.5, 'bool': True, 'int': 3, 'scalar_array': 2.0, 'array': [0.5, -0.5], 'list': [1, 2.5]}
+
+    def test_dumps_must_encode_numpy_values(self):
+        assert json.loads(dumps(self.value)) == self.expected
+
+    def test_dumps_must_encode_numpy_values_without_orjson(self, mocker):
+        mocker.patch.object(serialization, 'orjson', None)
+        assert json.loads(dumps(self.value)) == self.expected
+
+    def test_dumps_must_refuse_unknown_values(self):
+        with pytest.raises(TypeError):
+            dumps({'value': object()})
+
+
+class TestPackedArrays(object):
+    def test_pack_array_must_round_trip(self):
+        values = numpy.array([0.188, -0.192, numpy.nan, 1e-300])
+        packed = pack_array(values)
+        assert packed['dtype'] == 'float64'
+        assert packed['shape'] == [4]
+        numpy.testing.assert_array_equal(unpack_array(packed), values)
+
+    def test_pack_data_sets_must_round_trip(self):
+        data_sets = [[0.188, 0.192], [], [0.349, 0.346, 0.348]]
+        unpacked = unpack_array(pack_data_sets(data_sets))
+        assert [data_set.tolist() for data_set in unpacked] == data_sets
+
+
+class TestLinearityResult(object):
+    def test_linearity_result_must_be_encoded_as_the_validator_results(self, linearity_validator):
+        result = json.loads(dumps(linearity_result(linearity_validator)))
+        assert result['regression_coefficients']['slope'] == pytest.approx(linearity_validator.slope)
+        assert result['regression_anova']['degrees_of_freedom_model'] == \
+               pytest.approx(linearity_validator.degrees_of_freedom_model)
+        assert result['is_normal_distribution'] == bool(linearity_validator.is_normal_distribution)
+        assert result['regression_residues'] == pytest.approx(linearity_validator.regression_residues)
+        assert result['status'] == 201
+
+    def test_pack_result_must_pack_the_residues_and_the_cleaned_data(self, linearity_validator):
+        result = linearity_result(linearity_validator)
+        packed_result = json.loads(dumps(pack_result(result)))
+        numpy.testing.assert_allclose(unpack_array(packed_result['regression_residues']),
+                                      linearity_validator.regression_residues)
+        cleaned_analytical_data = unpack_array(packed_result['cleaned_data']['cleaned_analytical_data'])
+        assert [data_set.tolist() for data_set in cleaned_analytical_data] == \
+               linearity_validator.cleaned_analytical_data
+        assert packed_result['cleaned_data']['outliers'] == linearity_validator.outliers
+        assert isinstance(result['cleaned_data']['cleaned_analytical_data'], list)
+
+    def test_pack_result_must_keep_errors(self):
+        error = {"ValueNotValid": {"body": "Non number values are not valid. Check and try again.", "status": 400}}
+        assert pack_result(error) == error
@@ -0,0 +1,51 @@
+import threading
+
+import pytest
+
+from analytical_validation.api import warm_up as warm_up_module
+from analytical_validation.api.app import app
+from analytical_validation.api.warm_up import is_ready, start_warm_up, warm_up, warm_up_curve
+
+
+@pytest.fixture
+def cold_worker(mocker):
+    mocker.patch.object(warm_up_module, '_ready', threading.Event())
+    mocker.patch.object(warm_up_module, '_thread', None)
+
+
+@pytest.fixture
+def client():
+    with app.test_client() as client:
+        yield client
+
+
+class TestWarmUp(object):
+    def test_warm_up_curve_must_be_symmetric(self):
+        analytical_data, concentration_data = warm_up_curve(levels=4, replicates=2)
+        assert len(analytical_data) == len(concentration_data) == 4
+        assert {len(data_set) for data_set in analytical_data + concentration_data} == {2}
+
+    def test_warm_up_must_mark_the_worker_as_ready(self, cold_worker):
+        assert not is_ready()
+        assert warm_up() >= 0.0
+        assert is_ready()
+
+    def test_start_warm_up_must_warm_up_in_the_background(self, cold_worker):
+        start_warm_up()
+        warm_up_module._thread.join()
+        assert is_ready()
+
+
+class TestReadiness(object):
+    def test_readiness_must_answer_503_before_the_warm_up(self, client, cold_worker, mocker):
+        start_warm_up_mock = mocker.patch('analytical_validation.api.api.start_warm_up')
+        response = client.get('/ready')
+        assert response.status_code == 503
+        assert 'WorkerNotReady' in response.get_json()
+        assert start_warm_up_mock.called
+
+    def test_readiness_must_answer_200_after_the_warm_up(self, client, cold_worker):
+        warm_up()
+        response = client.get('/ready')
+        assert response.status_code == 200
+        assert response.get_json() == {'ready': True, 'status': 200}
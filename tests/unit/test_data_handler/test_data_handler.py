@@ -1,7 +1,17 @@
+import io
+
+import numpy
 import pytest
 
-from analytical_validation.data_handler.data_handler import DataHandler, check_values, check_is_list, check_list_of_lists
-from analytical_validation.exceptions import DataNotList, DataNotListOfLists, ValueNotValid, DataNotSymmetric
+from analytical_validation.data_handler.data_handler import DataHandler, check_values, check_is_list, \
+    check_list_of_lists, paired_data_sets, parse_data_sets, parse_values, ragged_data_sets, split_data_sets
+from analytical_validation.exceptions import DataNotList, DataNotListOfLists, ValueNotValid, DataNotSymmetric, \
+    NegativeValue
+
+
+def as_lists(ragged_data):
+    """The data sets of a (values, level_offsets) ragged array, as lists."""
+    return [data_set.tolist() for data_set in split_data_sets(*ragged_data)]
 
 
 class TestDataHandlerHelper(object):
@@ -94,6 +104,64 @@ class TestDataHandlerHelper(object):
         assert check_list_of_lists(param_data) == expected_result
 
 
+class TestParseValues(object):
+
+    def test_parse_values_must_flag_invalid_and_negative_positions(self):
+        parsed_values, invalid, negative = parse_values(["1,5", 2, None, "abc", "-1.234,5", True, "1,234.5",
+                                                         "12.34.56", "nan", "6e777777", {}, "'1 000,5'"])
+        numpy.testing.assert_array_equal(parsed_values, [1.5, 2.0, numpy.nan, numpy.nan, -1234.5, numpy.nan, 1234.5,
+                                                         numpy.nan, numpy.nan, numpy.inf, numpy.nan, 1000.5])
+        assert numpy.flatnonzero(invalid).tolist() == [3, 5, 7, 8, 10]
+        assert numpy.flatnonzero(negative).tolist() == [4]
+
+    def test_parse_values_must_convert_numeric_values(self):
+        values = [1, 0.1, "1.234", "123.E4", ".1", "6.523537535629999e-07", "1.797693e+308", "0E0", "+1e1",
+                  "  \n    1.23    \n\n", "1,234", ",1", None]
+        parsed_values, invalid, negative = parse_values(values)
+        assert not invalid.any() and not negative.any()
+        assert [None if numpy.isnan(value) else value for value in parsed_values.tolist()] == \
+            [1.0, 0.1, 1.234, 1230000.0, 0.1, 6.523537535629999e-07, 1.797693e+308, 0.0, 10.0, 1.23, 1.234, 0.1, None]
+        assert [check_values(value) for value in values] == \
+            [None if numpy.isnan(value) else value for value in parsed_values.tolist()]
+
+    @pytest.mark.parametrize('param_values, expected_values, expected_invalid, expected_negative', [
+        ([1.5, 2, None, numpy.float32(0.5), numpy.int64(3)], [1.5, 2.0, numpy.nan, 0.5, 3.0], [], []),
+        ([1.5, True, 2.0], [1.5, numpy.nan, 2.0], [1], []),
+        (["1,5", "2,25", "-3,0"], [1.5, 2.25, -3.0], [], [2]),
+        (["1.5", "abc", "nan"], [1.5, numpy.nan, numpy.nan], [1, 2], []),
+        (numpy.array(["1,5", "2"]), [1.5, 2.0], [], []),
+        ([1.5, "2,5", None], [1.5, 2.5, numpy.nan], [], []),
+    ])
+    def test_parse_values_must_parse_numbers_and_strings_apart(self, param_values, expected_values,
+                                                                expected_invalid, expected_negative):
+        parsed_values, invalid, negative = parse_values(param_values)
+        numpy.testing.assert_array_equal(parsed_values, expected_values)
+        assert numpy.flatnonzero(invalid).tolist() == expected_invalid
+        assert numpy.flatnonzero(negative).tolist() == expected_negative
+
+    def test_parse_values_must_treat_nan_numbers_as_missing(self):
+        """A nan number used to raise NegativeValue, it is now a missing value like None and the nan of arrays."""
+        parsed_values, invalid, negative = parse_values([1.0, float('nan')])
+        assert numpy.isnan(parsed_values[1])
+        assert not invalid.any() and not negative.any()
+        assert check_values(float('nan')) is None
+        checked_analytical_data, _ = DataHandler([[1.0, float('nan'), 2.0]], [[1.0, 1.0, 1.0]]).handle_data()
+        assert checked_analytical_data[0].tolist() == [1.0, 2.0]
+
+    def test_parse_values_must_not_copy_float_arrays(self):
+        values = numpy.array([1.0, -2.0, numpy.nan])
+        parsed_values, invalid, negative = parse_values(values)
+        assert numpy.shares_memory(parsed_values, values)
+        assert not invalid.any()
+        assert negative.tolist() == [False, True, False]
+
+    def test_check_list_of_lists_must_raise_first_error(self):
+        with pytest.raises(NegativeValue):
+            check_list_of_lists([[0.1, -0.2, "abc"]])
+        with pytest.raises(ValueNotValid):
+            check_list_of_lists([[0.1, "abc", -0.2]])
+
+
 class TestDataHandler(object):
 
     @pytest.mark.parametrize('param_analytical_data, param_concentration_data', [
@@ -138,8 +206,22 @@ class TestDataHandler(object):
         """
         data_handler = DataHandler(param_analytical_data, param_concentration_data)
         clean_analytical_data, clean_concentration_data = data_handler.replace_null_values()
-        assert clean_analytical_data == expected_analytical_result
-        assert clean_concentration_data == expected_concentration_result
+        assert as_lists(clean_analytical_data) == expected_analytical_result
+        assert as_lists(clean_concentration_data) == expected_concentration_result
+
+    @pytest.mark.parametrize('param_analytical_data, param_concentration_data', [
+        ("abc", [[1]]),
+        ([[1]], {"data": [[1]]}),
+        ((1, 2, 3), [[1]]),
+        (None, numpy.array([[1.0]])),
+    ])
+    def test_data_handler_must_raise_data_not_list_when_data_is_not_list(self, param_analytical_data,
+                                                                        param_concentration_data):
+        """Given data that is neither a list nor an array
+        when DataHandler is created
+        must raise DataNotList"""
+        with pytest.raises(DataNotList):
+            DataHandler(param_analytical_data, param_concentration_data)
 
     def test_data_handler_must_pass_given_adequate_data(self):
         """Given analytical data and concentration data, in a list of lists,
@@ -164,5 +246,143 @@ class TestDataHandler(object):
         ]
         checked_analytical_data, checked_concentration_data = DataHandler(analytical_data,
                                                                           concentration_data).handle_data()
-        assert checked_analytical_data == analytical_data
-        assert checked_concentration_data == concentration_data
+        assert as_lists(checked_analytical_data) == analytical_data
+        assert as_lists(checked_concentration_data) == concentration_data
+
+
+class TestParseDataSets(object):
+
+    def test_parse_data_sets_must_parse_all_data_sets_at_once(self):
+        values, level_offsets = parse_data_sets([["1,5", 2, None], [], ["10"]])
+        numpy.testing.assert_array_equal(values, [1.5, 2.0, numpy.nan, 10.0])
+        assert level_offsets.tolist() == [0, 3, 3, 4]
+
+    @pytest.mark.parametrize('param_data, expected_exception', [
+        ([1], DataNotListOfLists),
+        ([[1, 2], (3, 4)], DataNotListOfLists),
+        ([[1, "x86E0", 3]], ValueNotValid),
+        ([[1, 2], [-3]], NegativeValue),
+    ])
+    def test_parse_data_sets_must_raise_exception_when_data_not_valid(self, param_data, expected_exception):
+        with pytest.raises(expected_exception):
+            parse_data_sets(param_data)
+
+
+class TestRaggedDataSets(object):
+
+    @pytest.mark.parametrize('param_data', [
+        [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]],
+        [numpy.array([1.0, 2.0, 3.0]), numpy.array([4.0, 5.0, 6.0])],
+        numpy.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]),
+        (numpy.arange(1.0, 7.0), numpy.array([0, 3, 6])),
+        memoryview(numpy.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])),
+    ])
+    def test_ragged_data_sets_must_flatten_data_sets(self, param_data):
+        values, level_offsets = ragged_data_sets(param_data)
+        assert values.tolist() == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+        assert level_offsets.tolist() == [0, 3, 6]
+
+    def test_ragged_data_sets_must_not_copy_float_arrays(self):
+        data = numpy.array([[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]])
+        values, _ = ragged_data_sets(data)
+        assert numpy.shares_memory(values, data)
+
+    @pytest.mark.parametrize('param_data, expected_exception', [
+        (numpy.arange(3.0), DataNotListOfLists),
+        ((numpy.arange(3.0), numpy.array([0, 2])), DataNotListOfLists),
+        ((numpy.arange(3.0), numpy.array([0, 2, 1, 3])), DataNotListOfLists),
+        ([1.0, 2.0], DataNotListOfLists),
+        (numpy.array([["a", "b"]]), ValueNotValid),
+    ])
+    def test_ragged_data_sets_must_raise_exception_when_data_not_valid(self, param_data, expected_exception):
+        with pytest.raises(expected_exception):
+            ragged_data_sets(param_data)
+
+    def test_paired_data_sets_must_drop_pairs_with_missing_values(self):
+        analytical_data = numpy.array([[1.0, numpy.nan, 3.0], [4.0, 5.0, numpy.nan]])
+        concentration_data = numpy.array([[7.0, 8.0, 9.0], [numpy.nan, 11.0, numpy.nan]])
+        analytical_values, concentration_values, level_offsets = paired_data_sets(analytical_data,
+                                                                                  concentration_data)
+        assert analytical_values.tolist() == [1.0, 3.0, 5.0]
+        assert concentration_values.tolist() == [7.0, 9.0, 11.0]
+        assert level_offsets.tolist() == [0, 2, 3]
+
+    def test_paired_data_sets_must_raise_exception_when_data_not_symmetric(self):
+        with pytest.raises(DataNotSymmetric):
+            paired_data_sets([[1.0, 2.0], [3.0]], [[1.0], [2.0, 3.0]])
+
+    def test_handle_data_must_raise_data_not_symmetric_when_data_sets_are_not_paired(self):
+        analytical_data = [[0.188, 0.192, 0.203], [0.349, 0.346]]
+        concentration_data = [[0.008, 0.008], [0.016, 0.016, 0.016]]
+        with pytest.raises(DataNotSymmetric):
+            DataHandler(analytical_data, concentration_data).handle_data()
+
+    def test_handle_data_must_drop_pairs_with_a_missing_value(self):
+        checked_analytical_data, checked_concentration_data = DataHandler(
+            [["0,188", 0.192, None], [None, None], [0.349, 0.346]],
+            [[0.008, None, 0.008], [0.012, 0.012], [0.016, 0.016]]).handle_data()
+        assert as_lists(checked_analytical_data) == [[0.188], [0.349, 0.346]]
+        assert as_lists(checked_concentration_data) == [[0.008], [0.016, 0.016]]
+
+    def test_data_handler_must_handle_array_data(self):
+        analytical_data = numpy.ma.MaskedArray([[0.188, 0.192, 0.203], [0.349, 0.0, 0.348]],
+                                               [[False, False, False], [False, True, False]])
+        concentration_data = numpy.array([[0.008, 0.008, 0.008], [0.016, 0.016, 0.016]])
+        checked_analytical_data, checked_concentration_data = DataHandler(analytical_data,
+                                                                          concentration_data).handle_data()
+        assert as_lists(checked_analytical_data) == [[0.188, 0.192, 0.203], [0.349, 0.348]]
+        assert as_lists(checked_concentration_data) == [[0.008, 0.008, 0.008], [0.016, 0.016]]
+        # Without missing values the data are not copied
+        _, checked_concentration_data = DataHandler(analytical_data.data, concentration_data).handle_data()
+        assert numpy.shares_memory(checked_concentration_data[0], concentration_data)
+
+    def test_data_handler_must_handle_memoryview_data(self):
+        concentration_data = numpy.array([[0.008, 0.008, 0.008], [0.016, 0.016, 0.016]])
+        checked_analytical_data, checked_concentration_data = DataHandler(
+            memoryview(numpy.array([[0.188, 0.192, 0.203], [0.349, numpy.nan, 0.348]])),
+            memoryview(concentration_data)).handle_data()
+        assert as_lists(checked_analytical_data) == [[0.188, 0.192, 0.203], [0.349, 0.348]]
+        assert as_lists(checked_concentration_data) == [[0.008, 0.008, 0.008], [0.016, 0.016]]
+        with pytest.raises(DataNotList):
+            DataHandler(b'abc', concentration_data)
+
+    def test_data_handler_must_raise_exception_when_array_data_negative(self):
+        with pytest.raises(NegativeValue):
+            DataHandler(numpy.array([[1.0, -2.0]]), numpy.array([[1.0, 2.0]]))
+
+
+class TestDataHandlerFromCsv(object):
+    csv_data = "Level;Area;Concentration\n" \
+               "L1;0,188;0,008\nL2;0,349;0,016\nL1;0,192;0,008\n;1,0;1,0\nL2;;0,016\nL3;0,489;0,02\n" \
+               "L3;0,482;0,02\nL2;0,346;0,016\nL1;0,203;0,008\nL3;0,492;0,02\n"
+
+    @pytest.mark.parametrize('param_chunk_size', [2, 3, 65536])
+    def test_from_csv_must_group_rows_into_levels(self, param_chunk_size):
+        data_handler = DataHandler.from_csv(io.StringIO(self.csv_data), 'Level', 'Area', 'Concentration',
+                                            chunk_size=param_chunk_size)
+        checked_analytical_data, checked_concentration_data = data_handler.handle_data()
+        assert data_handler.levels == ['L1', 'L2', 'L3']
+        assert as_lists(checked_analytical_data) == [[0.188, 0.192, 0.203],
+                                                                              [0.349, 0.346],
+                                                                              [0.489, 0.482, 0.492]]
+        assert as_lists(checked_concentration_data) == [[0.008, 0.008, 0.008],
+                                                                                 [0.016, 0.016],
+                                                                                 [0.02, 0.02, 0.02]]
+
+    def test_from_csv_must_use_level_column_as_concentration(self):
+        csv_data = "Concentration\tArea\n1,0\t1.000,5\n2,0\t2.001,0\n1,0\t1.002,5\n"
+        data_handler = DataHandler.from_csv(io.StringIO(csv_data), 'Concentration', 'Area', delimiter='\t',
+                                            thousands='.')
+        checked_analytical_data, checked_concentration_data = data_handler.handle_data()
+        assert data_handler.levels == [1.0, 2.0]
+        assert as_lists(checked_analytical_data) == [[1000.5, 1002.5], [2001.0]]
+        assert as_lists(checked_concentration_data) == [[1.0, 1.0], [2.0]]
+
+    @pytest.mark.parametrize('param_csv_data, expected_exception', [
+        ("Level;Area;Concentration\nL1;abc;1,0\n", ValueNotValid),
+        ("Level;Signal;Concentration\nL1;1,0;1,0\n", ValueNotValid),
+        ("Level;Area;Concentration\nL1;-1,0;1,0\n", NegativeValue),
+    ])
+    def test_from_csv_must_raise_exception_when_data_not_valid(self, param_csv_data, expected_exception):
+        with pytest.raises(expected_exception):
+            DataHandler.from_csv(io.StringIO(param_csv_data), 'Level', 'Area', 'Concentration')
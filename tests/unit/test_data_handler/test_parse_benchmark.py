@@ -0,0 +1,20 @@
+from analytical_validation.data_handler.data_handler import check_values
+from analytical_validation.data_handler.parse_benchmark import benchmark_values, check_each_value, format_report, \
+    main, run_benchmark
+
+
+class TestParseBenchmark(object):
+
+    def test_check_each_value_must_match_check_values(self):
+        for values in benchmark_values(size=50).values():
+            assert check_each_value(values) == [check_values(value) for value in values]
+
+    def test_run_benchmark_must_time_each_kind_of_values(self):
+        parse_timings = run_benchmark(size=100, repeats=1)
+        assert [parse_timing.values for parse_timing in parse_timings] == list(benchmark_values(size=1))
+        assert all(parse_timing.parse_values > 0 and parse_timing.each_value > 0 for parse_timing in parse_timings)
+        assert len(format_report(parse_timings).splitlines()) == len(parse_timings) + 1
+
+    def test_main_must_print_the_report(self, capsys):
+        assert main(['--size', '100', '--repeats', '1']) == 0
+        assert 'speedup' in capsys.readouterr().out
@@ -0,0 +1,60 @@
+import pytest
+
+from analytical_validation.instrumentation import StageTimer, StageTiming, TimerRegistry
+
+
+@pytest.fixture
+def registry():
+    return TimerRegistry(buckets=(0.01, 0.1))
+
+
+class TestStageTimer(object):
+    def test_stage_must_record_the_timing(self, registry):
+        stage_timer = StageTimer(registry)
+        with stage_timer.stage('regression'):
+            sum(range(1000))
+        [timing] = stage_timer.timings
+        assert timing.stage == 'regression'
+        assert timing.outcome == 'ok'
+        assert timing.wall_time >= 0.0 and timing.cpu_time >= 0.0
+        assert registry.snapshot()['regression']['count'] == 1
+
+    def test_stage_must_record_the_exception(self, registry):
+        stage_timer = StageTimer(registry)
+        with pytest.raises(ZeroDivisionError):
+            with stage_timer.stage('regression'):
+                1 / 0
+        assert stage_timer.timings[0].outcome == 'ZeroDivisionError'
+        assert registry.snapshot()['regression']['outcomes'] == {'ZeroDivisionError': 1}
+
+    def test_as_list_must_hold_dicts(self):
+        stage_timer = StageTimer(registry=None)
+        with stage_timer.stage('outliers'):
+            pass
+        assert list(stage_timer.as_list()[0]) == ['stage', 'wall_time', 'cpu_time', 'outcome']
+
+
+class TestTimerRegistry(object):
+    def test_snapshot_must_count_each_bucket(self, registry):
+        for wall_time in (0.005, 0.05, 0.5, 0.5):
+            registry.record(StageTiming('regression', wall_time, 0.001, 'ok'))
+        histogram = registry.snapshot()['regression']
+        assert histogram['count'] == 4
+        assert histogram['wall_time']['buckets'] == {'0.01': 1, '0.1': 1, '+Inf': 2}
+        assert histogram['wall_time']['sum'] == pytest.approx(1.055)
+        assert histogram['cpu_time']['buckets'] == {'0.01': 4, '0.1': 0, '+Inf': 0}
+
+    def test_export_must_write_cumulative_buckets(self, registry):
+        registry.record(StageTiming('regression', 0.05, 0.05, 'ok'))
+        registry.record(StageTiming('regression', 0.5, 0.5, 'ValueError'))
+        lines = registry.export().splitlines()
+        assert 'validawaree_stage_wall_seconds_bucket{stage="regression",le="0.01"} 0' in lines
+        assert 'validawaree_stage_wall_seconds_bucket{stage="regression",le="0.1"} 1' in lines
+        assert 'validawaree_stage_wall_seconds_bucket{stage="regression",le="+Inf"} 2' in lines
+        assert 'validawaree_stage_wall_seconds_count{stage="regression"} 2' in lines
+        assert 'validawaree_stage_runs_total{stage="regression",outcome="ValueError"} 1' in lines
+
+    def test_clear_must_empty_the_histograms(self, registry):
+        registry.record(StageTiming('regression', 0.05, 0.05, 'ok'))
+        registry.clear()
+        assert registry.snapshot() == {}
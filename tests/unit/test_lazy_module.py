@@ -0,0 +1,30 @@
+import sys
+
+import pytest
+
+from analytical_validation.lazy_module import LazyModule
+
+
+class TestLazyModule(object):
+    def test_lazy_module_must_import_on_first_attribute(self):
+        lazy_module = LazyModule('json')
+        assert lazy_module._module is None
+        assert lazy_module.dumps([1]) == '[1]'
+        assert lazy_module.load() is sys.modules['json']
+
+    def test_lazy_module_must_import_the_submodules(self):
+        lazy_module = LazyModule('xml')
+        assert lazy_module.dom.__name__ == 'xml.dom'
+
+    def test_lazy_module_must_raise_attribute_error(self):
+        lazy_module = LazyModule('json')
+        with pytest.raises(AttributeError):
+            lazy_module.not_an_attribute
+        assert not hasattr(lazy_module, '__wrapped__')
+
+    def test_lazy_module_must_be_patched_on_the_module(self, mocker):
+        lazy_module = LazyModule('json')
+        dumps = mocker.patch('json.dumps')
+        assert lazy_module.dumps is dumps
+        mocker.stopall()
+        assert lazy_module.dumps([1]) == '[1]'
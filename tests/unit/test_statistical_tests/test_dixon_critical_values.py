@@ -0,0 +1,40 @@
+import numpy
+import pytest
+
+from analytical_validation.exceptions import AlphaNotValid, DataIsOutOfRange, DixonStatisticNotValid
+from analytical_validation.statistical_tests.dixon_critical_values import critical_value, dixon_statistic
+from analytical_validation.statistical_tests.dixon_qtest import DixonQTest
+
+
+class TestDixonCriticalValues(object):
+
+    @pytest.mark.parametrize('param_alpha, param_key', [(0.10, 'alpha_10'), (0.05, 'alpha_05'), (0.01, 'alpha_01')])
+    def test_critical_value_must_match_published_r10_values(self, param_alpha, param_key):
+        sample_sizes = numpy.arange(3, 29)
+        expected = numpy.array(DixonQTest.QVALUES[param_key])[sample_sizes - 3]
+        numpy.testing.assert_allclose(critical_value(sample_sizes, param_alpha), expected, atol=0.01)
+
+    def test_critical_value_must_decrease_with_alpha_and_sample_size(self):
+        alphas = [0.001, 0.0037, 0.02, 0.05, 0.2, 0.5]
+        assert numpy.all(numpy.diff([critical_value(10, alpha, 'r11') for alpha in alphas]) < 0)
+        assert numpy.all(numpy.diff(critical_value(numpy.arange(6, 101), 0.05, 'r22')) < 0.005)
+
+    def test_dixon_statistic_must_compute_low_and_high_ratios(self):
+        low, high = dixon_statistic(numpy.array([1.0, 2.0, 4.0, 8.0, 9.0, 10.0]), 'r11')
+        assert low == pytest.approx(1.0 / 8.0)
+        assert high == pytest.approx(1.0 / 8.0)
+
+    def test_critical_value_must_raise_exception_when_statistic_not_valid(self):
+        with pytest.raises(DixonStatisticNotValid):
+            critical_value(10, 0.05, 'r12')
+
+    @pytest.mark.parametrize('param_alpha', [0.0001, 0.51, '0.05', None, True])
+    def test_critical_value_must_raise_exception_when_alpha_not_valid(self, param_alpha):
+        with pytest.raises(AlphaNotValid):
+            critical_value(10, param_alpha)
+
+    @pytest.mark.parametrize('param_sample_size, param_statistic', [(2, 'r10'), (5, 'r22'), (101, 'r10')])
+    def test_critical_value_must_raise_exception_when_sample_size_out_of_range(self, param_sample_size,
+                                                                               param_statistic):
+        with pytest.raises(DataIsOutOfRange):
+            critical_value(param_sample_size, 0.05, param_statistic)
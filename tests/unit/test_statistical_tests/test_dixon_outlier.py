@@ -1,9 +1,11 @@
+import numpy
 import pytest
 
 from analytical_validation.exceptions import DataNotNumber, DataIsEmpty, \
-    DataNotList, AlphaNotValid, DirectionNotBoolean
+    DataNotList, AlphaNotValid, DirectionNotBoolean, DixonStatisticNotValid
 
-from analytical_validation.statistical_tests.dixon_qtest import DixonQTest
+from analytical_validation.statistical_tests.dixon_qtest import DixonQTest, check_data_sets_for_outliers, \
+    pad_data_sets
 
 
 class TestDixonQTest(object):
@@ -102,3 +104,50 @@ class TestDixonQTest(object):
         # Assert
         assert cleaned_data == param_data
         assert outliers == []
+
+
+class TestCheckDataSetsForOutliers(object):
+
+    @pytest.mark.parametrize('param_alpha, param_left, param_right', [
+        (0.05, True, True), (0.10, True, True), (0.01, True, True), (0.05, False, True), (0.05, True, False)
+    ])
+    def test_check_data_sets_for_outliers_must_match_dixon_q_test_of_each_data_set(self, param_alpha, param_left,
+                                                                                   param_right):
+        """Given data sets of different lengths padded with nan
+        When check_data_sets_for_outliers is called
+        Then each row must have the outliers found by DixonQTest"""
+        # Arrange
+        data_sets = [[0.100, 0.150, 0.200, 0.100, 0.200, 10.0], [0.142, 0.153, 0.135, 0.002, 0.175],
+                     [0.542, 0.153, 0.135, 0.002, 0.175], [0.142, 0.153, 0.135, 0.002, 0.175, 0.542], [1.0, 1.0],
+                     [2.0, 2.0, 2.0], [1.0, 2.0, 3.0, 4.0]]
+        # Act
+        outliers_mask, cleaned_data = check_data_sets_for_outliers(pad_data_sets(data_sets), param_left,
+                                                                   param_right, param_alpha)
+        # Assert
+        for data_set, outliers_set, cleaned_data_set in zip(data_sets, outliers_mask, cleaned_data):
+            expected_outliers, expected_cleaned_data = DixonQTest(list(data_set), param_left, param_right,
+                                                                  param_alpha).check_data_for_outliers()
+            assert numpy.array(data_set)[outliers_set[:len(data_set)]].tolist() == expected_outliers
+            assert cleaned_data_set[~numpy.isnan(cleaned_data_set)].tolist() == expected_cleaned_data
+
+    def test_pad_data_sets_must_pad_data_sets_with_nan(self):
+        padded_data = pad_data_sets([[1.0, 2.0, 3.0], [4.0], []])
+        assert padded_data.shape == (3, 3)
+        assert padded_data[0].tolist() == [1.0, 2.0, 3.0]
+        assert numpy.isnan(padded_data[1, 1:]).all() and numpy.isnan(padded_data[2]).all()
+
+    def test_check_data_sets_for_outliers_must_use_any_tabulated_alpha_and_statistic(self):
+        data_sets = pad_data_sets([[0.100, 0.150, 0.200, 0.100, 0.200, 0.120, 0.170, 0.130, 10.0],
+                                   [0.142, 0.153, 0.135, 0.160, 0.175, 0.150, 0.140]])
+        outliers_mask, cleaned_data = check_data_sets_for_outliers(data_sets, alpha=0.025, statistic='r21')
+        assert outliers_mask.sum(axis=1).tolist() == [1, 0]
+        assert numpy.isnan(cleaned_data[0, 8])
+
+    def test_check_data_sets_for_outliers_must_raise_exception_when_statistic_not_valid(self):
+        with pytest.raises(DixonStatisticNotValid):
+            check_data_sets_for_outliers([[1.0, 1.0, 1.0]], statistic='r30')
+
+    @pytest.mark.parametrize("param_alpha", [0.0001, 0.6, "Not Number", None])
+    def test_check_data_sets_for_outliers_must_raise_exception_when_alpha_not_valid(self, param_alpha):
+        with pytest.raises(AlphaNotValid):
+            check_data_sets_for_outliers([[1.0, 1.0, 1.0]], alpha=param_alpha)
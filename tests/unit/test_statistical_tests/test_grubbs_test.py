@@ -0,0 +1,78 @@
+import numpy
+import pytest
+
+from analytical_validation.exceptions import AlphaNotValid, ValueNotValid
+from analytical_validation.statistical_tests.grubbs_test import _extreme_studentized_deviates, \
+    generalized_esd_outliers, grubbs_critical_value, grubbs_outliers
+
+# Rosner (1983) data set, used by the NIST/SEMATECH e-Handbook generalized ESD example
+ROSNER_DATA = [-0.25, 0.68, 0.94, 1.15, 1.20, 1.26, 1.26, 1.34, 1.38, 1.43, 1.49, 1.49, 1.55, 1.56, 1.58, 1.65, 1.69,
+               1.70, 1.76, 1.77, 1.81, 1.91, 1.94, 1.96, 1.99, 2.06, 2.09, 2.10, 2.14, 2.15, 2.23, 2.24, 2.26, 2.35,
+               2.37, 2.40, 2.47, 2.54, 2.62, 2.64, 2.90, 2.92, 2.92, 2.93, 3.21, 3.26, 3.30, 3.59, 3.68, 4.30, 4.64,
+               5.34, 5.42, 6.01]
+
+
+def naive_generalized_esd(data_set, alpha, max_outliers):
+    remaining = list(data_set)
+    removed, significant = [], []
+    for _ in range(max_outliers):
+        values = numpy.array(remaining)
+        deviates = numpy.abs(values - values.mean()) / values.std(ddof=1)
+        index = int(numpy.argmax(deviates))
+        significant.append(deviates[index] > grubbs_critical_value(len(values), alpha))
+        removed.append(remaining.pop(index))
+    outliers_count = max((step + 1 for step, is_significant in enumerate(significant) if is_significant), default=0)
+    return sorted(removed[:outliers_count])
+
+
+class TestGrubbsTest(object):
+
+    def test_grubbs_critical_value_must_match_nist_values(self):
+        expected = [3.158, 3.151, 3.143, 3.136, 3.128, 3.120, 3.111, 3.103, 3.094, 3.085]
+        numpy.testing.assert_allclose(grubbs_critical_value(numpy.arange(54, 44, -1)), expected, atol=1e-3)
+
+    def test_generalized_esd_outliers_must_find_rosner_outliers(self):
+        outliers_mask, cleaned_data = generalized_esd_outliers([ROSNER_DATA], max_outliers=10)
+        assert numpy.array(ROSNER_DATA)[outliers_mask[0]].tolist() == [5.34, 5.42, 6.01]
+        assert numpy.isnan(cleaned_data[0]).sum() == 3
+
+    def test_grubbs_outliers_must_stop_at_first_non_significant_value(self):
+        outliers_mask, cleaned_data = grubbs_outliers([ROSNER_DATA])
+        assert not outliers_mask.any()
+        assert cleaned_data[0].tolist() == ROSNER_DATA
+
+    def test_grubbs_outliers_must_stop_the_loop_when_no_data_set_is_significant(self):
+        data = numpy.array([ROSNER_DATA, ROSNER_DATA[:-1] + [60.0]])
+        removed, significant = _extreme_studentized_deviates(data, 0.05, numpy.array([54, 54]),
+                                                             stop_at_first_non_significant=True)
+        assert significant.tolist() == [[False, False], [True, False]]
+        assert removed[1, 0] == 53
+        outliers_mask, _ = grubbs_outliers(data)
+        assert numpy.flatnonzero(outliers_mask[0]).tolist() == []
+        assert numpy.flatnonzero(outliers_mask[1]).tolist() == [53]
+
+    def test_generalized_esd_outliers_must_match_naive_implementation(self):
+        random_generator = numpy.random.default_rng(7)
+        data = random_generator.normal(size=(20, 300))
+        data[:, :4] += random_generator.uniform(-6, 6, size=(20, 4))
+        data[10:, 150:] = numpy.nan
+        outliers_mask, _ = generalized_esd_outliers(data, max_outliers=8)
+        for data_set, outliers_set in zip(data, outliers_mask):
+            data_set = data_set[~numpy.isnan(data_set)]
+            assert sorted(data_set[outliers_set[:len(data_set)]].tolist()) == naive_generalized_esd(data_set, 0.05, 8)
+
+    @pytest.mark.parametrize('param_data', [[[1.0, 1.0, 1.0]], [[1.0, 2.0]], [[]]])
+    def test_outliers_must_not_be_found_in_constant_or_small_data_sets(self, param_data):
+        assert not grubbs_outliers(param_data)[0].any()
+        assert not generalized_esd_outliers(param_data)[0].any()
+
+    @pytest.mark.parametrize('param_alpha', [0, 1, '0.05', None, True])
+    def test_outliers_must_raise_exception_when_alpha_not_valid(self, param_alpha):
+        with pytest.raises(AlphaNotValid):
+            grubbs_outliers([ROSNER_DATA], param_alpha)
+        with pytest.raises(AlphaNotValid):
+            generalized_esd_outliers([ROSNER_DATA], param_alpha)
+
+    def test_outliers_must_raise_exception_when_data_not_number(self):
+        with pytest.raises(ValueNotValid):
+            grubbs_outliers([[1.0, 'a', 2.0]])
@@ -0,0 +1,85 @@
+import numpy
+import pytest
+import statsmodels.api as statsmodels
+from pytest import approx
+
+from analytical_validation.statistical_tests.ordinary_least_squares import OrdinaryLeastSquares, \
+    SufficientStatistics
+
+_concentration_data = [31800, 31680, 31600, 36080, 36600, 36150, 39641, 40108, 40190,
+                       43564, 43800, 43776, 47680, 47800, 47341]
+_analytical_data = [88269, 86954, 88492, 99580, 101235, 100228, 108238, 109725, 110970,
+                    118102, 119044, 118292, 129714, 129481, 130213]
+
+
+@pytest.fixture(scope='module')
+def reference_result():
+    return statsmodels.OLS(_analytical_data, statsmodels.add_constant(_concentration_data)).fit()
+
+
+class TestSufficientStatistics(object):
+
+    def test_from_sums_must_match_from_data(self):
+        """Given the raw sums of a data set
+        When from_sums is called
+        Then must return the same centered statistics as from_data"""
+        x = numpy.array(_concentration_data, dtype=float)
+        y = numpy.array(_analytical_data, dtype=float)
+        expected = SufficientStatistics.from_data(x, y)
+        statistics = SufficientStatistics.from_sums(len(x), x.sum(), y.sum(), (x * y).sum(), (x * x).sum(),
+                                                    (y * y).sum())
+        assert statistics.nobs == expected.nobs
+        assert statistics.sxx == approx(expected.sxx)
+        assert statistics.syy == approx(expected.syy)
+        assert statistics.sxy == approx(expected.sxy)
+
+    def test_add_must_match_statistics_of_the_whole_data_set(self):
+        """Given observations added one by one
+        When add is called
+        Then the running statistics must match the statistics of the whole data set"""
+        statistics = SufficientStatistics()
+        for x, y in zip(_concentration_data, _analytical_data):
+            statistics.add(x, y)
+        expected = SufficientStatistics.from_data(_concentration_data, _analytical_data)
+        for attribute in ('nobs', 'mean_x', 'mean_y', 'sxx', 'syy', 'sxy'):
+            assert getattr(statistics, attribute) == approx(getattr(expected, attribute), rel=1e-10)
+
+    def test_remove_must_be_the_inverse_of_add(self):
+        statistics = SufficientStatistics.from_data(_concentration_data, _analytical_data)
+        statistics.remove(_concentration_data[4], _analytical_data[4])
+        expected = SufficientStatistics.from_data(_concentration_data[:4] + _concentration_data[5:],
+                                                  _analytical_data[:4] + _analytical_data[5:])
+        for attribute in ('nobs', 'mean_x', 'mean_y', 'sxx', 'syy', 'sxy'):
+            assert getattr(statistics, attribute) == approx(getattr(expected, attribute), rel=1e-10)
+
+    def test_replace_must_match_statistics_of_the_edited_data_set(self):
+        statistics = SufficientStatistics.from_data(_concentration_data, _analytical_data)
+        statistics.replace(_concentration_data[0], _analytical_data[0], 31750, 88000)
+        expected = SufficientStatistics.from_data([31750] + _concentration_data[1:], [88000] + _analytical_data[1:])
+        for attribute in ('nobs', 'mean_x', 'mean_y', 'sxx', 'syy', 'sxy'):
+            assert getattr(statistics, attribute) == approx(getattr(expected, attribute), rel=1e-10)
+
+
+class TestOrdinaryLeastSquares(object):
+
+    @pytest.mark.parametrize('param_attribute', [
+        'rsquared', 'rsquared_adj', 'ess', 'ssr', 'centered_tss', 'df_model', 'df_resid', 'mse_model',
+        'mse_resid', 'fvalue', 'f_pvalue'
+    ])
+    def test_fit_must_match_statsmodels_scalar_results(self, reference_result, param_attribute):
+        """Given a calibration curve
+        When fit is called
+        Then the closed form results must match the statsmodels reference"""
+        fitted_result = OrdinaryLeastSquares(_concentration_data, _analytical_data).fit()
+        assert getattr(fitted_result, param_attribute) == approx(getattr(reference_result, param_attribute),
+                                                                 rel=1e-9)
+
+    @pytest.mark.parametrize('param_attribute', ['params', 'bse', 'tvalues', 'pvalues', 'resid'])
+    def test_fit_must_match_statsmodels_array_results(self, reference_result, param_attribute):
+        fitted_result = OrdinaryLeastSquares(_concentration_data, _analytical_data).fit()
+        assert getattr(fitted_result, param_attribute) == approx(getattr(reference_result, param_attribute),
+                                                                 rel=1e-7)
+
+    def test_model_must_expose_design_matrix_with_constant(self, reference_result):
+        fitted_result = OrdinaryLeastSquares(_concentration_data, _analytical_data).fit()
+        assert numpy.array_equal(fitted_result.model.exog, reference_result.model.exog)
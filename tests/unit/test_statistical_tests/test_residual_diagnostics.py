@@ -0,0 +1,61 @@
+import numpy
+import pytest
+import scipy.stats
+import statsmodels.api as statsmodels
+import statsmodels.stats.api as statsmodelsapi
+import statsmodels.stats.stattools as stattools
+from pytest import approx
+
+from analytical_validation.statistical_tests.residual_diagnostics import breusch_pagan, durbin_watson, \
+    residual_diagnostics, shapiro_wilk
+
+_random = numpy.random.RandomState(42)
+_concentration_data = numpy.repeat(numpy.linspace(1.0, 10.0, 6), 3)
+_resid = _random.normal(scale=_concentration_data / 10)
+
+
+class TestResidualDiagnostics(object):
+
+    def test_durbin_watson_must_match_statsmodels(self):
+        assert durbin_watson(_resid) == approx(stattools.durbin_watson(_resid))
+
+    def test_breusch_pagan_must_match_statsmodels(self):
+        expected = statsmodelsapi.het_breuschpagan(_resid, statsmodels.add_constant(_concentration_data))
+        lagrange_multiplier, pvalue = breusch_pagan(_resid, _concentration_data)
+        assert lagrange_multiplier == approx(expected[0])
+        assert pvalue == approx(expected[1])
+
+    @pytest.mark.parametrize('param_sample_size', [3, 4, 5, 6, 11, 12, 30, 250])
+    def test_shapiro_wilk_must_match_scipy(self, param_sample_size):
+        """Given samples of different sizes
+        When shapiro_wilk is called
+        Then must return the scipy W statistic and p-value"""
+        sample = _random.lognormal(size=param_sample_size)
+        w, pvalue = shapiro_wilk(sample)
+        expected = scipy.stats.shapiro(sample)
+        assert w == approx(expected[0], rel=1e-6)
+        assert pvalue == approx(expected[1], rel=1e-5, abs=1e-9)
+
+    def test_shapiro_wilk_must_return_nan_when_sample_has_less_than_3_values(self):
+        w, pvalue = shapiro_wilk([1.0, 2.0])
+        assert numpy.isnan(w) and numpy.isnan(pvalue)
+
+    def test_residual_diagnostics_must_process_nan_padded_curves_per_row(self):
+        """Given a 2-D array of residues padded with nan
+        When residual_diagnostics is called
+        Then each row must match the diagnostics of the unpadded curve"""
+        resid = numpy.full((2, 18), numpy.nan)
+        resid[0] = _resid
+        resid[1, :12] = _resid[:12] * 2
+        concentration = numpy.vstack((_concentration_data, _concentration_data))
+        diagnostics = residual_diagnostics(resid, concentration)
+        for row, length in enumerate((18, 12)):
+            expected = residual_diagnostics(resid[row, :length], _concentration_data[:length])
+            for actual_values, expected_value in zip(diagnostics, expected):
+                assert actual_values[row] == approx(expected_value)
+
+    def test_residual_diagnostics_must_check_normality_of_the_given_data(self):
+        normality_data = _random.normal(size=18)
+        diagnostics = residual_diagnostics(_resid, _concentration_data, normality_data)
+        assert diagnostics.shapiro_pvalue == approx(shapiro_wilk(normality_data)[1])
+        assert diagnostics.durbin_watson_value == approx(durbin_watson(_resid))
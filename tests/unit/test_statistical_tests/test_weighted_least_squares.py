@@ -0,0 +1,69 @@
+import numpy
+import pytest
+import statsmodels.api as statsmodels
+from pytest import approx
+
+from analytical_validation.exceptions import WeightingNotValid
+from analytical_validation.statistical_tests.weighted_least_squares import WEIGHTINGS, WeightedLeastSquares, \
+    select_weighting, weighting_factors
+
+_analytical_data = [[10.2, 9.9, 10.1], [51.0, 49.2, 50.3], [99.0, 103.1, 101.2], [480.0, 512.0, 495.5],
+                    [1020.0, 960.0, 1003.0]]
+_concentration_data = [[1.0, 1.0, 1.0], [5.0, 5.0, 5.0], [10.0, 10.0, 10.0], [50.0, 50.0, 50.0],
+                       [100.0, 100.0, 100.0]]
+_flat_analytical_data = [x for y in _analytical_data for x in y]
+_flat_concentration_data = [x for y in _concentration_data for x in y]
+
+
+class TestWeightedLeastSquares(object):
+
+    @pytest.mark.parametrize('param_weighting_index', [0, 1, 2])
+    def test_fit_must_match_statsmodels_wls(self, param_weighting_index):
+        """Given a weighting
+        When fit is called
+        Then the closed form results must match the statsmodels WLS reference"""
+        weights = weighting_factors(_analytical_data, _concentration_data)[param_weighting_index]
+        reference = statsmodels.WLS(_flat_analytical_data, statsmodels.add_constant(_flat_concentration_data),
+                                    weights=weights).fit()
+        fitted_result = WeightedLeastSquares(_flat_concentration_data, _flat_analytical_data, weights).fit()
+        for attribute in ('params', 'bse', 'pvalues', 'rsquared', 'ssr', 'ess', 'fvalue', 'f_pvalue', 'resid',
+                          'wresid'):
+            assert getattr(fitted_result, attribute) == approx(getattr(reference, attribute), rel=1e-7), attribute
+
+    def test_fit_must_fit_every_weighting_row_at_once(self):
+        weights = weighting_factors(_analytical_data, _concentration_data)
+        fitted_results = WeightedLeastSquares(_flat_concentration_data, _flat_analytical_data, weights).fit()
+        for index, row_weights in enumerate(weights):
+            fitted_result = WeightedLeastSquares(_flat_concentration_data, _flat_analytical_data, row_weights).fit()
+            assert fitted_results.params[:, index] == approx(fitted_result.params)
+            assert fitted_results.sum_of_relative_errors[index] == approx(fitted_result.sum_of_relative_errors)
+
+
+class TestSelectWeighting(object):
+
+    def test_select_weighting_must_return_weighting_with_smallest_sum_of_relative_errors(self):
+        weighting, fitted_result, sum_of_relative_errors = select_weighting(_analytical_data, _concentration_data)
+        assert set(sum_of_relative_errors) == {'1/x', '1/x^2', '1/s^2'}
+        assert sum_of_relative_errors[weighting] == min(sum_of_relative_errors.values())
+        assert fitted_result.sum_of_relative_errors == approx(sum_of_relative_errors[weighting])
+
+    def test_select_weighting_must_fit_once(self, mocker):
+        fit_spy = mocker.spy(WeightedLeastSquares, 'fit')
+        weighting, fitted_result, _ = select_weighting(_analytical_data, _concentration_data)
+        assert fit_spy.call_count == 1
+        weights = weighting_factors(_analytical_data, _concentration_data)[WEIGHTINGS.index(weighting)]
+        reference = WeightedLeastSquares(_flat_concentration_data, _flat_analytical_data, weights).fit()
+        for attribute in ('params', 'bse', 'pvalues', 'rsquared', 'ssr', 'resid', 'wresid', 'weights'):
+            assert getattr(fitted_result, attribute) == approx(getattr(reference, attribute)), attribute
+
+    def test_select_weighting_must_skip_weightings_that_cant_be_computed(self):
+        analytical_data = [[0.1, 0.1, 0.1], [10.2, 9.9, 10.1], [51.0, 49.2, 50.3]]
+        concentration_data = [[0.0, 0.0, 0.0], [1.0, 1.0, 1.0], [5.0, 5.0, 5.0]]
+        weighting, fitted_result, sum_of_relative_errors = select_weighting(analytical_data, concentration_data)
+        assert weighting is None
+        assert fitted_result is None
+        assert numpy.isinf(list(sum_of_relative_errors.values())).all()
+
+    def test_select_weighting_must_raise_exception_when_weighting_not_valid(self):
+        with pytest.raises(WeightingNotValid):
+            select_weighting(_analytical_data, _concentration_data, ('1/y',))
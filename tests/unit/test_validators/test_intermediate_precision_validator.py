@@ -1,3 +1,4 @@
+import numpy
 import pytest
 
 from analytical_validation.exceptions import IncorrectIntermediatePrecisionData
@@ -53,8 +54,15 @@ class TestIntermediatePrecisionValidator:
         intermediate_precision.calculate_obtained_concentrations()
         assert intermediate_precision.calculated_concentration == expected_result
 
+    def test_calculate_obtained_concentrations_must_accept_arrays(self):
+        analytical_data = numpy.array(_data_with_none, dtype=float)
+        intermediate_precision = IntermediatePrecision(analytical_data, intercept=0.1, slope=5)
+        intermediate_precision.calculate_obtained_concentrations()
+        numpy.testing.assert_allclose(intermediate_precision.calculated_concentration,
+                                      [0.6, 0.65, 0.7, 0.6, numpy.nan, 0.7, 0.6, 0.65, 0.7, 0.6, 0.65, numpy.nan])
+
     @pytest.mark.parametrize("param_analytical_data", [
-        "str", {"whaaat": 0.1}, 10, -1, None
+        "str", {"whaaat": 0.1}, 10, -1, None, numpy.ones((2, 2))
     ])
     def test_calculate_obtained_concentrations_must_raise_a_warning_given_incorrect_data(self, param_analytical_data):
         """
@@ -0,0 +1,72 @@
+import numpy
+import pytest
+
+from analytical_validation.exceptions import NegativeValue, ValueNotValid
+from analytical_validation.validators.linearity_arrow import read_curves, validate_curves, validate_parquet
+from analytical_validation.validators.linearity_batch import LinearityBatchResult
+from analytical_validation.validators.linearity_validator import LinearityValidator
+
+pyarrow = pytest.importorskip('pyarrow')
+
+ANALYTICAL_DATA = [[0.188, 0.192, 0.203], [0.349, 0.346, 0.348], [0.489, 0.482, 0.492], [0.637, 0.641, 0.641],
+                   [0.762, 0.768, 0.786], [0.931, 0.924, 0.925]]
+CONCENTRATION_DATA = [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016], [0.02, 0.02, 0.02], [0.028, 0.028, 0.028],
+                      [0.032, 0.032, 0.032], [0.04, 0.04, 0.04]]
+
+
+def curves_table(curves):
+    rows = []
+    for curve_id, (analytical_data, concentration_data) in curves.items():
+        for level, (analytical_data_set, concentration_data_set) in enumerate(zip(analytical_data,
+                                                                                 concentration_data)):
+            rows.extend((curve_id, level, replicate, signal, concentration) for replicate, (signal, concentration)
+                        in enumerate(zip(analytical_data_set, concentration_data_set)))
+    # Shuffled rows, the reader must sort them
+    rows = rows[::-1]
+    return pyarrow.table({column: [row[index] for row in rows] for index, column in
+                          enumerate(('curve_id', 'level', 'replicate', 'signal', 'concentration'))})
+
+
+class TestLinearityArrow(object):
+    curves = {'run 1': (ANALYTICAL_DATA, CONCENTRATION_DATA),
+              'run 2': ([[2 * value for value in data_set] for data_set in ANALYTICAL_DATA], CONCENTRATION_DATA)}
+
+    def test_read_curves_must_sort_rows_into_curves_and_levels(self):
+        curve_table = read_curves(curves_table(self.curves))
+        assert curve_table.curve_ids.to_pylist() == ['run 2', 'run 1']
+        assert curve_table.analytical_data[curve_table.curve_index == 1].tolist() == sum(ANALYTICAL_DATA, [])
+        assert curve_table.level_index[:6].tolist() == [0, 0, 0, 1, 1, 1]
+        assert curve_table.curve_offsets.tolist() == [0, 18, 36]
+
+    def test_validate_curves_must_match_linearity_validator(self):
+        results = validate_curves(curves_table(self.curves)).to_pylist()
+        linearity_validator = LinearityValidator(ANALYTICAL_DATA, CONCENTRATION_DATA)
+        linearity_validator.validate_linearity()
+        curve = next(result for result in results if result['curve_id'] == 'run 1')
+        for column in LinearityBatchResult.COLUMNS:
+            assert curve[column] == pytest.approx(getattr(linearity_validator, column))
+        outliers = numpy.array(sum(ANALYTICAL_DATA, []))[curve['outliers_mask']]
+        assert outliers.tolist() == sum(linearity_validator.outliers, [])
+
+    def test_validate_parquet_must_write_results(self, tmpdir):
+        source_path, result_path = str(tmpdir.join('runs.parquet')), str(tmpdir.join('results.parquet'))
+        pyarrow.parquet.write_table(curves_table(self.curves), source_path)
+        results = validate_parquet(source_path, result_path)
+        assert pyarrow.parquet.read_table(result_path).equals(results)
+        assert results.num_rows == 2
+
+    def test_read_curves_must_drop_rows_without_values(self):
+        table = curves_table({'run 1': ([[1.0, None, 3.0]], [[1.0, 1.0, None]])})
+        assert read_curves(table).analytical_data.tolist() == [1.0]
+
+    @pytest.mark.parametrize('param_curves, expected_exception', [
+        ({'run 1': ([[-1.0, 2.0]], [[1.0, 1.0]])}, NegativeValue),
+        ({'run 1': ([['a', 'b']], [[1.0, 1.0]])}, ValueNotValid),
+    ])
+    def test_read_curves_must_raise_exception_when_data_not_valid(self, param_curves, expected_exception):
+        with pytest.raises(expected_exception):
+            read_curves(curves_table(param_curves))
+
+    def test_read_curves_must_raise_exception_when_column_missing(self):
+        with pytest.raises(ValueNotValid):
+            read_curves(curves_table(self.curves).drop(['replicate']))
@@ -0,0 +1,62 @@
+import numpy
+import pytest
+from pytest import approx
+
+from analytical_validation.validators.linearity_batch import LinearityBatchResult, stack_curves
+from analytical_validation.validators.linearity_validator import LinearityValidator
+
+_hplc_curve = ([[88269, 86954, 88492], [99580, 101235, 100228], [108238, 109725, 110970],
+                [118102, 119044, 118292], [129714, 129481, 130213]],
+               [[31800, 31680, 31600], [36080, 36600, 36150], [39641, 40108, 40190],
+                [43564, 43800, 43776], [47680, 47800, 47341]])
+_uv_curve = ([[0.188, 0.192, 0.203], [0.349, 0.346, 0.348], [0.489, 0.482, 0.492], [0.637, 0.641, 0.641],
+              [0.762, 0.768, 0.786], [0.931, 0.924, 0.925]],
+             [[0.008, 0.008016, 0.008128], [0.016, 0.016032, 0.016256], [0.02, 0.02004, 0.02032],
+              [0.028, 0.028056, 0.028448], [0.032, 0.032064, 0.032512], [0.04, 0.04008, 0.04064]])
+_short_curve = ([[1.0, 2.1], [2.9, 4.2]], [[1.0, 1.0], [2.0, 2.0]])
+_two_points_curve = ([[1.0], [2.0]], [[1.0], [2.0]])
+
+
+@pytest.fixture(scope='module')
+def batch_result():
+    return LinearityValidator.validate_many([_hplc_curve, _uv_curve, _two_points_curve])
+
+
+class TestStackCurves(object):
+
+    def test_stack_curves_must_left_align_curves_and_mask_padding(self):
+        analytical_data, concentration_data, mask = stack_curves([_short_curve, ([[1.0, 2.0, 3.0]], [[4.0, 5.0, 6.0]])])
+        assert mask.tolist() == [[True, True, True, True], [True, True, True, False]]
+        assert analytical_data[0].tolist() == [1.0, 2.1, 2.9, 4.2]
+        assert concentration_data[1][mask[1]].tolist() == [4.0, 5.0, 6.0]
+
+
+class TestLinearityBatchResult(object):
+
+    @pytest.mark.parametrize('param_index, param_curve', [(0, _hplc_curve), (1, _uv_curve)])
+    def test_validate_many_must_match_validate_linearity(self, batch_result, param_index, param_curve):
+        """Given many calibration curves
+        When validate_many is called
+        Then each curve result must match the single curve validation"""
+        linearity_validator = LinearityValidator(*param_curve)
+        linearity_validator.validate_linearity()
+        curve_result = batch_result.curve(param_index)
+        for column in LinearityBatchResult.COLUMNS:
+            expected = getattr(linearity_validator, column)
+            if isinstance(curve_result[column], bool):
+                assert curve_result[column] is bool(expected), column
+            else:
+                assert curve_result[column] == approx(expected, rel=1e-7), column
+        assert batch_result.regression_residues(param_index) == approx(linearity_validator.regression_residues)
+        assert batch_result.outliers[param_index] == linearity_validator.outliers
+        assert batch_result.cleaned_analytical_data[param_index] == linearity_validator.cleaned_analytical_data
+        assert batch_result.cleaned_concentration_data[param_index] == linearity_validator.cleaned_concentration_data
+
+    def test_validate_many_must_invalidate_curves_with_too_few_values(self, batch_result):
+        assert numpy.isnan(batch_result.shapiro_pvalue[2])
+        assert not batch_result.linearity_is_valid[2]
+
+    def test_to_dict_must_return_one_list_per_column(self, batch_result):
+        columns = batch_result.to_dict()
+        assert set(columns) == set(LinearityBatchResult.COLUMNS)
+        assert all(len(values) == len(batch_result) for values in columns.values())
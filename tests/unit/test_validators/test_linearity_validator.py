@@ -1,8 +1,12 @@
 from unittest.mock import call, PropertyMock, MagicMock
 
+import numpy
 import pytest
 
-from analytical_validation.exceptions import DataWasNotFitted
+from analytical_validation.exceptions import DataWasNotFitted, OutlierTestNotValid, RegressionEngineNotValid, \
+    StatisticNotValid, WeightingNotValid
+from analytical_validation.instrumentation import StageTimer
+from analytical_validation.statistical_tests.ordinary_least_squares import OrdinaryLeastSquaresResult
 from src.analytical_validation.validators.linearity_validator import LinearityValidator
 
 
@@ -89,6 +93,8 @@ class TestLinearityValidator(object):
         """Given concentration values = float
         The ordinary_least_squares_linear_regression
         Then must set properties"""
+        # Arrange
+        linearity_validator_obj.engine = 'statsmodels'
         # Act
         linearity_validator_obj.ordinary_least_squares_linear_regression()
         # Assert
@@ -103,6 +109,24 @@ class TestLinearityValidator(object):
             call(linearity_validator_obj.concentration_data)
         ]
 
+    def test_ordinary_least_squares_linear_regression_must_use_closed_form_engine_by_default(self,
+                                                                                          ordinary_least_squares_regression_mock):
+        """Given the default engine
+        When ordinary_least_squares_linear_regression is called
+        Then must fit the data without building a statsmodels model"""
+        # Arrange
+        linearity_validator = LinearityValidator([[0.100, 0.200, 0.150]], [[0.1, 0.2, 0.3]])
+        # Act
+        linearity_validator.ordinary_least_squares_linear_regression()
+        # Assert
+        assert isinstance(linearity_validator.fitted_result, OrdinaryLeastSquaresResult)
+        assert not ordinary_least_squares_regression_mock.called
+
+    @pytest.mark.parametrize('param_engine', ['numpy', None, 1, 'OLS'])
+    def test_constructor_must_raise_exception_when_engine_not_valid(self, param_engine):
+        with pytest.raises(RegressionEngineNotValid):
+            LinearityValidator([[0.100, 0.200, 0.150]], [[0.1, 0.2, 0.3]], engine=param_engine)
+
     def test_slope_property_exists_when_fitted_result_not_none(self, linearity_validator_obj, fitted_result_obj):
         # Act & assert
         assert linearity_validator_obj.slope == fitted_result_obj.params[1]
@@ -305,6 +329,8 @@ class TestLinearityValidator(object):
         """Given heterokedastic data
         When check_homokedasticity is called
         Then must return false"""
+        # Arrange
+        linearity_validator_obj.engine = 'statsmodels'
         # Act
         linearity_validator_obj.run_breusch_pagan_test()
         # Assert
@@ -323,6 +349,7 @@ class TestLinearityValidator(object):
         When residual_autocorrelation is called
         Then must create durbin_watson_value"""
         # Arrange
+        linearity_validator_obj.engine = 'statsmodels'
         durbin_watson_mock.return_value = durbin_watson_pvalue
         # Act
         linearity_validator_obj.check_residual_autocorrelation()
@@ -359,3 +386,287 @@ class TestLinearityValidator(object):
         durbin_watson_mock.return_value = durbin_watson_pvalue
         # Act & Assert
         assert linearity_validator_obj.durbin_watson_value is None
+
+    @pytest.mark.parametrize('param_durbin_watson_value, expected_result', [
+        (0, False), (0.1, True), (2, True), (3.9, True), (4, False), (4.1, False)
+    ])
+    def test_positive_correlation_must_return_true_when_durbin_watson_value_is_between_0_and_4(
+            self, linearity_validator_obj, param_durbin_watson_value, expected_result):
+        # Arrange
+        linearity_validator_obj.durbin_watson_value = param_durbin_watson_value
+        # Act & Assert
+        assert linearity_validator_obj.positive_correlation is expected_result
+
+
+class TestLinearityValidatorIncrementalMode(object):
+    analytical_data = [[0.188, 0.192, 0.203], [0.349, 0.346, 0.348], [0.489, 0.482, 0.492], [0.637, 0.641, 0.641]]
+    concentration_data = [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016], [0.02, 0.02, 0.02], [0.028, 0.028, 0.028]]
+
+    @staticmethod
+    def assert_same_regression(linearity_validator, expected_analytical_data, expected_concentration_data):
+        expected = LinearityValidator(expected_analytical_data, expected_concentration_data)
+        expected.ordinary_least_squares_linear_regression()
+        expected.check_residual_autocorrelation()
+        assert linearity_validator.original_analytical_data == expected_analytical_data
+        assert linearity_validator.analytical_data == expected.analytical_data
+        assert linearity_validator.concentration_data == expected.concentration_data
+        for attribute in ('intercept', 'slope', 'r_squared', 'sum_of_squares_model', 'sum_of_squares_resid',
+                          'anova_f_value', 'anova_f_pvalue', 'durbin_watson_value'):
+            assert getattr(linearity_validator, attribute) == pytest.approx(getattr(expected, attribute),
+                                                                            rel=1e-9), attribute
+        assert linearity_validator.regression_residues == pytest.approx(expected.regression_residues)
+
+    def test_add_point_must_refresh_regression_as_a_full_refit(self):
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data)
+        linearity_validator.ordinary_least_squares_linear_regression()
+        # Act
+        linearity_validator.add_point(1, 0.350, 0.016)
+        linearity_validator.add_point(4, 0.762, 0.032)
+        linearity_validator.refresh_regression()
+        # Assert
+        self.assert_same_regression(linearity_validator,
+                                    [[0.188, 0.192, 0.203], [0.349, 0.346, 0.348, 0.350], [0.489, 0.482, 0.492],
+                                     [0.637, 0.641, 0.641], [0.762]],
+                                    [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016, 0.016], [0.02, 0.02, 0.02],
+                                     [0.028, 0.028, 0.028], [0.032]])
+
+    def test_start_incremental_mode_must_use_unweighted_statistics_after_a_weighted_fit(self):
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data, weighting='1/x')
+        linearity_validator.weighted_least_squares_linear_regression()
+        # Act
+        statistics = linearity_validator.start_incremental_mode()
+        linearity_validator.add_point(1, 0.350, 0.016)
+        linearity_validator.refresh_regression()
+        # Assert
+        assert statistics.sum_of_weights is None
+        self.assert_same_regression(linearity_validator,
+                                    [[0.188, 0.192, 0.203], [0.349, 0.346, 0.348, 0.350], [0.489, 0.482, 0.492],
+                                     [0.637, 0.641, 0.641]],
+                                    [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016, 0.016], [0.02, 0.02, 0.02],
+                                     [0.028, 0.028, 0.028]])
+
+    def test_remove_and_replace_point_must_refresh_regression_as_a_full_refit(self):
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data)
+        # Act
+        assert linearity_validator.remove_point(2, 1) == (0.482, 0.02)
+        linearity_validator.replace_point(0, 2, 0.190, 0.008)
+        linearity_validator.refresh_regression()
+        # Assert
+        self.assert_same_regression(linearity_validator,
+                                    [[0.188, 0.192, 0.190], [0.349, 0.346, 0.348], [0.489, 0.492],
+                                     [0.637, 0.641, 0.641]],
+                                    [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016], [0.02, 0.02],
+                                     [0.028, 0.028, 0.028]])
+        assert self.analytical_data[0] == [0.188, 0.192, 0.203]
+
+    def test_refit_without_outliers_must_remove_outliers_from_regression(self):
+        analytical_data = [[1.0, 1.0, 10.0], [2.0, 6.0, 2.0], [3.1, 3.0, 2.9]]
+        concentration_data = [[1.0, 2.0, 3.0], [8.0, 9.0, 10.0], [11.0, 12.0, 13.0]]
+        linearity_validator = LinearityValidator(analytical_data, concentration_data)
+        linearity_validator.ordinary_least_squares_linear_regression()
+        linearity_validator.check_outliers()
+        # Act
+        linearity_validator.refit_without_outliers()
+        # Assert
+        self.assert_same_regression(linearity_validator, [[1.0, 1.0], [2.0, 2.0], [3.1, 3.0, 2.9]],
+                                    [[1.0, 2.0], [8.0, 10.0], [11.0, 12.0, 13.0]])
+
+    def test_refit_without_outliers_must_remove_outliers_once(self):
+        analytical_data = [[1.0, 1.0, 10.0], [2.0, 6.0, 2.0], [3.1, 3.0, 2.9]]
+        concentration_data = [[1.0, 2.0, 3.0], [8.0, 9.0, 10.0], [11.0, 12.0, 13.0]]
+        linearity_validator = LinearityValidator(analytical_data, concentration_data)
+        linearity_validator.ordinary_least_squares_linear_regression()
+        linearity_validator.check_outliers()
+        linearity_validator.refit_without_outliers()
+        # Act
+        linearity_validator.refit_without_outliers()
+        # Assert
+        self.assert_same_regression(linearity_validator, [[1.0, 1.0], [2.0, 2.0], [3.1, 3.0, 2.9]],
+                                    [[1.0, 2.0], [8.0, 10.0], [11.0, 12.0, 13.0]])
+
+
+class TestLinearityValidatorOutlierTests(object):
+    analytical_data = [[1.0 + 0.01 * (index % 7) for index in range(200)] + [2.0, 2.1],
+                       [3.0 + 0.01 * (index % 5) for index in range(20)] + [3.5]]
+    concentration_data = [[1.0] * 202, [2.0] * 21]
+
+    @pytest.mark.parametrize('param_outlier_test', ['rosner', None, 1])
+    def test_constructor_must_raise_exception_when_outlier_test_not_valid(self, param_outlier_test):
+        with pytest.raises(OutlierTestNotValid):
+            LinearityValidator(self.analytical_data, self.concentration_data, outlier_test=param_outlier_test)
+
+    def test_check_outliers_must_skip_dixon_q_test_of_large_levels(self):
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data)
+        # Act
+        linearity_validator.check_outliers()
+        # Assert
+        assert linearity_validator.outliers == [[], [3.5]]
+
+    @pytest.mark.parametrize('param_outlier_test', ['grubbs', 'generalized_esd', 'auto'])
+    def test_check_outliers_must_find_outliers_of_large_levels(self, param_outlier_test):
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data,
+                                                 outlier_test=param_outlier_test)
+        # Act
+        linearity_validator.check_outliers()
+        # Assert
+        assert linearity_validator.outliers == [[2.0, 2.1], [3.5]]
+        assert len(linearity_validator.cleaned_analytical_data[0]) == 200
+        assert len(linearity_validator.cleaned_concentration_data[0]) == 200
+
+    def test_check_outliers_must_use_given_outlier_test(self):
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data)
+        # Act
+        linearity_validator.check_outliers('generalized_esd')
+        # Assert
+        assert linearity_validator.outliers[0] == [2.0, 2.1]
+        with pytest.raises(OutlierTestNotValid):
+            linearity_validator.check_outliers('rosner')
+
+
+class TestLinearityValidatorArrayInput(object):
+    analytical_data = [[0.188, 0.192, 0.203], [0.349, 0.346, 0.348], [0.489, 0.482, 0.492], [0.637, 0.641, 0.641],
+                       [0.762, 0.768, 0.786], [0.931, 0.924, 0.925]]
+    concentration_data = [[0.008, 0.008, 0.008], [0.016, 0.016, 0.016], [0.02, 0.02, 0.02], [0.028, 0.028, 0.028],
+                          [0.032, 0.032, 0.032], [0.04, 0.04, 0.04]]
+
+    @pytest.mark.parametrize('param_layout', [
+        numpy.array,
+        lambda data: (numpy.array(data).reshape(-1), numpy.arange(0, 19, 3)),
+        lambda data: [numpy.array(data_set) for data_set in data],
+    ])
+    def test_validate_linearity_must_match_list_input(self, param_layout):
+        expected_validator = LinearityValidator(self.analytical_data, self.concentration_data, weighting='auto')
+        expected_validator.validate_linearity()
+        linearity_validator = LinearityValidator(param_layout(self.analytical_data),
+                                                 param_layout(self.concentration_data), weighting='auto')
+        # Act
+        linearity_validator.validate_linearity()
+        # Assert
+        assert linearity_validator.slope == pytest.approx(expected_validator.slope)
+        assert linearity_validator.durbin_watson_value == pytest.approx(expected_validator.durbin_watson_value)
+        assert linearity_validator.outliers == expected_validator.outliers
+        assert linearity_validator.cleaned_analytical_data == expected_validator.cleaned_analytical_data
+        assert linearity_validator.linearity_is_valid == expected_validator.linearity_is_valid
+
+    def test_constructor_must_not_copy_array_data(self):
+        analytical_data = numpy.array(self.analytical_data)
+        linearity_validator = LinearityValidator(analytical_data, numpy.array(self.concentration_data))
+        assert numpy.shares_memory(linearity_validator.analytical_data, analytical_data)
+        assert numpy.shares_memory(linearity_validator.original_analytical_data[2], analytical_data)
+
+    def test_validate_many_must_accept_array_curves(self):
+        curves = [(self.analytical_data, self.concentration_data),
+                  (numpy.array(self.analytical_data), numpy.array(self.concentration_data))]
+        batch_result = LinearityValidator.validate_many(curves)
+        assert batch_result.curve(0) == batch_result.curve(1)
+
+
+class TestLinearityValidatorWeightedLeastSquares(object):
+    analytical_data = [[10.2, 9.9, 10.1], [51.0, 49.2, 50.3], [99.0, 103.1, 101.2], [480.0, 512.0, 495.5],
+                       [1020.0, 960.0, 1003.0]]
+    concentration_data = [[1.0, 1.0, 1.0], [5.0, 5.0, 5.0], [10.0, 10.0, 10.0], [50.0, 50.0, 50.0],
+                          [100.0, 100.0, 100.0]]
+
+    @pytest.mark.parametrize('param_weighting', ['1/y', 'wls', 1])
+    def test_constructor_must_raise_exception_when_weighting_not_valid(self, param_weighting):
+        with pytest.raises(WeightingNotValid):
+            LinearityValidator(self.analytical_data, self.concentration_data, weighting=param_weighting)
+
+    def test_validate_linearity_must_fit_weighted_regression_when_data_is_heteroscedastic(self):
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data, weighting='auto')
+        # Act
+        linearity_validator.validate_linearity()
+        # Assert
+        assert linearity_validator.selected_weighting in ('1/x', '1/x^2', '1/s^2')
+        assert linearity_validator.fitted_result.weights is not None
+        assert linearity_validator.sum_of_relative_errors[linearity_validator.selected_weighting] == min(
+            linearity_validator.sum_of_relative_errors.values())
+
+    def test_validate_linearity_must_keep_ordinary_regression_when_data_is_homoscedastic(self):
+        analytical_data = [[88269, 86954, 88492], [99580, 101235, 100228], [108238, 109725, 110970],
+                           [118102, 119044, 118292], [129714, 129481, 130213]]
+        concentration_data = [[31800, 31680, 31600], [36080, 36600, 36150], [39641, 40108, 40190],
+                              [43564, 43800, 43776], [47680, 47800, 47341]]
+        linearity_validator = LinearityValidator(analytical_data, concentration_data, weighting='auto')
+        # Act
+        linearity_validator.validate_linearity()
+        # Assert
+        assert linearity_validator.is_homoscedastic
+        assert linearity_validator.selected_weighting is None
+
+    def test_validate_linearity_must_use_forced_weighting(self):
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data, weighting='1/x^2')
+        # Act
+        linearity_validator.validate_linearity()
+        # Assert
+        assert linearity_validator.selected_weighting == '1/x^2'
+        assert list(linearity_validator.sum_of_relative_errors) == ['1/x^2']
+
+
+class TestLinearityValidatorStatistics(object):
+    analytical_data = TestLinearityValidatorArrayInput.analytical_data
+    concentration_data = TestLinearityValidatorArrayInput.concentration_data
+
+    def test_required_statistics_must_follow_dependencies(self):
+        assert LinearityValidator.required_statistics(['linearity_is_valid']) == {
+            'linearity_is_valid', 'regression', 'shapiro_wilk', 'breusch_pagan', 'durbin_watson'}
+        assert LinearityValidator.required_statistics(['durbin_watson']) == {'durbin_watson', 'regression'}
+        assert LinearityValidator.required_statistics([]) == set()
+
+    def test_required_statistics_must_raise_exception_when_statistic_not_valid(self):
+        with pytest.raises(StatisticNotValid):
+            LinearityValidator.required_statistics(['anova'])
+
+    @pytest.mark.parametrize('param_engine', ['closed_form', 'statsmodels'])
+    def test_validate_linearity_must_skip_statistics_not_required(self, mocker, param_engine):
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data, engine=param_engine)
+        shapiro_wilk_spy = mocker.spy(linearity_validator, 'run_shapiro_wilk_test')
+        check_outliers_spy = mocker.spy(linearity_validator, 'check_outliers')
+        # Act
+        linearity_validator.validate_linearity(['breusch_pagan'])
+        # Assert
+        shapiro_wilk_spy.assert_not_called()
+        check_outliers_spy.assert_not_called()
+        assert linearity_validator.shapiro_pvalue is None
+        assert linearity_validator.durbin_watson_value is None
+        assert linearity_validator.breusch_pagan_pvalue is not None
+        assert linearity_validator.linearity_is_valid is False
+
+    def test_validate_linearity_must_match_complete_validation(self):
+        expected_validator = LinearityValidator(self.analytical_data, self.concentration_data)
+        expected_validator.validate_linearity()
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data)
+        # Act
+        linearity_validator.validate_linearity(['linearity_is_valid', 'outliers'])
+        # Assert
+        assert linearity_validator.shapiro_pvalue == pytest.approx(expected_validator.shapiro_pvalue)
+        assert linearity_validator.outliers == expected_validator.outliers
+        assert linearity_validator.linearity_is_valid == expected_validator.linearity_is_valid
+
+    def test_validate_linearity_must_only_check_outliers(self):
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data)
+        # Act
+        linearity_validator.validate_linearity(['outliers'])
+        # Assert
+        assert linearity_validator.fitted_result is None
+        assert len(linearity_validator.cleaned_analytical_data) == len(self.analytical_data)
+
+    def test_validate_linearity_must_time_each_stage(self):
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data)
+        stage_timer = StageTimer(registry=None)
+        # Act
+        linearity_validator.validate_linearity(stage_timer=stage_timer)
+        # Assert
+        assert linearity_validator.stage_timer is stage_timer
+        assert [timing.stage for timing in stage_timer.timings] == ['regression', 'residual_diagnostics', 'outliers',
+                                                                    'linearity_is_valid']
+        assert {timing.outcome for timing in stage_timer.timings} == {'ok'}
+
+    def test_validate_linearity_must_time_the_failed_stage(self, mocker):
+        linearity_validator = LinearityValidator(self.analytical_data, self.concentration_data)
+        mocker.patch.object(linearity_validator, 'run_residual_diagnostics', side_effect=DataWasNotFitted())
+        # Act
+        linearity_validator.validate_linearity()
+        # Assert
+        assert [(timing.stage, timing.outcome) for timing in linearity_validator.stage_timer.timings] == [
+            ('regression', 'ok'), ('residual_diagnostics', 'DataWasNotFitted')]